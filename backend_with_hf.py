@@ -1,26 +1,143 @@
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import requests
+# 가장 먼저 import → 이후 모든 단계의 시작 시점 기준
+from startup_timer import phase, lazy_import, mark_ready, report as startup_report
+
+with phase("import:web"):
+    from fastapi import FastAPI, Header, HTTPException, Request
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+    from pydantic import BaseModel
+    from starlette.background import BackgroundTask
 import asyncio
+import contextvars
+from contextlib import asynccontextmanager
 from typing import List, Optional
 import os
-from chemical_analyzer import crawl_cameo_sequential
-from simple_analyzer import analyze_simple
-from safety_links import get_all_links_for_analysis
+import time
+with phase("import:app_modules"):
+    from chemical_analyzer import crawl_cameo_sequential, browser_manager
+    from simple_analyzer import analyze_simple, ANALYZER_VERSION
+    from reactivity_parser import PARSER_VERSION
+    from safety_links import get_all_links_for_analysis
+    from pair_matrix import create_pair_store
+    from pair_store import plan_sessions, required_pairs
+    from cas_number import canonicalize_products
+    from request_control import (
+        run_until_disconnect, check_cancelled, is_abandoned, RequestCancelled,
+        resolve_deadline, extend_deadline, remaining, has_budget, mark_exceeded, deadline_exceeded
+    )
+    from inventory import InventoryManager, InventoryNotFound
+    from storage_planner import plan_for_analysis
+    from metrics import (
+        render_metrics, PIPELINE_STAGE_SECONDS, CACHE_REQUESTS, AI_TIMEOUTS,
+        MEMORY_CACHE_ENTRIES, MEMORY_CACHE_BYTES, CACHE_REFRESHES, CAS_INPUTS, BROWSER_SESSIONS
+    )
+    from keep_warm import (
+        keep_warm, traffic, KEEP_WARM_ENABLED, KEEP_WARM_HF_INTERVAL_SECONDS, KEEP_WARM_CRAWLER_INTERVAL_SECONDS
+    )
+    from tracing import span, start_trace, end_trace, current_timings, export_trace, TRACE_FILE
+    from profiler import (
+        is_admin, start_profile, end_profile, current_profile, load_profile, profile_stats_path,
+        run_blocking
+    )
+    from result_store import ResultStore, MemoryTier, RESULT_STORE_PATH, encode_response, is_fresh
+    from cache_snapshot import export_snapshot, import_snapshot, SnapshotError, CACHE_SNAPSHOT_PATH
 import json
+import logging
+import re
 from dotenv import load_dotenv
-import google.generativeai as genai
 import sys
-from io import StringIO
 import hashlib
+import itertools
+import math
+import tempfile
 from pathlib import Path
 
+# requests / google.generativeai / playwright는 첫 사용 시 lazy_import로 로드
+# (서버가 /health에 응답하기 전까지의 cold start 시간 단축)
+
 # .env 파일 로드
-load_dotenv()
+with phase("init:dotenv"):
+    load_dotenv()
+
+# .env의 LOG_LEVEL / LOG_FORMAT 반영을 위해 dotenv 이후에 설정
+with phase("init:logging"):
+    from log_config import setup_logging, bind_request_id, reset_request_id, bind_cas_numbers
+    setup_logging()
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """서버 시작 시 초기화 (uvicorn이 요청을 받기 직전에 실행)"""
+    with phase("init:cache_dir"):
+        CACHE_DIR.mkdir(exist_ok=True)
+    logger.info(f"[OK] Cache directory: {CACHE_DIR.absolute()}")
+
+    with phase("init:pair_store"):
+        pair_store.load()
+
+    if GEMINI_API_KEY:
+        logger.info("[OK] Gemini API key set (SDK loads on first translation)")
+    else:
+        logger.warning("[WARNING] Gemini API key not set. Translation will be unavailable.")
+
+    mark_ready()
+    report = startup_report()
+    logger.info(f"[Startup] Ready in {report['ready_ms']} ms")
+    for item in report["slowest"]:
+        logger.info(f"[Startup]   {item['phase']}: {item['duration_ms']} ms")
+
+    # 브라우저/AI 클라이언트 prewarm (선택) - /health 응답을 막지 않도록 백그라운드 실행
+    prewarm_task = asyncio.create_task(prewarm()) if PREWARM_ENABLED else None
+    # 이전 형식 캐시 파일 이전도 백그라운드 (파일이 많아도 시작 시간에 영향 없음)
+    legacy_task = asyncio.create_task(import_legacy_cache())
+    # 배포 시 함께 올린 캐시 스냅샷 가져오기 (끝날 때까지 /ready의 caches는 false)
+    snapshot_task = asyncio.create_task(import_cache_snapshot(Path(CACHE_SNAPSHOT_PATH))) if CACHE_SNAPSHOT_PATH else None
+    # HF Space / 크롤러 keep-warm (선택) - 실제 요청이 처리 중이면 미룸
+    if KEEP_WARM_ENABLED:
+        start_keep_warm()
+
+    yield
+
+    await keep_warm.stop()
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+    legacy_task.cancel()
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+    for task in list(_refresh_tasks.values()):
+        task.cancel()
+    await browser_manager.close()
+
+
+def start_keep_warm():
+    """keep-warm 대상 등록 후 스케줄러 시작"""
+    if AI_API_URL and KEEP_WARM_HF_INTERVAL_SECONDS > 0:
+        keep_warm.add("hf_space", KEEP_WARM_HF_INTERVAL_SECONDS, ping_ai_service, blocking=True)
+    if KEEP_WARM_CRAWLER_INTERVAL_SECONDS > 0:
+        # 크롤링 중에는 브라우저를 건드리지 않음 (백그라운드 재생성 / partial 완료 작업 포함)
+        keep_warm.add(
+            "crawler", KEEP_WARM_CRAWLER_INTERVAL_SECONDS, browser_manager.rewarm,
+            busy=lambda: BROWSER_SESSIONS.value() > 0
+        )
+    keep_warm.start()
 
-app = FastAPI(title="Chemical Reactivity Analysis API")
+
+async def prewarm():
+    """첫 요청 전에 느린 경로 준비: AI SDK import/설정 + Chromium + CAMEO 검색 페이지"""
+    with phase("prewarm:ai_clients"):
+        await asyncio.to_thread(lazy_import, "requests")
+        if GEMINI_API_KEY:
+            await asyncio.to_thread(get_genai)
+    with phase("prewarm:browser"):
+        await browser_manager.prewarm()
+    logger.info(f"[Prewarm] Complete (browser warm: {browser_manager.is_warm})")
+
+
+app = FastAPI(title="Chemical Reactivity Analysis API", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -31,22 +148,129 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# ?profile=1 또는 X-Profile: 1 로 프로파일링을 요청할 수 있는 분석 엔드포인트
+PROFILED_PATHS = {"/analyze", "/analyze-from-json", "/simple-analyze", "/hybrid-analyze", "/bulk-analyze"}
+
+
+def profiling_requested(request) -> bool:
+    flag = request.query_params.get("profile") or request.headers.get("x-profile")
+    return request.url.path in PROFILED_PATHS and flag in ("1", "true")
+
+
+@app.middleware("http")
+async def trace_requests(request, call_next):
+    """
+    요청별 단계 시간 측정 → Server-Timing 헤더 (+ TRACE_FILE 설정 시 JSON-lines 기록)
+    X-Request-ID 헤더가 있으면 그대로 사용
+    관리자 요청(X-Admin-Token)은 프로파일링하여 profiles/에 저장 → X-Profile-ID 헤더
+    """
+    profile_requested = profiling_requested(request)
+    if profile_requested and not is_admin(request.headers.get("x-admin-token")):
+        return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token"})
+
+    trace, token = start_trace(request.headers.get("x-request-id"))
+    log_token = bind_request_id(trace.request_id)
+    profile, profile_token = start_profile(trace.request_id) if profile_requested else (None, None)
+    try:
+        if request.url.path in PROFILED_PATHS:
+            # keep-warm 일정 / 양보 판단용 (분석 요청 처리 중에는 keep-warm을 미룸)
+            with traffic.track():
+                response = await call_next(request)
+        else:
+            response = await call_next(request)
+    finally:
+        if profile_token is not None:
+            end_profile(profile_token)
+        reset_request_id(log_token)
+        end_trace(token)
+
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["X-Request-ID"] = trace.request_id
+    if profile is not None:
+        await asyncio.to_thread(
+            profile.save, trace.crawl_steps(),
+            request_id=trace.request_id, path=request.url.path,
+            status=response.status_code, total_ms=round(trace.elapsed() * 1000, 2)
+        )
+        response.headers["X-Profile-ID"] = profile.profile_id
+    if TRACE_FILE:
+        await asyncio.to_thread(
+            export_trace, trace,
+            method=request.method, path=request.url.path, status=response.status_code
+        )
+    return response
+
+
 # AI API URL (환경변수 또는 직접 설정)
 # Hugging Face Spaces URL
 AI_API_URL = os.getenv("AI_API_URL", "https://gimchabssal-chemical-ai.hf.space")
 
 # Gemini API Key (번역용)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    print("[OK] Gemini API configured for translation")
-else:
-    print("[WARNING] Gemini API key not set. Translation will be unavailable.")
+# Gemini API 주소 (비우면 기본 주소, 오프라인 벤치마크에서는 로컬 stub 서버)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+# Gemini 번역 1회 호출 제한 시간 (초, 요청 기한이 더 짧으면 남은 시간)
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+# HF 요약 / Gemini 번역 프롬프트가 바뀌면 올림 (캐시 결과 재생성 대상 판단용)
+PROMPT_VERSION = 1
+_gemini_configured = False
+
+
+def get_genai():
+    """google.generativeai 지연 로드 + 최초 사용 시 API 키 설정"""
+    global _gemini_configured
+    genai = lazy_import("google.generativeai")
+    if not _gemini_configured:
+        if GEMINI_API_ENDPOINT:
+            genai.configure(
+                api_key=GEMINI_API_KEY,
+                transport="rest",
+                client_options={"api_endpoint": GEMINI_API_ENDPOINT}
+            )
+        else:
+            genai.configure(api_key=GEMINI_API_KEY)
+        _gemini_configured = True
+        logger.info("[OK] Gemini API configured for translation")
+    return genai
+
+
+# 서버 시작 시 브라우저/AI 클라이언트 미리 준비 (opt-in, 메모리 사용 증가)
+PREWARM_ENABLED = os.getenv("PREWARM_BROWSER", "").lower() in ("1", "true", "yes")
 
-# 캐시 디렉토리 설정
+# 캐시 디렉토리 설정 (생성은 lifespan에서)
 CACHE_DIR = Path("cache")
-CACHE_DIR.mkdir(exist_ok=True)
-print(f"[OK] Cache directory: {CACHE_DIR.absolute()}")
+
+# CAS 쌍 단위 결과 저장소 + 재고 관리
+# (PAIR_STORE_BACKEND=matrix: 여러 워커가 cache/pairs.bin을 mmap으로 공유)
+pair_store = create_pair_store(CACHE_DIR)
+# 분석 결과 캐시 (SQLite 단일 파일, 여러 워커가 공유)
+result_store = ResultStore(RESULT_STORE_PATH)
+# 자주 요청되는 조합의 응답 bytes (프로세스별)
+memory_tier = MemoryTier()
+# 캐시 항목을 만든 분석기 / 프롬프트 / 파서 버전 (다르면 응답 후 백그라운드 재생성)
+RESULT_VERSIONS = {"analyzer": ANALYZER_VERSION, "prompt": PROMPT_VERSION, "parser": PARSER_VERSION}
+# 백그라운드 재생성 동시 실행 수 (사용자 요청의 크롤링을 우선하도록 작게 유지)
+CACHE_REFRESH_CONCURRENCY = int(os.getenv("CACHE_REFRESH_CONCURRENCY", "1"))
+_refresh_semaphore = asyncio.Semaphore(CACHE_REFRESH_CONCURRENCY)
+_refresh_tasks = {}  # cache_key -> Task (같은 키는 한 번만 재생성)
+# 부분 결과 응답 후 나머지 조합을 크롤링하는 작업 (result_token = 캐시 키)
+_partial_jobs = {}  # result_token -> {"task", "pending_pairs", "error"}
+# /bulk-analyze: 한 요청의 최대 세트 수 / 크롤링 세션당 최대 물질 수 / 동시 크롤링 세션 수
+# 세션 크기는 CAMEO MyChemicals의 제한이 아니라 한 세션의 크롤링 시간을 나누는 기준
+# (기본값은 30개 물질의 합집합이 한 세션에 들어가도록)
+BULK_MAX_SETS = int(os.getenv("BULK_MAX_SETS", "200"))
+BULK_SESSION_SIZE = int(os.getenv("BULK_SESSION_SIZE", "40"))
+BULK_CRAWL_CONCURRENCY = int(os.getenv("BULK_CRAWL_CONCURRENCY", "1"))
+# 시작 시 스냅샷 가져오기 상태 (CACHE_SNAPSHOT_PATH 설정 시)
+_snapshot_import = {"status": "pending" if CACHE_SNAPSHOT_PATH else "disabled", "counts": None}
+inventory_manager = InventoryManager(CACHE_DIR / "inventories", pair_store)
+
+# /health의 AI 상태 확인 결과 캐시 (초)
+HEALTH_AI_CACHE_SECONDS = float(os.getenv("HEALTH_AI_CACHE_SECONDS", "30"))
+_ai_health = {"status": "checking", "checked_at": None, "task": None}
+# keep-warm의 HF Space /health 요청 타임아웃 (잠든 Space는 깨어나는 데 시간이 걸림)
+KEEP_WARM_HF_TIMEOUT_SECONDS = float(os.getenv("KEEP_WARM_HF_TIMEOUT_SECONDS", "60"))
 
 # 캐싱 함수들
 def get_cache_key(substances: List[str]) -> str:
@@ -55,35 +279,173 @@ def get_cache_key(substances: List[str]) -> str:
     key_string = str(sorted_substances)
     return hashlib.md5(key_string.encode()).hexdigest()
 
-def get_cached_result(substances: List[str]):
-    """캐시에서 결과 가져오기"""
+def remember_response(cache_key: str, body: bytes, expires_at: Optional[float]):
+    """메모리 캐시에 응답 bytes 보관 + 크기 메트릭 갱신"""
+    memory_tier.put(cache_key, body, expires_at)
+    stats = memory_tier.stats()
+    MEMORY_CACHE_ENTRIES.set(stats["entries"])
+    MEMORY_CACHE_BYTES.set(stats["bytes"])
+
+async def get_cached_response(substances: List[str]) -> Optional[bytes]:
+    """캐시된 응답 본문(JSON bytes) 가져오기 - 메모리 → 결과 저장소 순"""
     try:
         cache_key = get_cache_key(substances)
-        cache_file = CACHE_DIR / f"{cache_key}.json"
 
-        if cache_file.exists():
-            print(f"[Cache] HIT for {len(substances)} substances")
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            print(f"[Cache] MISS for {len(substances)} substances")
+        body = memory_tier.get(cache_key)
+        if body is not None:
+            CACHE_REQUESTS.inc(layer="memory", result="hit")
+            logger.info(f"[Cache] MEMORY HIT for {len(substances)} substances")
+            return body
+        CACHE_REQUESTS.inc(layer="memory", result="miss")
+
+        with span("cache_read", PIPELINE_STAGE_SECONDS, stage="cache_read"):
+            entry = await run_blocking("cache_read", result_store.get_entry, cache_key, cpu=True)
+
+        if entry is None:
+            CACHE_REQUESTS.inc(layer="analysis", result="miss")
+            logger.info(f"[Cache] MISS for {len(substances)} substances")
             return None
+
+        body = encode_response(entry["result"])
+        if is_fresh(entry, RESULT_VERSIONS):
+            CACHE_REQUESTS.inc(layer="analysis", result="hit")
+            logger.info(f"[Cache] HIT for {len(substances)} substances")
+            remember_response(cache_key, body, entry["expires_at"])
+        else:
+            # 만료 / 이전 버전 → 바로 응답하고 백그라운드에서 재생성 (메모리에는 보관하지 않음)
+            CACHE_REQUESTS.inc(layer="analysis", result="stale")
+            logger.info(f"[Cache] STALE HIT for {len(substances)} substances (versions {entry['versions']})")
+            schedule_refresh(substances, entry["result"].get("ai_status", "skipped") != "skipped")
+        return body
     except Exception as e:
-        print(f"[Cache] Error reading cache: {e}")
+        logger.error(f"[Cache] Error reading cache: {e}")
         return None
 
-def save_to_cache(substances: List[str], result: dict):
-    """결과를 캐시에 저장"""
+async def save_to_cache(substances: List[str], result: dict):
+    """결과를 캐시에 저장 (결과 저장소 + 메모리)"""
     try:
         cache_key = get_cache_key(substances)
-        cache_file = CACHE_DIR / f"{cache_key}.json"
 
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with span("cache_write", PIPELINE_STAGE_SECONDS, stage="cache_write"):
+            await run_blocking(
+                "cache_write", result_store.put, cache_key, result, None, RESULT_VERSIONS, cpu=True
+            )
+
+        ttl = result_store.ttl_seconds
+        remember_response(cache_key, encode_response(result), time.time() + ttl if ttl > 0 else None)
+        logger.info(f"[Cache] SAVED for {len(substances)} substances")
+    except Exception as e:
+        logger.error(f"[Cache] Error saving cache: {e}")
+
+def schedule_refresh(substances: List[str], use_ai: bool):
+    """캐시 항목 재생성 예약 (이미 진행 중인 키는 무시)"""
+    cache_key = get_cache_key(substances)
+    if cache_key in _refresh_tasks:
+        return
+    # 요청의 trace / 프로파일 / 로그 컨텍스트를 물려받지 않도록 빈 컨텍스트에서 실행
+    _refresh_tasks[cache_key] = asyncio.create_task(
+        refresh_cached_result(cache_key, list(substances), use_ai),
+        context=contextvars.Context()
+    )
+
+async def refresh_cached_result(cache_key: str, substances: List[str], use_ai: bool):
+    """오래된 캐시 항목을 하이브리드 파이프라인으로 다시 만들어 저장 (백그라운드)"""
+    try:
+        async with _refresh_semaphore:
+            bind_request_id(f"refresh-{cache_key[:12]}")
+            bind_cas_numbers(substances)
+            logger.info(f"[Cache] Refreshing entry for {len(substances)} substances")
+            result = await run_hybrid_pipeline(substances, use_ai)
+            await save_to_cache(substances, result)
+        CACHE_REFRESHES.inc(result="success")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # 실패하면 기존 항목을 계속 응답하고 다음 요청 때 다시 시도
+        CACHE_REFRESHES.inc(result="error")
+        logger.warning(f"[Cache] Refresh failed: {safe_error_message(e)}")
+    finally:
+        _refresh_tasks.pop(cache_key, None)
+
+def schedule_partial_completion(token: str, substances: List[str], use_ai: bool, pending_pairs: list):
+    """부분 결과로 응답한 요청의 전체 분석 예약 (같은 토큰이 진행 중이면 그대로 사용)"""
+    job = _partial_jobs.get(token)
+    if job is not None and not job["task"].done():
+        return
+    # 응답이 끝난 요청의 기한 / 취소 상태를 물려받지 않도록 빈 컨텍스트에서 실행
+    _partial_jobs[token] = {
+        "task": asyncio.create_task(
+            complete_partial_result(token, list(substances), use_ai),
+            context=contextvars.Context()
+        ),
+        "pending_pairs": pending_pairs,
+        "error": None
+    }
 
-        print(f"[Cache] SAVED for {len(substances)} substances")
+async def complete_partial_result(token: str, substances: List[str], use_ai: bool):
+    """남은 조합 크롤링 → 하이브리드 분석 → 캐시 저장 (GET /results/{token}에서 조회)"""
+    bind_request_id(f"partial-{token[:12]}")
+    bind_cas_numbers(substances)
+    try:
+        result = await run_hybrid_pipeline(substances, use_ai)
+        await save_to_cache(substances, result)
+        _partial_jobs.pop(token, None)
+        logger.info(f"[Partial] Result {token[:12]} complete")
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print(f"[Cache] Error saving cache: {e}")
+        error_msg = safe_error_message(e.detail if isinstance(e, HTTPException) else e)
+        _partial_jobs[token]["error"] = error_msg
+        logger.warning(f"[Partial] Result {token[:12]} failed: {error_msg}")
+
+async def start_partial_result(substances: List[str], use_ai: bool) -> Optional[dict]:
+    """
+    이미 아는 조합만으로 바로 응답할 부분 결과 + 나머지 조합 백그라운드 분석 예약
+    모든 조합을 알고 있거나(크롤링 없이 바로 끝남) 아는 조합이 없으면 None
+    """
+    missing = pair_store.missing_pairs(substances)
+    if not missing:
+        return None
+    missing_set = set(missing)
+    known = [pair for pair in itertools.combinations(substances, 2) if pair not in missing_set]
+    known_results = pair_store.results_for(known)
+    if not known_results:
+        return None
+
+    token = get_cache_key(substances)
+    pending_pairs = [list(pair) for pair in missing]
+    logger.info(f"[Partial] Answering from {len(known)} known pairs, {len(missing)} pending as {token[:12]}")
+    result = await run_blocking("build_partial_result", build_hybrid_result, known_results, False)
+    schedule_partial_completion(token, substances, use_ai, pending_pairs)
+    return {**result, "partial": True, "result_token": token, "pending_pairs": pending_pairs}
+
+async def import_legacy_cache():
+    """이전 형식(cache/<key>.json) 캐시 파일을 결과 저장소로 이전 (백그라운드)"""
+    try:
+        await asyncio.to_thread(result_store.import_legacy, CACHE_DIR)
+    except Exception as e:
+        logger.error(f"[Cache] Error importing legacy cache files: {e}")
+
+async def import_cache_snapshot(path: Path):
+    """캐시 스냅샷 가져오기 (서버 시작 시 백그라운드)"""
+    if not path.exists():
+        logger.warning(f"[Snapshot] {path} not found, starting with an empty cache")
+        _snapshot_import["status"] = "missing"
+        return
+    _snapshot_import["status"] = "importing"
+    try:
+        _snapshot_import["counts"] = await asyncio.to_thread(import_snapshot, path, pair_store, result_store)
+        _snapshot_import["status"] = "done"
+    except Exception as e:
+        logger.error(f"[Snapshot] Error importing {path}: {e}")
+        _snapshot_import["status"] = "error"
+
+def render_response(content: dict):
+    """프로파일링 중인 요청은 응답 직렬화도 프로파일에 포함 (그 외에는 FastAPI 기본 직렬화)"""
+    if current_profile() is None:
+        return content
+    with span("serialize", profile=True):
+        return JSONResponse(content=jsonable_encoder(content))
 
 # Helper function to safely encode error messages
 def safe_error_message(error: Exception) -> str:
@@ -98,27 +460,44 @@ def safe_error_message(error: Exception) -> str:
     except:
         return "An unknown error occurred during error processing"
 
-# Helper function to suppress Playwright output
-async def crawl_with_suppressed_output(substances: List[str]) -> list:
+async def crawl_cameo(substances: List[str], name_map: dict = None) -> list:
     """
-    Wrapper to suppress stdout/stderr during Playwright crawling
-    to prevent encoding errors with special characters
+    CAMEO 크롤링 + cameo_crawl 단계 시간 기록
+
+    크롤링 상세 로그는 DEBUG 레벨이며 인코딩 문제는 log_config에서 처리하므로
+    전역 stdout/stderr 교체 없이 동시 요청에서도 안전하게 실행
+
+    name_map: if given, filled with {substance: CAMEO name} for the pair store
     """
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
+    with span("cameo_crawl", PIPELINE_STAGE_SECONDS, stage="cameo_crawl"):
+        results = await crawl_cameo_sequential(substances, name_map=name_map)
+    traffic.note_used("crawler")
+    return results
 
-    try:
-        # Redirect output to nowhere
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
+async def crawl_within_deadline(substances: List[str], name_map: dict = None) -> tuple:
+    """
+    요청의 남은 기한 안에서 크롤링
+    기한을 넘기면 크롤링을 취소하고 PairStore에 이미 있는 쌍만으로 응답
 
-        # Run the crawl
-        results = await crawl_cameo_sequential(substances)
-        return results
-    finally:
-        # Always restore stdout/stderr
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+    Returns:
+        (CAMEO 결과, 결과가 빠진 CAS 쌍 목록)
+    """
+    try:
+        results = await asyncio.wait_for(crawl_cameo(substances, name_map=name_map), timeout=remaining())
+        return results, []
+    except asyncio.TimeoutError:
+        mark_exceeded("cameo_crawl")
+
+    missing = pair_store.missing_pairs(substances)
+    missing_set = set(missing)
+    known = [pair for pair in itertools.combinations(substances, 2) if pair not in missing_set]
+    logger.warning(f"[Deadline] Answering from {len(known)} known pairs, {len(missing)} pairs missing")
+    if not known:
+        raise HTTPException(
+            status_code=504,
+            detail="Deadline exceeded before any reactivity data was available"
+        )
+    return pair_store.results_for(known), missing
 
 # Request/Response 모델
 class Product(BaseModel):
@@ -128,6 +507,23 @@ class Product(BaseModel):
 class AnalysisRequest(BaseModel):
     useAi: bool = True
     products: List[Product]
+    deadlineSeconds: Optional[float] = None  # 전체 응답 기한 (없으면 REQUEST_DEADLINE_SECONDS)
+
+class ProductSet(BaseModel):
+    setId: str
+    products: List[Product]
+
+class BulkAnalysisRequest(BaseModel):
+    useAi: bool = False  # 세트마다 HF 요약 + Gemini 번역을 호출하므로 기본은 규칙 기반만
+    sets: List[ProductSet]
+    deadlineSeconds: Optional[float] = None
+
+class InventoryCreateRequest(BaseModel):
+    name: Optional[str] = None
+    products: List[Product] = []
+
+class InventoryProductsRequest(BaseModel):
+    products: List[Product]
 
 class AnalysisResponse(BaseModel):
     success: bool
@@ -137,6 +533,37 @@ class AnalysisResponse(BaseModel):
     error: Optional[str] = None
 
 
+def resolve_products(products: List[Product]) -> dict:
+    """
+    요청 제품들의 CAS 번호 정규화 + 중복 제거 (cas_number.canonicalize_products)
+    잘못된 번호가 하나라도 있으면 크롤링 전에 422로 거부
+    """
+    selection = canonicalize_products(p.model_dump() for p in products)
+    for cas, inputs in selection["inputs"].items():
+        CAS_INPUTS.inc(result="valid" if inputs[0]["input"] == cas else "normalized")
+        if len(inputs) > 1:
+            CAS_INPUTS.inc(len(inputs) - 1, result="duplicate")
+
+    if selection["invalid"]:
+        CAS_INPUTS.inc(len(selection["invalid"]), result="invalid")
+        logger.warning(f"[CAS] Rejected {len(selection['invalid'])} invalid CAS numbers: "
+                       f"{[item['input'] for item in selection['invalid']]}")
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Invalid CAS numbers", "invalid": selection["invalid"]}
+        )
+    if selection["normalized"]:
+        logger.info(f"[CAS] Normalized {sum(len(v) for v in selection['inputs'].values())} inputs "
+                    f"to {len(selection['cas_numbers'])} CAS numbers")
+    return selection
+
+def with_cas_inputs(content: dict, selection: dict) -> dict:
+    """입력이 정규화 / 중복 제거된 경우 응답에 표준 CAS → 원래 입력 대응 추가"""
+    if not selection["normalized"]:
+        return content
+    return {**content, "cas_inputs": selection["inputs"]}
+
+
 def call_ai_api(cameo_results: List[dict], timeout: int = 300) -> dict:  # 5분으로 증가
     """
     AI API 호출 (Hugging Face Spaces)
@@ -154,35 +581,39 @@ def call_ai_api(cameo_results: List[dict], timeout: int = 300) -> dict:  # 5분
             "error": "AI API URL not configured"
         }
 
+    requests = lazy_import("requests")
+    timeout = remaining(timeout)
+
     try:
-        print(f"[AI API] Calling AI API at {AI_API_URL}")
-        print(f"[AI API] Sending {len(cameo_results)} results")
+        logger.debug(f"[AI API] Calling AI API at {AI_API_URL}")
+        logger.debug(f"[AI API] Sending {len(cameo_results)} results")
 
         # AI 헬스 체크
-        print("[AI API] Checking AI service health...")
+        logger.debug("[AI API] Checking AI service health...")
         health_response = requests.get(
             f"{AI_API_URL}/health",
             timeout=5
         )
 
         if health_response.status_code != 200:
-            print(f"[AI API] [FAIL] Health check failed: {health_response.status_code}")
+            logger.warning(f"[AI API] [FAIL] Health check failed: {health_response.status_code}")
             return {
                 "success": False,
                 "error": "AI server not healthy"
             }
 
-        print("[AI API] [OK] Health check passed")
+        logger.debug("[AI API] [OK] Health check passed")
 
         # AI 분석 요청
-        print("[AI API] Sending analysis request...")
+        logger.debug("[AI API] Sending analysis request...")
         response = requests.post(
             f"{AI_API_URL}/analyze",
             json={"results": cameo_results},
             timeout=timeout
         )
 
-        print(f"[AI API] Response status: {response.status_code}")
+        logger.debug(f"[AI API] Response status: {response.status_code}")
+        traffic.note_used("hf_space")
 
         if response.status_code == 200:
             data = response.json()
@@ -193,7 +624,7 @@ def call_ai_api(cameo_results: List[dict], timeout: int = 300) -> dict:  # 5분
             }
         else:
             error_detail = response.text
-            print(f"[AI API] [ERROR] Error response: {error_detail}")
+            logger.error(f"[AI API] [ERROR] Error response: {error_detail}")
 
             # JSON 파싱 시도
             try:
@@ -215,21 +646,20 @@ def call_ai_api(cameo_results: List[dict], timeout: int = 300) -> dict:  # 5분
                 }
 
     except requests.exceptions.Timeout:
-        print("[AI API] [TIMEOUT] Request timeout")
+        AI_TIMEOUTS.inc(service="hf_analyze")
+        logger.warning("[AI API] [TIMEOUT] Request timeout")
         return {
             "success": False,
             "error": "AI API timeout (model might be loading)"
         }
     except requests.exceptions.ConnectionError as e:
-        print(f"[AI API] [CONNECTION ERROR]: {e}")
+        logger.warning(f"[AI API] [CONNECTION ERROR]: {e}")
         return {
             "success": False,
             "error": "Cannot connect to AI service (check if service is running)"
         }
     except Exception as e:
-        print(f"[AI API] [ERROR] Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[AI API] [ERROR] Unexpected error: {e}")
         return {
             "success": False,
             "error": str(e)
@@ -248,21 +678,54 @@ async def root():
     }
 
 
+def probe_ai_health(timeout: float = 3) -> str:
+    """AI 서비스 /health 확인 (블로킹 - 스레드에서 실행)"""
+    requests = lazy_import("requests")
+    try:
+        response = requests.get(f"{AI_API_URL}/health", timeout=timeout)
+        if response.status_code == 200:
+            return "connected"
+        return "error"
+    except:
+        return "unreachable"
+
+
+def ping_ai_service() -> bool:
+    """
+    keep-warm: HF Space /health 요청 (블로킹 - keep-warm 전용 스레드에서 실행)
+    잠든 Space는 이 요청으로 깨어남 → 결과를 /health의 ai_service 상태에도 반영
+    """
+    status = probe_ai_health(timeout=KEEP_WARM_HF_TIMEOUT_SECONDS)
+    _ai_health["status"] = status
+    _ai_health["checked_at"] = time.monotonic()
+    return status == "connected"
+
+
+async def _refresh_ai_health():
+    try:
+        _ai_health["status"] = await asyncio.to_thread(probe_ai_health)
+        _ai_health["checked_at"] = time.monotonic()
+    finally:
+        _ai_health["task"] = None
+
+
 @app.head("/health")
 @app.get("/health")
 async def health_check():
-    """상세 헬스 체크 (Uptime Robot 지원)"""
+    """
+    상세 헬스 체크 (Uptime Robot 지원)
+
+    AI 상태는 마지막 확인 결과를 바로 반환하고, 오래된 경우 백그라운드에서 갱신
+    (AI 서비스 응답을 기다리지 않으므로 cold start 직후에도 즉시 응답)
+    """
     ai_status = "not configured"
 
     if AI_API_URL:
-        try:
-            response = requests.get(f"{AI_API_URL}/health", timeout=3)
-            if response.status_code == 200:
-                ai_status = "connected"
-            else:
-                ai_status = "error"
-        except:
-            ai_status = "unreachable"
+        checked_at = _ai_health["checked_at"]
+        is_stale = checked_at is None or time.monotonic() - checked_at > HEALTH_AI_CACHE_SECONDS
+        if is_stale and _ai_health["task"] is None:
+            _ai_health["task"] = asyncio.create_task(_refresh_ai_health())
+        ai_status = _ai_health["status"]
 
     return {
         "status": "healthy",
@@ -271,6 +734,156 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    준비 상태 확인 (로드 밸런서 / Uptime 체크용)
+
+    /health는 프로세스가 살아있는지만 확인하고, /ready는 느린 경로
+    (크롤러 브라우저, 캐시, AI 클라이언트)가 준비되었을 때만 200 반환
+    """
+    crawler = browser_manager.status()
+    checks = {
+        "crawler": crawler["ready"],
+        "caches": (CACHE_DIR.exists() and pair_store.is_loaded
+                   and _snapshot_import["status"] not in ("pending", "importing")),
+        "ai_clients": "requests" in sys.modules and (not GEMINI_API_KEY or _gemini_configured)
+    }
+    # prewarm을 끈 경우 크롤러/AI 클라이언트는 첫 요청 때 준비되므로 캐시만 필수
+    required = ["caches", "crawler", "ai_clients"] if PREWARM_ENABLED else ["caches"]
+    ready = all(checks[name] for name in required)
+
+    body = {
+        "ready": ready,
+        "checks": checks,
+        "required": required,
+        "crawler": {**crawler, "prewarm_enabled": PREWARM_ENABLED},
+        "ai_api": _ai_health["status"] if AI_API_URL else "not configured"
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 메트릭 (단계별 지연시간, 캐시 hit/miss, 크롤링 실패, AI 타임아웃)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/startup-report")
+async def get_startup_report():
+    """Cold start 단계별 소요 시간 (import / 초기화 / 지연 import)"""
+    return startup_report()
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, download: bool = False,
+                      x_admin_token: Optional[str] = Header(None)):
+    """
+    저장된 요청 프로파일 조회 (관리자 전용)
+    - 기본: 요약 JSON (구간별 시간, 크롤링 단계, 누적 시간 상위 함수)
+    - download=true: pstats 파일 (snakeviz / pstats로 분석)
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    if download:
+        path = profile_stats_path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+    summary = await asyncio.to_thread(load_profile, profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+
+@app.get("/results/{token}")
+async def get_partial_result(token: str):
+    """
+    ?partial=true 요청의 result_token으로 전체 분석 결과 조회
+
+    Returns:
+        {"success": true, "status": "pending", "pending_pairs": [...]}  분석 중
+        {"success": true, "status": "done", "result": {...}}            /hybrid-analyze와 같은 결과
+        {"success": false, "status": "error", "error": "..."}           분석 실패 (같은 요청을 다시 보내면 재시도)
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", token):
+        raise HTTPException(status_code=404, detail="Unknown result token")
+
+    job = _partial_jobs.get(token)
+    if job is not None and not job["task"].done():
+        return {"success": True, "status": "pending", "pending_pairs": job["pending_pairs"]}
+    if job is not None and job["error"]:
+        return {"success": False, "status": "error", "error": job["error"]}
+
+    body = memory_tier.get(token)
+    if body is None:
+        entry = await run_blocking("cache_read", result_store.get_entry, token, cpu=True)
+        if entry is None:
+            # 다른 워커에서 진행 중인 작업은 보이지 않음 (완료되면 공유 저장소에서 조회됨)
+            raise HTTPException(status_code=404, detail="Unknown result token")
+        body = encode_response(entry["result"])
+    # 캐시된 bytes를 그대로 감싸서 응답 (재직렬화 없음)
+    return Response(content=b'{"success":true,"status":"done","result":' + body + b"}",
+                    media_type="application/json")
+
+
+@app.get("/admin/cache")
+async def get_cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """분석 결과 캐시 상태 (관리자 전용) - 메모리 캐시 hit ratio + 결과 저장소 크기"""
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    return {
+        "memory": memory_tier.stats(),
+        "store": await asyncio.to_thread(result_store.stats),
+        "snapshot_import": _snapshot_import
+    }
+
+
+@app.get("/admin/cache/snapshot")
+async def download_cache_snapshot(x_admin_token: Optional[str] = Header(None)):
+    """전체 캐시(조합 결과 + 분석 결과 + AI 요약)를 스냅샷 파일로 내려받기 (관리자 전용)"""
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    fd, tmp_name = tempfile.mkstemp(suffix=".jsonl.gz")
+    os.close(fd)
+    path = Path(tmp_name)
+    try:
+        await asyncio.to_thread(export_snapshot, path, pair_store, result_store)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    filename = f"cache-snapshot-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+    return FileResponse(path, media_type="application/gzip", filename=filename,
+                        background=BackgroundTask(path.unlink, missing_ok=True))
+
+
+@app.post("/admin/cache/snapshot")
+async def upload_cache_snapshot(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """
+    스냅샷 파일 가져오기 (관리자 전용) - 요청 본문을 임시 파일로 받은 뒤 한 줄씩 병합
+    curl --data-binary @cache.jsonl.gz -H "X-Admin-Token: ..." /admin/cache/snapshot
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    fd, tmp_name = tempfile.mkstemp(suffix=".jsonl.gz")
+    path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                await asyncio.to_thread(f.write, chunk)
+        counts = await asyncio.to_thread(import_snapshot, path, pair_store, result_store)
+    except (SnapshotError, OSError, EOFError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot: {e}")
+    finally:
+        path.unlink(missing_ok=True)
+    return {"success": True, "imported": counts}
+
+
 @app.post("/set-ai-url")
 async def set_ai_url(url: str):
     """
@@ -279,6 +892,8 @@ async def set_ai_url(url: str):
     """
     global AI_API_URL
     AI_API_URL = url.rstrip('/')
+    _ai_health["status"] = "checking"
+    _ai_health["checked_at"] = None
     return {
         "success": True,
         "message": f"AI API URL updated to: {AI_API_URL}"
@@ -297,11 +912,11 @@ async def analyze_chemicals(request: AnalysisRequest):
         CAMEO 크롤링 결과 + AI 분석 (선택)
     """
     try:
-        print(f"[API] Analyzing {len(request.substances)} substances...")
+        logger.info(f"[API] Analyzing {len(request.substances)} substances...")
 
         # 1. CAMEO 크롤링
-        print("[API] Starting CAMEO crawling...")
-        cameo_results = await crawl_with_suppressed_output(request.substances)
+        logger.debug("[API] Starting CAMEO crawling...")
+        cameo_results = await crawl_cameo(request.substances)
 
         if not cameo_results:
             raise HTTPException(
@@ -309,7 +924,7 @@ async def analyze_chemicals(request: AnalysisRequest):
                 detail="No reactivity data found for given substances"
             )
 
-        print(f"[API] CAMEO crawling complete. Found {len(cameo_results)} pairs.")
+        logger.info(f"[API] CAMEO crawling complete. Found {len(cameo_results)} pairs.")
 
         ai_analysis = None
         ai_status = "skipped"
@@ -317,19 +932,20 @@ async def analyze_chemicals(request: AnalysisRequest):
         # 2. AI 분석 (선택사항)
         if request.use_ai:
             if not AI_API_URL:
-                print("[API] Warning: AI API URL not set. Skipping AI analysis.")
+                logger.warning("[API] Warning: AI API URL not set. Skipping AI analysis.")
                 ai_status = "unavailable"
             else:
-                print("[API] Starting AI analysis via Hugging Face...")
-                ai_response = call_ai_api(cameo_results)
+                logger.info("[API] Starting AI analysis via Hugging Face...")
+                with span("hf_analyze", PIPELINE_STAGE_SECONDS, stage="hf_analyze"):
+                    ai_response = call_ai_api(cameo_results)
 
                 if ai_response.get("success"):
                     ai_analysis = ai_response.get("analysis", "")
                     ai_status = "success"
-                    print("[API] AI analysis complete.")
+                    logger.info("[API] AI analysis complete.")
                 else:
                     error_msg = ai_response.get("error", "Unknown error")
-                    print(f"[API] AI analysis failed: {error_msg}")
+                    logger.warning(f"[API] AI analysis failed: {error_msg}")
                     ai_analysis = f"AI analysis unavailable: {error_msg}"
                     ai_status = "error"
 
@@ -343,7 +959,7 @@ async def analyze_chemicals(request: AnalysisRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] Error: {e}")
+        logger.exception(f"[API] Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -359,9 +975,10 @@ async def analyze_from_json(cameo_results: List[dict]):
                 detail="AI API URL not configured"
             )
 
-        print(f"[API] Analyzing {len(cameo_results)} pre-crawled results...")
+        logger.info(f"[API] Analyzing {len(cameo_results)} pre-crawled results...")
 
-        ai_response = call_ai_api(cameo_results)
+        with span("hf_analyze", PIPELINE_STAGE_SECONDS, stage="hf_analyze"):
+            ai_response = call_ai_api(cameo_results)
 
         if ai_response.get("success"):
             return {
@@ -377,12 +994,12 @@ async def analyze_from_json(cameo_results: List[dict]):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] Error: {e}")
+        logger.exception(f"[API] Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/simple-analyze")
-async def simple_analyze_endpoint(request: AnalysisRequest):
+async def simple_analyze_endpoint(request: AnalysisRequest, http_request: Request, timings: bool = False):
     """
     간단 분석 (AI 없이 규칙 기반만)
 
@@ -405,11 +1022,25 @@ async def simple_analyze_endpoint(request: AnalysisRequest):
         }
     """
     try:
-        print(f"[Simple] Analyzing {len(request.substances)} substances...")
+        selection = resolve_products(request.products)
+        all_cas_numbers = selection["cas_numbers"]
+        bind_cas_numbers(all_cas_numbers)
 
-        # CAMEO 크롤링
-        print("[Simple] Starting CAMEO crawling...")
-        cameo_results = await crawl_with_suppressed_output(request.substances)
+        logger.info(f"[Simple] Analyzing {len(all_cas_numbers)} substances...")
+
+        # CAMEO 크롤링 (캐시에 남지 않으므로 클라이언트가 떠나면 항상 중단)
+        logger.debug("[Simple] Starting CAMEO crawling...")
+        async def crawl():
+            cameo_results, missing_pairs = await crawl_within_deadline(all_cas_numbers)
+            return cameo_results, missing_pairs, deadline_exceeded()
+
+        try:
+            cameo_results, missing_pairs, exceeded = await run_until_disconnect(
+                http_request, crawl(), endpoint="simple", policy="abort",
+                deadline_seconds=resolve_deadline(request.deadlineSeconds)
+            )
+        except RequestCancelled:
+            return Response(status_code=499)
 
         if not cameo_results:
             raise HTTPException(
@@ -417,29 +1048,164 @@ async def simple_analyze_endpoint(request: AnalysisRequest):
                 detail="No reactivity data found from CAMEO"
             )
 
-        print(f"[Simple] CAMEO found {len(cameo_results)} pairs")
+        logger.info(f"[Simple] CAMEO found {len(cameo_results)} pairs")
 
         # 간단 분석 (AI 없이 규칙만)
-        print("[Simple] Analyzing with rules...")
-        analysis_result = analyze_simple(cameo_results)
+        logger.debug("[Simple] Analyzing with rules...")
+        with span("analyze_simple", PIPELINE_STAGE_SECONDS, profile=True, stage="analyze_simple"):
+            analysis_result = analyze_simple(cameo_results)
 
-        print(f"[Simple] Complete: {analysis_result['summary']['overall_status']}")
+        logger.info(f"[Simple] Complete: {analysis_result['summary']['overall_status']}")
 
-        return {
+        response = with_cas_inputs({
             "success": True,
             **analysis_result
-        }
+        }, selection)
+        if exceeded:
+            response["deadline_exceeded"] = exceeded
+            response["missing_pairs"] = [list(pair) for pair in missing_pairs]
+        if timings:
+            response["timings"] = current_timings()
+        return render_response(response)
 
     except HTTPException:
         raise
     except Exception as e:
         error_msg = safe_error_message(e)
-        print(f"[Simple] Error: {error_msg}")
+        logger.exception(f"[Simple] Error: {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
 
 
+async def run_hybrid_pipeline(all_cas_numbers: List[str], use_ai: bool) -> dict:
+    """
+    하이브리드 분석 파이프라인 (크롤링 → 규칙 기반 분석 → AI 요약/번역 → 안전 링크 / 분리 보관 그룹)
+    /hybrid-analyze 요청과 캐시 백그라운드 재생성에서 함께 사용
+    """
+    # 1. CAMEO 크롤링 (모든 조합이 PairStore에 있으면 생략 - 다른 요청 / 워커가 이미 크롤링한 경우)
+    unique_cas = list(dict.fromkeys(all_cas_numbers))
+    missing_pairs = []
+    if len(unique_cas) > 1 and not pair_store.missing_pairs(unique_cas):
+        logger.info(f"[Hybrid] All {len(unique_cas)} substances' pairs already known, no crawl needed")
+        cameo_results = pair_store.results_for(itertools.combinations(unique_cas, 2))
+    else:
+        logger.debug("[Hybrid] Step 1: CAMEO crawling...")
+        name_map = {}
+        cameo_results, missing_pairs = await crawl_within_deadline(unique_cas, name_map=name_map)
+        if not missing_pairs:
+            await asyncio.to_thread(pair_store.record_crawl, unique_cas, cameo_results, name_map)
+
+    if not cameo_results:
+        raise HTTPException(
+            status_code=404,
+            detail="No reactivity data found from CAMEO"
+        )
+
+    logger.info(f"[Hybrid] CAMEO found {len(cameo_results)} pairs")
+    if use_ai and is_abandoned():
+        # 클라이언트가 떠났지만 캐시를 위해 계속 실행 중 → AI 단계는 백그라운드 재생성 순서로 (대기 중인 사용자 요청 우선)
+        async with _refresh_semaphore:
+            result = await run_blocking("build_hybrid_result", build_hybrid_result, cameo_results, use_ai)
+    else:
+        # AI 호출은 블로킹이므로 스레드에서 실행 (이벤트 루프가 연결 끊김 감지 / 다른 요청 처리)
+        result = await run_blocking("build_hybrid_result", build_hybrid_result, cameo_results, use_ai)
+
+    if missing_pairs:
+        # 기한 안에 크롤링하지 못해 결과에 빠진 조합
+        result["missing_pairs"] = [list(pair) for pair in missing_pairs]
+    return result
+
+
+def build_hybrid_result(cameo_results: list, use_ai: bool) -> dict:
+    """
+    CAMEO 결과 → 하이브리드 분석 결과 (규칙 기반 분석 → AI 요약/번역 → 안전 링크 / 분리 보관 그룹)
+    precache_common_substances.py는 PairStore에 모인 결과로 직접 호출
+    """
+    # 2. 규칙 기반 분석
+    logger.debug("[Hybrid] Step 2: Rule-based classification...")
+    with span("analyze_simple", PIPELINE_STAGE_SECONDS, profile=True, stage="analyze_simple"):
+        analysis_result = analyze_simple(cameo_results)
+    logger.info(f"[Hybrid] Classification: {analysis_result['summary']['overall_status']}")
+
+    ai_summary_en = None
+    ai_summary_ko = None
+    ai_status = "skipped"
+
+    # 3. AI 요약 (선택사항)
+    if use_ai:
+        check_cancelled()
+        if not AI_API_URL:
+            logger.warning("[Hybrid] Warning: AI API not configured")
+            ai_status = "unavailable"
+        elif not has_budget():
+            # 기한이 얼마 남지 않음 → AI 없이 규칙 기반 결과만 응답
+            mark_exceeded("hf_summary")
+            ai_status = "deadline_exceeded"
+        else:
+            logger.debug("[Hybrid] Step 3: AI summarization via Hugging Face...")
+
+            # AI에게 분석 결과를 보내서 요약문 생성 (영어)
+            with span("hf_summary", PIPELINE_STAGE_SECONDS, stage="hf_summary"):
+                ai_response = call_ai_api_for_summary(analysis_result)
+
+            if ai_response.get("success"):
+                ai_summary_en = ai_response.get("analysis", "")
+                logger.info("[Hybrid] AI summary (EN) complete")
+
+                # Step 4: Gemini로 친근한 한국어 번역
+                check_cancelled()
+                logger.debug("[Hybrid] Step 4: Translating to friendly Korean via Gemini...")
+                with span("gemini_translation", PIPELINE_STAGE_SECONDS, stage="gemini_translation"):
+                    translation_response = translate_with_gemini(ai_summary_en, analysis_result)
+
+                if translation_response.get("success"):
+                    ai_summary_ko = translation_response.get("translation", "")
+                    ai_status = "success"
+                    logger.info("[Hybrid] Translation complete")
+                else:
+                    error_msg = translation_response.get("error", "Unknown error")
+                    logger.warning(f"[Hybrid] Translation failed: {error_msg}")
+                    ai_summary_ko = f"Translation unavailable: {error_msg}"
+                    ai_status = "partial"  # 영어 요약은 성공, 번역은 실패
+            else:
+                error_msg = ai_response.get("error", "Unknown error")
+                logger.warning(f"[Hybrid] AI summary failed: {error_msg}")
+                ai_summary_en = f"AI summary unavailable: {error_msg}"
+                ai_status = "error"
+
+    # 간단한 응답 형식 (백엔드용)
+    simple_response = {
+        "risk_level": analysis_result.get("summary", {}).get("overall_status", "알 수 없음"),
+        "message": ai_summary_ko if ai_summary_ko else analysis_result.get("summary", {}).get("message", "")
+    }
+
+    # 안전 정보 링크 수집 (위험/주의 조합에 대해서만)
+    with span("safety_links", profile=True):
+        safety_links = get_all_links_for_analysis(
+            analysis_result.get("dangerous_pairs", []),
+            analysis_result.get("caution_pairs", [])
+        )
+
+    # 분리 보관 그룹
+    with span("storage_plan", profile=True):
+        storage_plan = plan_for_analysis(analysis_result)
+
+    # 최종 결과
+    final_result = {
+        "success": True,
+        "rule_based_analysis": analysis_result,
+        "ai_summary_english": ai_summary_en,
+        "ai_summary_korean": ai_summary_ko,
+        "ai_status": ai_status,
+        "simple_response": simple_response,  # 간단한 형식 추가
+        "safety_links": safety_links,  # 안전 정보 링크 추가
+        "storage_plan": storage_plan  # 분리 보관 그룹
+    }
+    return final_result
+
+
 @app.post("/hybrid-analyze")
-async def hybrid_analyze_endpoint(request: AnalysisRequest):
+async def hybrid_analyze_endpoint(request: AnalysisRequest, http_request: Request, timings: bool = False,
+                                  partial: bool = False):
     """
     하이브리드 분석 (규칙 기반 + AI 요약)
 
@@ -475,110 +1241,305 @@ async def hybrid_analyze_endpoint(request: AnalysisRequest):
         }
     """
     try:
-        # products 배열에서 모든 CAS 번호 추출
-        all_cas_numbers = []
-        for product in request.products:
-            all_cas_numbers.extend(product.casNumbers)
+        # products 배열에서 모든 CAS 번호 추출 (표준 형식, 제품 간 중복 제거)
+        selection = resolve_products(request.products)
+        all_cas_numbers = selection["cas_numbers"]
+        bind_cas_numbers(all_cas_numbers)
 
-        print(f"[Hybrid] Analyzing {len(all_cas_numbers)} CAS numbers from {len(request.products)} products...")
+        logger.info(f"[Hybrid] Analyzing {len(all_cas_numbers)} CAS numbers from {len(request.products)} products...")
 
         # 0. 캐시 확인
-        cached_result = get_cached_result(all_cas_numbers)
-        if cached_result:
-            print("[Hybrid] Returning cached result!")
-            return cached_result
-
-        # 1. CAMEO 크롤링
-        print("[Hybrid] Step 1: CAMEO crawling...")
-        cameo_results = await crawl_with_suppressed_output(all_cas_numbers)
-
-        if not cameo_results:
-            raise HTTPException(
-                status_code=404,
-                detail="No reactivity data found from CAMEO"
+        cached_body = await get_cached_response(all_cas_numbers)
+        if cached_body is not None:
+            logger.info("[Hybrid] Returning cached result!")
+            if timings:
+                return render_response({
+                    **with_cas_inputs(json.loads(cached_body), selection), "timings": current_timings()
+                })
+            if selection["normalized"]:
+                return render_response(with_cas_inputs(json.loads(cached_body), selection))
+            # 인코딩된 bytes 그대로 응답 (파싱/재직렬화 없음)
+            return Response(content=cached_body, media_type="application/json")
+
+        # ?partial=true: 아는 조합의 분류를 바로 응답하고 나머지는 백그라운드로 (result_token으로 조회)
+        if partial:
+            partial_result = await start_partial_result(all_cas_numbers, request.useAi)
+            if partial_result is not None:
+                if timings:
+                    partial_result["timings"] = current_timings()
+                return render_response(with_cas_inputs(partial_result, selection))
+
+        async def analyze_and_cache():
+            final_result = await run_hybrid_pipeline(all_cas_numbers, request.useAi)
+            exceeded = deadline_exceeded()
+            if exceeded:
+                # 기한 때문에 일부 단계가 빠진 결과는 캐시하지 않음 (다음 요청은 전체 분석)
+                return {**final_result, "deadline_exceeded": exceeded}
+            # 캐시에 저장
+            await save_to_cache(all_cas_numbers, final_result)
+            return final_result
+
+        # 클라이언트가 떠나면 ABANDONED_REQUEST_POLICY에 따라 백그라운드로 마치거나(finish) 중단(abort)
+        try:
+            final_result = await run_until_disconnect(
+                http_request, analyze_and_cache(), endpoint="hybrid",
+                deadline_seconds=resolve_deadline(request.deadlineSeconds)
             )
+        except RequestCancelled:
+            return Response(status_code=499)
 
-        print(f"[Hybrid] CAMEO found {len(cameo_results)} pairs")
+        if timings:
+            return render_response({**with_cas_inputs(final_result, selection), "timings": current_timings()})
+        return render_response(with_cas_inputs(final_result, selection))
 
-        # 2. 규칙 기반 분석
-        print("[Hybrid] Step 2: Rule-based classification...")
-        analysis_result = analyze_simple(cameo_results)
-        print(f"[Hybrid] Classification: {analysis_result['summary']['overall_status']}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = safe_error_message(e)
+        logger.exception(f"[Hybrid] Error: {error_msg}")
+        raise HTTPException(status_code=500, detail=error_msg)
 
-        ai_summary_en = None
-        ai_summary_ko = None
-        ai_status = "skipped"
 
-        # 3. AI 요약 (선택사항)
-        if request.useAi:
-            if not AI_API_URL:
-                print("[Hybrid] Warning: AI API not configured")
-                ai_status = "unavailable"
-            else:
-                print("[Hybrid] Step 3: AI summarization via Hugging Face...")
+async def crawl_bulk_sessions(sessions: List[List[str]]) -> int:
+    """계획된 세션 크롤링 → PairStore 기록 (동시에 BULK_CRAWL_CONCURRENCY개까지), 실패한 세션 수 반환"""
+    semaphore = asyncio.Semaphore(BULK_CRAWL_CONCURRENCY)
+    failed = 0
 
-                # AI에게 분석 결과를 보내서 요약문 생성 (영어)
-                ai_response = call_ai_api_for_summary(analysis_result)
+    async def run(session: List[str]):
+        nonlocal failed
+        async with semaphore:
+            name_map = {}
+            try:
+                results = await asyncio.wait_for(crawl_cameo(session, name_map=name_map), timeout=remaining())
+            except asyncio.TimeoutError:
+                mark_exceeded("cameo_crawl")
+                failed += 1
+                return
+            except Exception as e:
+                logger.warning(f"[Bulk] Session of {len(session)} substances failed: {safe_error_message(e)}")
+                failed += 1
+                return
+            await asyncio.to_thread(pair_store.record_crawl, session, results, name_map)
+
+    await asyncio.gather(*(run(session) for session in sessions))
+    return failed
+
+
+def bulk_set_result(set_id: str, result: dict, cached: bool) -> dict:
+    return {
+        "setId": set_id,
+        "success": True,
+        "cached": cached,
+        "summary": result.get("rule_based_analysis", {}).get("summary", {}),
+        "result": result
+    }
 
-                if ai_response.get("success"):
-                    ai_summary_en = ai_response.get("analysis", "")
-                    print("[Hybrid] AI summary (EN) complete")
 
-                    # Step 4: Gemini로 친근한 한국어 번역
-                    print("[Hybrid] Step 4: Translating to friendly Korean via Gemini...")
-                    translation_response = translate_with_gemini(ai_summary_en, analysis_result)
+async def run_bulk_analysis(sets: List[ProductSet], use_ai: bool, deadline_seconds: Optional[float] = None) -> dict:
+    """
+    여러 제품 세트 일괄 분석
 
-                    if translation_response.get("success"):
-                        ai_summary_ko = translation_response.get("translation", "")
-                        ai_status = "success"
-                        print("[Hybrid] Translation complete")
-                    else:
-                        error_msg = translation_response.get("error", "Unknown error")
-                        print(f"[Hybrid] Translation failed: {error_msg}")
-                        ai_summary_ko = f"Translation unavailable: {error_msg}"
-                        ai_status = "partial"  # 영어 요약은 성공, 번역은 실패
-                else:
-                    error_msg = ai_response.get("error", "Unknown error")
-                    print(f"[Hybrid] AI summary failed: {error_msg}")
-                    ai_summary_en = f"AI summary unavailable: {error_msg}"
-                    ai_status = "error"
+    1. 세트별 CAS 정규화 + 캐시 확인 (캐시된 세트는 그대로 사용)
+    2. 나머지 세트들에 필요한 CAS 쌍 중 PairStore에 없는 쌍만 모아 최소한의 세션으로 크롤링
+       (클라이언트가 기한을 지정하지 않았으면 차례로 실행할 세션 수만큼 기본 기한을 늘림)
+    3. PairStore 결과로 세트별 하이브리드 분석 (빠진 쌍이 없는 결과만 캐시에 저장)
+    """
+    outcomes = [None] * len(sets)
+    pending = {}  # 캐시 키 -> (CAS 목록, [(세트 번호, setId, 정규화 정보)]) - 같은 물질 구성은 한 번만 분석
 
-        # 간단한 응답 형식 (백엔드용)
-        simple_response = {
-            "risk_level": analysis_result.get("summary", {}).get("overall_status", "알 수 없음"),
-            "message": ai_summary_ko if ai_summary_ko else analysis_result.get("summary", {}).get("message", "")
+    for index, product_set in enumerate(sets):
+        try:
+            selection = resolve_products(product_set.products)
+        except HTTPException as e:
+            outcomes[index] = {"setId": product_set.setId, "success": False, "error": e.detail}
+            continue
+        cas_numbers = selection["cas_numbers"]
+        if len(cas_numbers) < 2:
+            outcomes[index] = {"setId": product_set.setId, "success": False,
+                               "error": "At least 2 substances are required"}
+            continue
+
+        cached_body = await get_cached_response(cas_numbers)
+        if cached_body is not None:
+            cached = with_cas_inputs(json.loads(cached_body), selection)
+            outcomes[index] = bulk_set_result(product_set.setId, cached, cached=True)
+            continue
+        key = get_cache_key(cas_numbers)
+        pending.setdefault(key, (cas_numbers, []))[1].append((index, product_set.setId, selection))
+
+    # 세트들의 합집합에서 아직 모르는 쌍만 크롤링
+    pairs = required_pairs(cas_numbers for cas_numbers, _ in pending.values())
+    missing = [pair for pair in pairs if not pair_store.is_known(*pair)]
+    sessions = plan_sessions(missing, BULK_SESSION_SIZE)
+    logger.info(f"[Bulk] {len(sets)} sets, {len(pending)} to analyze: {len(pairs)} pairs needed, "
+                f"{len(missing)} unknown → {len(sessions)} crawl sessions")
+    if not deadline_seconds:
+        rounds = math.ceil(len(sessions) / max(1, BULK_CRAWL_CONCURRENCY))
+        extend_deadline(resolve_deadline(None) * max(1, rounds))
+    failed_sessions = await crawl_bulk_sessions(sessions)
+
+    for cas_numbers, members in pending.values():
+        set_pairs = list(itertools.combinations(cas_numbers, 2))
+        set_missing = [list(pair) for pair in set_pairs if not pair_store.is_known(*pair)]
+        results = pair_store.results_for(set_pairs)
+        if not results:
+            error = "Crawl failed for this set" if set_missing else "No reactivity data found from CAMEO"
+            for index, set_id, _ in members:
+                outcomes[index] = {"setId": set_id, "success": False, "error": error, "missing_pairs": set_missing}
+            continue
+
+        check_cancelled()
+        result = await run_blocking("build_hybrid_result", build_hybrid_result, results, use_ai)
+        if set_missing:
+            result["missing_pairs"] = set_missing
+        elif not deadline_exceeded():
+            await save_to_cache(cas_numbers, result)
+        for index, set_id, selection in members:
+            outcomes[index] = bulk_set_result(set_id, with_cas_inputs(result, selection), cached=False)
+
+    response = {
+        "success": True,
+        "sets": outcomes,
+        "crawl": {
+            "pairs_needed": len(pairs),
+            "pairs_crawled": len(missing),
+            "sessions": len(sessions),
+            "failed_sessions": failed_sessions
         }
+    }
+    exceeded = deadline_exceeded()
+    if exceeded:
+        response["deadline_exceeded"] = exceeded
+    return response
 
-        # 안전 정보 링크 수집 (위험/주의 조합에 대해서만)
-        safety_links = get_all_links_for_analysis(
-            analysis_result.get("dangerous_pairs", []),
-            analysis_result.get("caution_pairs", [])
-        )
 
-        # 최종 결과
-        final_result = {
-            "success": True,
-            "rule_based_analysis": analysis_result,
-            "ai_summary_english": ai_summary_en,
-            "ai_summary_korean": ai_summary_ko,
-            "ai_status": ai_status,
-            "simple_response": simple_response,  # 간단한 형식 추가
-            "safety_links": safety_links  # 안전 정보 링크 추가
+@app.post("/bulk-analyze")
+async def bulk_analyze_endpoint(request: BulkAnalysisRequest, http_request: Request, timings: bool = False):
+    """
+    여러 제품 세트(장바구니 / 보관 창고 등) 일괄 분석
+
+    세트마다 /hybrid-analyze를 호출하는 대신 모든 세트의 물질 합집합에서
+    아직 모르는 쌍만 최소한의 세션으로 한 번에 크롤링하고 세트별 결과로 나눠 응답
+
+    Input Format:
+        {
+            "useAi": false,
+            "sets": [
+                {"setId": "basket-1", "products": [{"productName": "...", "casNumbers": [...]}]},
+                ...
+            ]
         }
 
-        # 캐시에 저장
-        save_to_cache(all_cas_numbers, final_result)
+    Returns:
+        {
+            "success": true,
+            "sets": [{"setId": "basket-1", "success": true, "cached": false, "summary": {...}, "result": {...}}],
+            "crawl": {"pairs_needed": 435, "pairs_crawled": 120, "sessions": 2, "failed_sessions": 0}
+        }
+    """
+    if not request.sets:
+        raise HTTPException(status_code=400, detail="At least 1 set is required")
+    if len(request.sets) > BULK_MAX_SETS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_SETS} sets per request")
 
-        return final_result
+    try:
+        logger.info(f"[Bulk] Analyzing {len(request.sets)} sets...")
+        try:
+            response = await run_until_disconnect(
+                http_request, run_bulk_analysis(request.sets, request.useAi, request.deadlineSeconds),
+                endpoint="bulk",
+                deadline_seconds=resolve_deadline(request.deadlineSeconds)
+            )
+        except RequestCancelled:
+            return Response(status_code=499)
+
+        if timings:
+            response["timings"] = current_timings()
+        return render_response(response)
 
     except HTTPException:
         raise
     except Exception as e:
         error_msg = safe_error_message(e)
-        print(f"[Hybrid] Error: {error_msg}")
+        logger.exception(f"[Bulk] Error: {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
 
 
+@app.post("/inventories")
+async def create_inventory(request: InventoryCreateRequest):
+    """
+    상시 재고 생성 (products를 함께 보내면 바로 추가)
+    """
+    try:
+        products = resolve_products(request.products)["products"]
+        inventory = await inventory_manager.create(request.name)
+        if products:
+            inventory = await inventory_manager.add_products(inventory["inventory_id"], products, crawl_cameo)
+        return {"success": True, "inventory": inventory}
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = safe_error_message(e)
+        logger.exception(f"[Inventory] Error: {error_msg}")
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+@app.get("/inventories/{inventory_id}")
+async def get_inventory(inventory_id: str):
+    """
+    재고의 현재 분석 결과 조회 (크롤링 없음)
+    """
+    try:
+        inventory = await asyncio.to_thread(inventory_manager.get, inventory_id)
+    except InventoryNotFound:
+        raise HTTPException(status_code=404, detail="Inventory not found")
+
+    analysis = inventory["analysis"]
+    return {
+        "success": True,
+        "inventory": inventory,
+        "safety_links": get_all_links_for_analysis(
+            analysis.get("dangerous_pairs", []),
+            analysis.get("caution_pairs", [])
+        ),
+        "storage_plan": plan_for_analysis(analysis)
+    }
+
+
+@app.post("/inventories/{inventory_id}/products")
+async def add_inventory_products(inventory_id: str, request: InventoryProductsRequest):
+    """
+    재고에 제품 추가 - 새 물질이 만드는 조합만 크롤링/분석
+    """
+    try:
+        inventory = await inventory_manager.add_products(
+            inventory_id,
+            resolve_products(request.products)["products"],
+            crawl_cameo
+        )
+        return {"success": True, "inventory": inventory}
+    except HTTPException:
+        raise
+    except InventoryNotFound:
+        raise HTTPException(status_code=404, detail="Inventory not found")
+    except Exception as e:
+        error_msg = safe_error_message(e)
+        logger.exception(f"[Inventory] Error: {error_msg}")
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+@app.delete("/inventories/{inventory_id}/products/{product_name}")
+async def remove_inventory_product(inventory_id: str, product_name: str):
+    """
+    재고에서 제품 삭제 - 해당 물질의 조합만 분석 결과에서 제거
+    """
+    try:
+        inventory = await inventory_manager.remove_product(inventory_id, product_name)
+        return {"success": True, "inventory": inventory}
+    except InventoryNotFound:
+        raise HTTPException(status_code=404, detail="Inventory or product not found")
+
+
 def call_ai_api_for_summary(analysis_result: dict, timeout: int = 240) -> dict:
     """
     AI API 호출 - AI 요약용 (Hugging Face Spaces)
@@ -591,8 +1552,11 @@ def call_ai_api_for_summary(analysis_result: dict, timeout: int = 240) -> dict:
             "error": "AI API URL not configured"
         }
 
+    requests = lazy_import("requests")
+    limit, timeout = timeout, remaining(timeout)
+
     try:
-        print(f"[AI-Summary] Calling AI service for summary...")
+        logger.debug(f"[AI-Summary] Calling AI service for summary...")
 
         # 분석 결과를 프롬프트로 변환
         summary = analysis_result.get("summary", {})
@@ -624,7 +1588,8 @@ Caution Pairs: {summary.get('caution_count', 0)}
             timeout=timeout
         )
 
-        print(f"[AI-Summary] Response status: {response.status_code}")
+        logger.debug(f"[AI-Summary] Response status: {response.status_code}")
+        traffic.note_used("hf_space")
 
         if response.status_code == 200:
             data = response.json()
@@ -642,12 +1607,15 @@ Caution Pairs: {summary.get('caution_count', 0)}
             }
 
     except requests.exceptions.Timeout:
+        AI_TIMEOUTS.inc(service="hf_summary")
+        if timeout < limit:
+            mark_exceeded("hf_summary")
         return {
             "success": False,
             "error": "AI API timeout"
         }
     except Exception as e:
-        print(f"[AI-Summary] Error: {e}")
+        logger.error(f"[AI-Summary] Error: {e}")
         return {
             "success": False,
             "error": str(e)
@@ -681,11 +1649,18 @@ def translate_with_gemini(english_text: str, analysis_result: dict, retries: int
     caution_pairs = analysis_result.get("caution_pairs", [])
 
     for attempt in range(1, retries + 1):
+        check_cancelled()
+        if not has_budget():
+            mark_exceeded("gemini_translation")
+            return {
+                "success": False,
+                "error": "Request deadline exceeded"
+            }
         try:
-            print(f"[Gemini] Translating ({len(english_text)} chars)... [Attempt {attempt}/{retries}]")
+            logger.info(f"[Gemini] Translating ({len(english_text)} chars)... [Attempt {attempt}/{retries}]")
 
             # 최신 Gemini 모델 (2025 기준)
-            model = genai.GenerativeModel("gemini-2.5-flash")
+            model = get_genai().GenerativeModel("gemini-2.5-flash")
 
             # 위험한 조합 정보 포맷팅
             dangerous_info = json.dumps(
@@ -771,7 +1746,10 @@ Korean message (FRIENDLY TONE ONLY):
 """
 
             # Gemini 호출
-            response = model.generate_content(prompt)
+            response = model.generate_content(
+                prompt,
+                request_options={"timeout": remaining(GEMINI_TIMEOUT_SECONDS)}
+            )
 
             # ---  응답 파싱 (안정 처리) ---
             translation = None
@@ -796,16 +1774,16 @@ Korean message (FRIENDLY TONE ONLY):
 
             # ---  검증 ---
             if translation and len(translation) > 5:
-                print(f"[Gemini]  Translation complete ({len(translation)} chars)")
+                logger.info(f"[Gemini]  Translation complete ({len(translation)} chars)")
                 return {
                     "success": True,
                     "translation": translation
                 }
 
             else:
-                print(f"[Gemini]  Empty or invalid response on attempt {attempt}")
+                logger.warning(f"[Gemini]  Empty or invalid response on attempt {attempt}")
                 if attempt < retries:
-                    print("[Gemini] Retrying...")
+                    logger.debug("[Gemini] Retrying...")
                     continue
                 else:
                     return {
@@ -814,12 +1792,12 @@ Korean message (FRIENDLY TONE ONLY):
                     }
 
         except Exception as e:
-            print(f"[Gemini]  Error on attempt {attempt}: {e}")
-            import traceback
-            traceback.print_exc()
+            if "timeout" in str(e).lower() or "deadline" in type(e).__name__.lower():
+                AI_TIMEOUTS.inc(service="gemini")
+            logger.exception(f"[Gemini]  Error on attempt {attempt}: {e}")
 
             if attempt < retries:
-                print("[Gemini] Retrying after error...")
+                logger.debug("[Gemini] Retrying after error...")
                 continue
             else:
                 return {
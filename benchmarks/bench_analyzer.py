@@ -0,0 +1,201 @@
+"""
+분석기 / 안전 링크 마이크로벤치마크
+
+2~500개 물질의 가상 CAMEO 결과(cameo_data, 실제와 비슷한 상태/설명 분포)로
+단계별 소요 시간과 메모리 최대 사용량을 측정하고 JSON으로 저장합니다.
+
+단계:
+    classify         상태 → 위험도 분류 (_classify_risk)
+    severity         설명 → 심각도 점수 (_calculate_severity)
+    pair_info        조합별 분류 + 점수 + 요약 문장 (_build_pair_info)
+    sort             위험/주의 목록 심각도 정렬
+    recommendations  요약 + 권장 사항 생성
+    analyze_simple   전체 분석 (위 단계 포함)
+    links_cold       안전 링크 수집 (이름 정규화 캐시 비움)
+    links_warm       안전 링크 수집 (같은 이름 재요청)
+    serialize        응답 JSON 직렬화
+    serialize_cache  결과 저장소 형식 인코딩 (compact JSON + zlib)
+
+Usage:
+    python benchmarks/bench_analyzer.py --output bench_analyzer.json
+    python benchmarks/bench_analyzer.py --sizes 10,100 --compare bench_analyzer.json --threshold 20
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import cameo_data  # noqa: E402
+from safety_links import catalogue, get_all_links_for_analysis  # noqa: E402
+from result_store import encode_result  # noqa: E402
+from simple_analyzer import SimpleChemicalAnalyzer, analyze_simple  # noqa: E402
+
+DEFAULT_SIZES = (2, 5, 10, 25, 50, 100, 250, 500)
+
+
+def measure(func, repeat: int):
+    """repeat번 실행한 소요 시간(ms) 목록"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def peak_kib(func) -> float:
+    """func 실행 중 tracemalloc 기준 최대 메모리 사용량 (KiB)"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def build_stages(results):
+    """단계 이름 → (실행 함수, 메모리 측정 여부)"""
+    analyzer = SimpleChemicalAnalyzer()
+    statuses = [r["status"].lower() for r in results]
+    descriptions = [r["descriptions"] for r in results]
+    pair_infos = [analyzer._build_pair_info(r) for r in results]
+    dangerous = [p for p in pair_infos if p["risk_level"] == "위험"]
+    caution = [p for p in pair_infos if p["risk_level"] == "주의"]
+    safe = [p for p in pair_infos if p["risk_level"] == "안전"]
+    chemicals = {p["chemical_1"] for p in pair_infos} | {p["chemical_2"] for p in pair_infos}
+
+    analysis = analyze_simple(results)
+    links = get_all_links_for_analysis(analysis["dangerous_pairs"], analysis["caution_pairs"])
+    response = {"success": True, "rule_based_analysis": analysis, "safety_links": links}
+
+    def links_cold():
+        catalogue.snapshot.normalize.cache_clear()
+        get_all_links_for_analysis(analysis["dangerous_pairs"], analysis["caution_pairs"])
+
+    return {
+        "classify": (lambda: [analyzer._classify_risk(s) for s in statuses], False),
+        "severity": (lambda: [analyzer._calculate_severity(d) for d in descriptions], False),
+        "pair_info": (lambda: [analyzer._build_pair_info(r) for r in results], True),
+        "sort": (lambda: (sorted(dangerous, key=lambda x: x["severity_score"], reverse=True),
+                          sorted(caution, key=lambda x: x["severity_score"], reverse=True)), False),
+        "recommendations": (lambda: (analyzer._build_summary(dangerous, caution, safe, chemicals),
+                                     analyzer._generate_recommendations(dangerous, caution)), False),
+        "analyze_simple": (lambda: analyze_simple(results), True),
+        "links_cold": (links_cold, True),
+        "links_warm": (lambda: get_all_links_for_analysis(analysis["dangerous_pairs"], analysis["caution_pairs"]),
+                       False),
+        "serialize": (lambda: json.dumps(response, ensure_ascii=False), True),
+        "serialize_cache": (lambda: encode_result(response), True),
+    }
+
+
+def run(sizes, repeat: int):
+    rows = []
+    for size in sizes:
+        cas_numbers = cameo_data.synthetic_cas_numbers(size, seed=size)
+        results = cameo_data.cameo_results(cas_numbers)
+        stages = build_stages(results)
+
+        for stage, (func, track_memory) in stages.items():
+            func()  # warm-up
+            durations = measure(func, repeat)
+            row = {
+                "substances": size,
+                "pairs": len(results),
+                "stage": stage,
+                "median_ms": round(statistics.median(durations), 4),
+                "min_ms": round(min(durations), 4),
+                "max_ms": round(max(durations), 4),
+                "repeat": repeat,
+                "peak_kib": peak_kib(func) if track_memory else None,
+            }
+            rows.append(row)
+        total = next(r for r in rows if r["substances"] == size and r["stage"] == "analyze_simple")
+        print(f"  {size:>4} substances ({len(results):>6} pairs): analyze_simple {total['median_ms']:>10.3f} ms, "
+              f"peak {total['peak_kib']:>9.1f} KiB")
+    return rows
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def compare(rows, baseline_path: str, threshold: float) -> bool:
+    """기준 결과와 중앙값 비교 → threshold(%) 이상 느려진 단계가 있으면 True"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["substances"], r["stage"]): r for r in baseline.get("results", [])}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit', 'unknown')}):")
+    regressed = False
+    for row in rows:
+        before = previous.get((row["substances"], row["stage"]))
+        if not before or not before["median_ms"]:
+            continue
+        change = (row["median_ms"] / before["median_ms"] - 1) * 100
+        if change >= threshold:
+            regressed = True
+            marker = "  [SLOWER]"
+        elif change <= -threshold:
+            marker = "  [FASTER]"
+        else:
+            continue
+        print(f"  {row['substances']:>4} {row['stage']:<16} {before['median_ms']:>10.3f} -> "
+              f"{row['median_ms']:>10.3f} ms ({change:+.1f}%){marker}")
+    if not regressed:
+        print(f"  No stage slower by {threshold:.0f}% or more")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzer and safety link microbenchmarks")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma separated substance counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=20, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print("=" * 70)
+    print("Analyzer Microbenchmarks")
+    print("=" * 70)
+    rows = run(sizes, args.repeat)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": rows,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        return 1 if compare(rows, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
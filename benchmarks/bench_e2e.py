@@ -0,0 +1,249 @@
+"""
+오프라인 End-to-End 벤치마크
+
+로컬 CAMEO / HF / Gemini 대체 서버(fake_services)를 띄우고, 실제 FastAPI 앱(uvicorn)을
+새 캐시 디렉토리에서 실행한 뒤 동시 요청으로 엔드포인트별 지연시간을 측정합니다.
+
+- cold: 처음 보는 제품 조합 (분석 캐시 miss → 크롤링 + 분석 + AI)
+- warm: 같은 조합을 다시 요청 (분석 캐시 hit)
+- 엔드포인트/시나리오별 p50 / p95 / p99 지연시간, 처리량(req/s), 오류 수
+
+네트워크가 없어도 동작합니다 (Playwright Chromium은 설치되어 있어야 함).
+
+--page-archive: 실제 크롤링 때 보관한 반응성 예측 페이지(page_archive.py)로 응답하고,
+요청 조합도 보관된 물질 목록에서 만듦 (파서 / 분석이 실제 페이지 크기와 내용으로 측정됨)
+
+Usage:
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --concurrency 8 --requests 40 --substances 5 --output e2e.json
+    python benchmarks/bench_e2e.py --page-archive cache/reactivity_pages
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cameo_data
+from fake_services import FakeServices
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 이름 → (경로, useAi)
+ENDPOINTS = {
+    "hybrid": ("/hybrid-analyze", True),
+    "hybrid-rules": ("/hybrid-analyze", False),
+    "simple": ("/simple-analyze", False),
+}
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, p: float):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def build_payloads(count: int, substances: int, seed: int, recorded_sets=None):
+    """
+    서로 다른 제품 조합 count개 (각 조합은 substances개 물질을 제품 2개로 나눔)
+    recorded_sets: 보관된 페이지의 물질 목록 - 있으면 그 목록을 순서대로 사용 (부족하면 반복)
+    """
+    rng = random.Random(seed)
+    pool = list(cameo_data.SUBSTANCES)
+    payloads = []
+    for index in range(count):
+        if recorded_sets:
+            cas_numbers = recorded_sets[index % len(recorded_sets)]
+        else:
+            cas_numbers = rng.sample(pool, min(substances, len(pool)))
+        half = max(1, len(cas_numbers) // 2)
+        payloads.append([
+            {"productName": "Product A", "casNumbers": cas_numbers[:half]},
+            {"productName": "Product B", "casNumbers": cas_numbers[half:]},
+        ])
+    return payloads
+
+
+def post_json(url: str, payload: dict, timeout: float):
+    """(status, 소요 초) - 연결 실패는 status 0"""
+    data = json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def run_scenario(base_url: str, path: str, use_ai: bool, payloads, concurrency: int, timeout: float) -> dict:
+    url = f"{base_url}{path}"
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(
+            lambda products: post_json(url, {"useAi": use_ai, "products": products}, timeout),
+            payloads
+        ))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(duration * 1000 for _, duration in outcomes)
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok = statuses.get("200", 0)
+
+    return {
+        "requests": len(outcomes),
+        "ok": ok,
+        "errors": len(outcomes) - ok,
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "throughput_rps": round(len(outcomes) / wall, 3),
+        "wall_s": round(wall, 2),
+    }
+
+
+def wait_for_health(base_url: str, server, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server did not answer /health within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"comma separated: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=12, help="requests per endpoint per scenario")
+    parser.add_argument("--substances", type=int, default=4, help="substances per request")
+    parser.add_argument("--cameo-latency-ms", type=float, default=50)
+    parser.add_argument("--hf-latency-ms", type=float, default=200)
+    parser.add_argument("--gemini-latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--prewarm", action="store_true", help="start the server with PREWARM_BROWSER=1")
+    parser.add_argument("--page-archive", help="serve recorded reactivity pages from this PAGE_ARCHIVE_DIR "
+                                               "and build requests from their substance lists")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    print("=" * 70)
+    print("Offline End-to-End Benchmark")
+    print("=" * 70)
+
+    recorded = cameo_data.RecordedPages(args.page_archive) if args.page_archive else None
+    recorded_sets = recorded.substance_sets() if recorded else None
+    if recorded is not None:
+        if not recorded_sets:
+            parser.error(f"no recorded reactivity pages in {args.page_archive}")
+        print(f"Recorded reactivity pages: {len(recorded_sets)}")
+        if len(recorded_sets) < args.requests * len(endpoints):
+            print("  (fewer pages than cold requests: substance lists are reused, later cold requests may hit cache)")
+
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    port = find_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    results = []
+
+    with FakeServices(args.cameo_latency_ms, args.hf_latency_ms, args.gemini_latency_ms, args.jitter_ms,
+                      recorded) as services:
+        env = {
+            **os.environ,
+            **services.env(),
+            "PYTHONPATH": str(REPO_ROOT),
+            "LOG_LEVEL": "WARNING",
+            "PREWARM_BROWSER": "1" if args.prewarm else "",
+        }
+        # 새 작업 디렉토리에서 실행 → cache/가 비어 있는 상태에서 시작
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend_with_hf:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_health(base_url, server)
+            print(f"Server: {base_url} (cwd {workdir})")
+            print(f"CAMEO {args.cameo_latency_ms:.0f} ms / HF {args.hf_latency_ms:.0f} ms / "
+                  f"Gemini {args.gemini_latency_ms:.0f} ms, concurrency {args.concurrency}\n")
+
+            for index, name in enumerate(endpoints):
+                path, use_ai = ENDPOINTS[name]
+                # 엔드포인트마다 다른 조합 사용 (다른 엔드포인트가 만든 캐시의 영향 제거)
+                if recorded_sets:
+                    # 엔드포인트마다 다른 보관 목록부터 사용
+                    offset = index * args.requests
+                    sets = recorded_sets[offset % len(recorded_sets):] + recorded_sets[:offset % len(recorded_sets)]
+                else:
+                    sets = None
+                payloads = build_payloads(args.requests, args.substances, args.seed + index, sets)
+                for scenario in ("cold", "warm"):
+                    stats = run_scenario(base_url, path, use_ai, payloads, args.concurrency, args.timeout)
+                    results.append({"endpoint": name, "path": path, "scenario": scenario, **stats})
+                    print(f"  {name:<13} {scenario:<5} p50 {stats['p50_ms']:>9.1f}  p95 {stats['p95_ms']:>9.1f}  "
+                          f"p99 {stats['p99_ms']:>9.1f} ms  {stats['throughput_rps']:>7.2f} req/s  "
+                          f"errors {stats['errors']}")
+            if recorded is not None:
+                print(f"\n  Recorded reactivity pages served: {services.recorded_hits}")
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": vars(args),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    return 1 if any(item["errors"] for item in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+벤치마크용 CAMEO 데이터
+
+- SUBSTANCES: 생활화학제품 주요 물질 (CAS → CAMEO 검색 결과 이름)
+- KNOWN_PAIRS: 실제 CAMEO에서 확인된 대표적인 위험/주의 조합
+- pair_result(): 나머지 조합은 CAS 쌍의 해시로 상태/설명을 정해 항상 같은 결과를 반환
+  (실제 CAMEO 결과 분포와 비슷하게: 안전 약 55%, 주의 약 30%, 위험 약 15%)
+- RecordedPages: 실제 크롤링 때 보관한 반응성 예측 페이지 (page_archive.py) - 있으면 가상 결과 대신 사용
+"""
+
+import hashlib
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from page_archive import PageArchive  # noqa: E402
+
+SUBSTANCES: Dict[str, str] = {
+    "7681-52-9": "SODIUM HYPOCHLORITE SOLUTION",
+    "7722-84-1": "HYDROGEN PEROXIDE, AQUEOUS SOLUTION",
+    "1336-21-6": "AMMONIUM HYDROXIDE",
+    "1310-73-2": "SODIUM HYDROXIDE, SOLUTION",
+    "7647-01-0": "HYDROCHLORIC ACID",
+    "7664-93-9": "SULFURIC ACID",
+    "64-19-7": "ACETIC ACID",
+    "77-92-9": "CITRIC ACID",
+    "151-21-3": "SODIUM LAURYL SULFATE",
+    "64-17-5": "ETHANOL",
+    "67-63-0": "ISOPROPANOL",
+    "7732-18-5": "WATER",
+    "7647-14-5": "SODIUM CHLORIDE",
+    "144-55-8": "SODIUM BICARBONATE",
+    "103-95-7": "CYCLAMEN ALDEHYDE",
+    "67-64-1": "ACETONE",
+    "7697-37-2": "NITRIC ACID",
+    "7664-38-2": "PHOSPHORIC ACID",
+    "1305-62-0": "CALCIUM HYDROXIDE",
+    "497-19-8": "SODIUM CARBONATE",
+    "7778-54-3": "CALCIUM HYPOCHLORITE",
+    "10049-04-4": "CHLORINE DIOXIDE",
+    "50-00-0": "FORMALDEHYDE SOLUTION",
+    "111-76-2": "ETHYLENE GLYCOL MONOBUTYL ETHER",
+    "107-21-1": "ETHYLENE GLYCOL",
+    "8008-20-6": "KEROSENE",
+    "108-88-3": "TOLUENE",
+    "1330-20-7": "XYLENES",
+    "110-54-3": "N-HEXANE",
+    "6834-92-0": "SODIUM METASILICATE",
+}
+
+# CAMEO 설명 문구 (실제 반응성 예측 결과에서 자주 나오는 항목)
+HAZARDS = [
+    "Corrosive: Reaction products may be corrosive.",
+    "Explosive: Reaction products may be explosive or sensitive to shock or friction.",
+    "Flammable: Reaction products may be flammable.",
+    "Generates gas: Reaction liberates gaseous products and may cause pressurization.",
+    "Heat generation: Exothermic reaction at ambient temperatures (releases heat).",
+    "Intense or explosive reaction: Reaction may be particularly intense, violent, or explosive.",
+    "May cause fire: Reaction may generate enough heat to ignite flammable products.",
+    "Toxic: Reaction products may be toxic.",
+    "Polymerization hazard: Reaction may initiate polymerization.",
+]
+
+CAUTION_NOTES = [
+    "Caution: Reactive groups may interact; review the documentation before mixing.",
+    "Unknown: The reactivity of this combination could not be predicted.",
+]
+
+KNOWN_PAIRS = {
+    frozenset(("7681-52-9", "1336-21-6")): ("Incompatible", [HAZARDS[7], HAZARDS[3], HAZARDS[4]]),
+    frozenset(("7681-52-9", "7647-01-0")): ("Incompatible", [HAZARDS[7], HAZARDS[3], HAZARDS[0]]),
+    frozenset(("7681-52-9", "64-19-7")): ("Incompatible", [HAZARDS[7], HAZARDS[3]]),
+    frozenset(("7722-84-1", "64-19-7")): ("Incompatible", [HAZARDS[1], HAZARDS[4], HAZARDS[2]]),
+    frozenset(("7664-93-9", "1310-73-2")): ("Incompatible", [HAZARDS[4], HAZARDS[5], HAZARDS[0]]),
+    frozenset(("7647-01-0", "1310-73-2")): ("Incompatible", [HAZARDS[4], HAZARDS[0]]),
+    frozenset(("7697-37-2", "64-17-5")): ("Incompatible", [HAZARDS[1], HAZARDS[6], HAZARDS[7]]),
+    frozenset(("7681-52-9", "64-17-5")): ("Caution", [CAUTION_NOTES[0]]),
+    frozenset(("7732-18-5", "7647-14-5")): ("Compatible", []),
+}
+
+
+def name_for(cas: str) -> str:
+    """CAS → 검색 결과 이름 (목록에 없는 CAS도 검색되는 것으로 취급)"""
+    return SUBSTANCES.get(cas, f"SUBSTANCE {cas}")
+
+
+def _rng(*parts: str) -> random.Random:
+    digest = hashlib.sha256("|".join(parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def pair_result(cas_1: str, cas_2: str):
+    """두 물질의 (상태, 설명 목록) - 항상 같은 결과"""
+    known = KNOWN_PAIRS.get(frozenset((cas_1, cas_2)))
+    if known:
+        return known
+
+    rng = _rng(*sorted((cas_1, cas_2)))
+    roll = rng.random()
+    if roll < 0.15:
+        return "Incompatible", rng.sample(HAZARDS, rng.randint(1, 4))
+    if roll < 0.45:
+        return "Caution", [rng.choice(CAUTION_NOTES)]
+    return "Compatible", []
+
+
+def cameo_results(cas_numbers: List[str], names: Optional[Dict[str, str]] = None) -> List[dict]:
+    """크롤러가 반환하는 형식과 같은 결과 목록 (모든 조합)"""
+    names = names or {}
+    results = []
+    for i, cas_1 in enumerate(cas_numbers):
+        for cas_2 in cas_numbers[i + 1:]:
+            status, descriptions = pair_result(cas_1, cas_2)
+            results.append({
+                "pair_id": f"Pair_{len(results) + 1}",
+                "chemical_1": names.get(cas_1) or name_for(cas_1),
+                "chemical_2": names.get(cas_2) or name_for(cas_2),
+                "status": status,
+                "descriptions": descriptions or ["No description"],
+                "documentation_link": None
+            })
+    return results
+
+
+def synthetic_cas_numbers(count: int, seed: int = 0) -> List[str]:
+    """
+    count개의 CAS 번호 (목록의 실제 물질을 먼저 사용하고, 부족하면 체크 디지트가 맞는 가짜 CAS 생성)
+    """
+    rng = random.Random(seed)
+    cas_numbers = list(SUBSTANCES)
+    rng.shuffle(cas_numbers)
+    cas_numbers = cas_numbers[:count]
+
+    serial = 100000
+    while len(cas_numbers) < count:
+        serial += rng.randint(1, 97)
+        body = f"{serial}{rng.randint(10, 99)}"
+        check = sum(int(d) * (i + 1) for i, d in enumerate(reversed(body))) % 10
+        cas_numbers.append(f"{body[:-2]}-{body[-2:]}-{check}")
+    return cas_numbers
+
+
+class RecordedPages:
+    """
+    page_archive.py로 보관한 실제 반응성 예측 페이지 (물질 목록이 같은 MyChemicals 세션에 그대로 제공)
+
+    - names: 보관 당시 검색 결과 이름 (검색 / MyChemicals 페이지에 사용)
+    - 검색 / MyChemicals 페이지 자체는 보관되지 않으므로 가상 페이지를 사용
+    """
+
+    def __init__(self, directory):
+        self.archive = PageArchive(directory)
+        self.names: Dict[str, str] = {}
+        self._pages: Dict[frozenset, str] = {}  # 물질 CAS 집합 -> 페이지 sha256
+        self._substance_sets: List[List[str]] = []
+        for entry in self.archive.entries():
+            if len(entry["substances"]) < 2:
+                continue
+            self._pages[frozenset(entry["substances"])] = entry["sha256"]
+            self._substance_sets.append(list(entry["substances"]))
+            self.names.update(entry.get("name_map") or {})
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def substance_sets(self) -> List[List[str]]:
+        """보관된 페이지의 물질 목록 (크롤링 순서)"""
+        return [list(substances) for substances in self._substance_sets]
+
+    def reactivity_page(self, cas_numbers: List[str]) -> Optional[str]:
+        """같은 물질 목록으로 보관한 페이지 HTML (없거나 읽을 수 없으면 None)"""
+        digest = self._pages.get(frozenset(cas_numbers))
+        if digest is None:
+            return None
+        try:
+            return self.archive.load(digest)
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
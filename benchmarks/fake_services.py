@@ -0,0 +1,315 @@
+"""
+오프라인 벤치마크용 로컬 서버
+- FakeCameo: CAMEO Chemicals의 검색 / MyChemicals / 반응성 예측 페이지를 크롤러와 같은 선택자로 재현
+  (--page-archive를 주면 보관된 실제 반응성 예측 페이지를 그대로 제공, 없는 물질 목록만 가상 페이지)
+- StubHF: Hugging Face Space (/health, /analyze, / 요약)
+- StubGemini: Gemini REST API (generateContent)
+
+모든 서버는 응답마다 지정한 지연시간(ms)만큼 기다린 뒤 응답합니다.
+
+Usage (수동 확인용):
+    python benchmarks/fake_services.py --cameo-latency-ms 50
+    python benchmarks/fake_services.py --page-archive cache/reactivity_pages
+    CAMEO_BASE_URL=http://127.0.0.1:<port> python chemical_analyzer.py
+"""
+
+import argparse
+import html
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cameo_data
+
+
+class _LatencyHandler(BaseHTTPRequestHandler):
+    """응답 전에 server.latency_ms (+ 최대 jitter_ms) 만큼 대기"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        latency = self.server.latency_ms + random.uniform(0, self.server.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload: dict, status: int = 200):
+        self._send(status, json.dumps(payload, ensure_ascii=False), "application/json")
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+
+# ---- CAMEO ----
+
+_PAGE = """<!DOCTYPE html>
+<html><head><title>CAMEO Chemicals (offline)</title></head>
+<body>
+<div id="sidebar">
+  <a href="/search/simple">New Search</a>
+  <h4>MyChemicals</h4>
+  <ul>{my_chemicals}</ul>
+  <a href="/reactivity">Predict Reactivity</a>
+</div>
+<div id="content">{content}</div>
+</body></html>"""
+
+
+class _CameoHandler(_LatencyHandler):
+    """
+    /search/simple              검색 폼 (input[name='cas'])
+    /search/results?cas=...     검색 결과 (a[href*='/chemical/'] + a.pseudo_button 'Add to MyChemicals')
+    /mychemicals/add/<cas>      MyChemicals에 추가 후 검색 결과로 이동
+    /reactivity                 MyChemicals 전체 조합의 div.pairwise_hazards 블록
+                                (같은 물질 목록의 보관된 페이지가 있으면 그 페이지를 그대로 응답)
+    MyChemicals 목록은 쿠키 세션별로 유지 (브라우저 context마다 독립)
+    """
+
+    def _name(self, cas: str) -> str:
+        recorded = self.server.recorded
+        return (recorded.names.get(cas) if recorded else None) or cameo_data.name_for(cas)
+
+    def _session(self):
+        cookie = self.headers.get("Cookie", "")
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "cameo_session" and value in self.server.sessions:
+                return value, self.server.sessions[value]
+        session_id = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.sessions[session_id] = []
+        return session_id, self.server.sessions[session_id]
+
+    def _page(self, session_id, chemicals, content, status=200):
+        my_chemicals = "".join(
+            f'<li><a href="/chemical/{html.escape(cas)}">{html.escape(self._name(cas))}</a></li>'
+            for cas in chemicals
+        )
+        self._send(status, _PAGE.format(my_chemicals=my_chemicals, content=content),
+                   headers={"Set-Cookie": f"cameo_session={session_id}; Path=/"})
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        session_id, chemicals = self._session()
+
+        if url.path == "/search/simple":
+            content = ('<form action="/search/results" method="get">'
+                       '<label>CAS Number <input type="text" name="cas"></label></form>')
+            self._page(session_id, chemicals, content)
+
+        elif url.path == "/search/results":
+            cas = query.get("cas", [""])[0].strip()
+            if not cas:
+                self._page(session_id, chemicals, "<p>No results</p>")
+                return
+            escaped = html.escape(cas)
+            content = (
+                '<table class="results"><tr>'
+                f'<td><a href="/chemical/{escaped}">{html.escape(self._name(cas))}</a></td>'
+                f'<td><a class="pseudo_button" href="/mychemicals/add/{escaped}">Add to MyChemicals</a></td>'
+                f'<td><a class="pseudo_button" href="/chemical/{escaped}#datasheet">View Datasheet</a></td>'
+                '</tr></table>'
+            )
+            self._page(session_id, chemicals, content)
+
+        elif url.path.startswith("/mychemicals/add/"):
+            cas = url.path.rsplit("/", 1)[-1]
+            with self.server.lock:
+                if cas not in chemicals:
+                    chemicals.append(cas)
+            self._page(session_id, chemicals, f"<p>Added {html.escape(self._name(cas))}</p>")
+
+        elif url.path == "/reactivity":
+            recorded = self.server.recorded.reactivity_page(chemicals) if self.server.recorded else None
+            if recorded is not None:
+                self.server.recorded_hits += 1
+                self._send(200, recorded, headers={"Set-Cookie": f"cameo_session={session_id}; Path=/"})
+                return
+            blocks = []
+            for index, (cas_1, cas_2) in enumerate(itertools.combinations(chemicals, 2), start=1):
+                status, descriptions = cameo_data.pair_result(cas_1, cas_2)
+                items = "".join(f"<li>{html.escape(d)}</li>" for d in descriptions)
+                blocks.append(
+                    f'<div class="pairwise_hazards" id="Pair_{index}">'
+                    f'<h3><a href="/chemical/{html.escape(cas_1)}">{html.escape(self._name(cas_1))}</a>'
+                    f' mixed with <a href="/chemical/{html.escape(cas_2)}">{html.escape(self._name(cas_2))}</a></h3>'
+                    f'<div><strong>{status}</strong></div>'
+                    + (f'<ul class="spaced3">{items}</ul>' if items else "")
+                    + f'<a href="/reactivity/documentation/{index}">Documentation</a>'
+                    '</div>'
+                )
+            self._page(session_id, chemicals, "".join(blocks))
+
+        elif url.path.startswith("/chemical/"):
+            cas = url.path.rsplit("/", 1)[-1]
+            self._page(session_id, chemicals, f"<h2>{html.escape(self._name(cas))}</h2>")
+
+        else:
+            self._send(404, "Not found", "text/plain")
+
+
+# ---- Hugging Face Space ----
+
+class _HFHandler(_LatencyHandler):
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json({"status": "healthy", "model": "offline-stub"})
+        else:
+            self._send(404, "Not found", "text/plain")
+
+    def do_POST(self):
+        payload = self._read_json()
+        self._delay()
+        path = urlparse(self.path).path
+        if path == "/analyze":
+            count = len(payload.get("results", []))
+            self._send_json({"success": True, "analysis": f"Offline analysis of {count} pairs."})
+        elif path == "/":
+            prompt = payload.get("prompt", "")
+            self._send_json({
+                "success": True,
+                "response": f"Offline summary ({len(prompt)} prompt chars): keep incompatible products apart."
+            })
+        else:
+            self._send(404, "Not found", "text/plain")
+
+
+# ---- Gemini ----
+
+class _GeminiHandler(_LatencyHandler):
+    def do_POST(self):
+        self._read_json()
+        self._delay()
+        if ":generateContent" not in urlparse(self.path).path:
+            self._send(404, "Not found", "text/plain")
+            return
+        self._send_json({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": "오프라인 번역: 위험한 제품은 따로 보관하세요."}]},
+                "finishReason": "STOP",
+                "index": 0
+            }]
+        })
+
+
+def _serve(handler, latency_ms: float, jitter_ms: float, recorded=None) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.jitter_ms = jitter_ms
+    server.sessions = {}
+    server.lock = threading.Lock()
+    server.recorded = recorded
+    server.recorded_hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeServices:
+    """
+    세 서버를 백그라운드 스레드로 실행 (with 문으로 사용)
+    recorded: cameo_data.RecordedPages (보관된 실제 반응성 예측 페이지, 없으면 가상 페이지만)
+    """
+
+    def __init__(self, cameo_latency_ms=50, hf_latency_ms=200, gemini_latency_ms=150, jitter_ms=0,
+                 recorded=None):
+        self.latencies = (cameo_latency_ms, hf_latency_ms, gemini_latency_ms)
+        self.jitter_ms = jitter_ms
+        self.recorded = recorded
+        self.servers = []
+
+    def start(self):
+        cameo_ms, hf_ms, gemini_ms = self.latencies
+        self.servers = [
+            _serve(_CameoHandler, cameo_ms, self.jitter_ms, self.recorded),
+            _serve(_HFHandler, hf_ms, self.jitter_ms),
+            _serve(_GeminiHandler, gemini_ms, self.jitter_ms),
+        ]
+        return self
+
+    def _url(self, index: int) -> str:
+        return f"http://127.0.0.1:{self.servers[index].server_address[1]}"
+
+    @property
+    def recorded_hits(self) -> int:
+        """보관된 페이지로 응답한 반응성 예측 요청 수"""
+        return self.servers[0].recorded_hits if self.servers else 0
+
+    @property
+    def cameo_url(self) -> str:
+        return self._url(0)
+
+    @property
+    def hf_url(self) -> str:
+        return self._url(1)
+
+    @property
+    def gemini_url(self) -> str:
+        return self._url(2)
+
+    def env(self) -> dict:
+        """백엔드를 이 서버들로 향하게 하는 환경 변수"""
+        return {
+            "CAMEO_BASE_URL": self.cameo_url,
+            "AI_API_URL": self.hf_url,
+            "GEMINI_API_KEY": "offline-benchmark",
+            "GEMINI_API_ENDPOINT": self.gemini_url,
+        }
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline CAMEO / HF / Gemini stand-ins")
+    parser.add_argument("--cameo-latency-ms", type=float, default=50)
+    parser.add_argument("--hf-latency-ms", type=float, default=200)
+    parser.add_argument("--gemini-latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--page-archive", help="serve recorded reactivity pages from this PAGE_ARCHIVE_DIR")
+    args = parser.parse_args()
+
+    recorded = cameo_data.RecordedPages(args.page_archive) if args.page_archive else None
+    if recorded is not None:
+        print(f"Recorded reactivity pages: {len(recorded)}")
+
+    with FakeServices(args.cameo_latency_ms, args.hf_latency_ms, args.gemini_latency_ms, args.jitter_ms,
+                      recorded) as services:
+        for name, value in services.env().items():
+            print(f"{name}={value}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
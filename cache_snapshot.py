@@ -0,0 +1,182 @@
+"""
+캐시 스냅샷 내보내기 / 가져오기
+Render / Railway처럼 재배포 때 디스크가 초기화되는 환경에서 사전 캐싱 결과를 유지
+
+형식: gzip 압축 JSON-lines (한 줄에 레코드 하나)
+    {"format": "nemo-cache-snapshot", "version": 1, "created_at": ..., "parser_version": ..., "counts": {...}}
+                                                                                       헤더 (첫 줄)
+    {"type": "name", "cas": ..., "name": ...}                                          CAS → CAMEO 이름
+    {"type": "pair", "key": "cas_a|cas_b", "result": {...} 또는 null}                   PairStore 쌍 결과
+    {"type": "result", "key": ..., "result": {...}, "created_at": ..., "expires_at": ..., "versions": {...}}
+                                                                                       분석 결과 (AI 요약/번역 포함)
+
+- 가져오기는 한 줄씩 읽어 일정 개수마다 저장 → 스냅샷 전체를 메모리에 올리지 않음
+- 이미 있는 쌍 / 분석 결과는 덮어쓰지 않음 (로컬 결과가 더 최신)
+- 분석 결과의 생성 시각 / 버전을 유지 → 이전 버전 결과는 stale-while-revalidate로 재생성
+- 쌍 결과는 현재 파서 버전의 것만 내보내고, 파서 버전이 다른 스냅샷의 쌍은 가져오지 않음
+
+환경 변수:
+    CACHE_SNAPSHOT_PATH=snapshots/cache.jsonl.gz   # 설정 시 서버 시작 때 백그라운드로 가져옴
+
+Usage:
+    python cache_snapshot.py export snapshots/cache.jsonl.gz
+    python cache_snapshot.py import snapshots/cache.jsonl.gz
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from pair_store import PairStore, LEGACY_PARSER_VERSION
+from pair_matrix import create_pair_store
+from result_store import ResultStore
+
+SNAPSHOT_FORMAT = "nemo-cache-snapshot"
+SNAPSHOT_VERSION = 1
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "")
+
+# 가져올 때 PairStore에 한 번에 병합할 쌍 개수
+PAIR_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotError(ValueError):
+    """스냅샷 형식 / 버전이 맞지 않음"""
+
+
+def _write_line(f, record: dict):
+    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+    f.write("\n")
+
+
+def export_snapshot(path: Path, pair_store: PairStore, result_store: ResultStore) -> dict:
+    """
+    전체 캐시를 스냅샷 파일로 저장 (블로킹 - 스레드에서 호출)
+    임시 파일에 쓴 뒤 교체 → 쓰는 도중의 파일을 가져오지 않음
+
+    Returns:
+        dict: 레코드 종류별 개수
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pairs, names = pair_store.snapshot()
+    counts = {"names": len(names), "pairs": len(pairs), "results": 0}
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            _write_line(f, {
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "created_at": time.time(),
+                "parser_version": pair_store.parser_version,
+                "counts": {"names": counts["names"], "pairs": counts["pairs"]}
+            })
+            for cas, name in names.items():
+                _write_line(f, {"type": "name", "cas": cas, "name": name})
+            for key, result in pairs.items():
+                _write_line(f, {"type": "pair", "key": key, "result": result})
+            for entry in result_store.iter_entries():
+                _write_line(f, {"type": "result", **entry})
+                counts["results"] += 1
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    logger.info(f"[Snapshot] Exported {counts} to {path}")
+    return counts
+
+
+def _read_header(f) -> dict:
+    line = f.readline()
+    try:
+        header = json.loads(line) if line else None
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Not a cache snapshot")
+    if header.get("version", 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {header.get('version')} (max {SNAPSHOT_VERSION})")
+    return header
+
+
+def import_snapshot(path: Path, pair_store: PairStore, result_store: ResultStore) -> dict:
+    """
+    스냅샷 파일을 한 줄씩 읽어 PairStore / 결과 저장소에 병합 (블로킹 - 스레드에서 호출)
+
+    Returns:
+        dict: 새로 추가된 쌍 / 분석 결과 개수와 건너뛴 레코드 수
+
+    Raises:
+        SnapshotError: 스냅샷 형식이 아니거나 지원하지 않는 버전
+    """
+    counts = {"pairs": 0, "results": 0, "skipped": 0}
+    pairs, names = {}, {}
+
+    def flush_pairs():
+        counts["pairs"] += pair_store.merge(pairs, names, save=False)
+        pairs.clear()
+        names.clear()
+
+    def results(f):
+        """result 레코드만 결과 저장소로 넘기고 나머지는 PairStore 배치에 모음"""
+        for line in f:
+            try:
+                record = json.loads(line)
+                kind = record["type"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                counts["skipped"] += 1
+                continue
+
+            if kind == "result":
+                yield record
+            elif kind == "pair":
+                if snapshot_parser != pair_store.parser_version:
+                    counts["skipped"] += 1
+                    continue
+                pairs[record["key"]] = record["result"]
+                if len(pairs) >= PAIR_BATCH_SIZE:
+                    flush_pairs()
+            elif kind == "name":
+                names[record["cas"]] = record["name"]
+            else:
+                counts["skipped"] += 1
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = _read_header(f)
+        snapshot_parser = header.get("parser_version", LEGACY_PARSER_VERSION)
+        if snapshot_parser != pair_store.parser_version:
+            logger.warning(f"[Snapshot] Pairs were parsed by parser v{snapshot_parser} "
+                           f"(current v{pair_store.parser_version}), skipping them")
+        counts["results"] = result_store.import_entries(results(f))
+    flush_pairs()
+    pair_store.flush()
+
+    logger.info(f"[Snapshot] Imported {path} (created {time.ctime(header.get('created_at', 0))}): {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from result_store import RESULT_STORE_PATH
+
+    parser = argparse.ArgumentParser(description="Export or import a cache snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--cache-dir", default="cache", help="pair store directory (PAIR_STORE_BACKEND applies)")
+    args = parser.parse_args()
+
+    pairs_store = create_pair_store(Path(args.cache_dir))
+    store = ResultStore(RESULT_STORE_PATH)
+    started = time.perf_counter()
+    if args.command == "export":
+        summary = export_snapshot(Path(args.path), pairs_store, store)
+    else:
+        summary = import_snapshot(Path(args.path), pairs_store, store)
+    print(f"{args.command}: {summary} in {time.perf_counter() - started:.1f}s")
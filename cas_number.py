@@ -0,0 +1,126 @@
+"""
+CAS 번호 검증 / 정규화
+
+OCR이나 수기 입력으로 들어오는 CAS 번호를 하나의 표준 형식으로 맞춤
+- 공백, 전각 문자, en-dash / em-dash / 마이너스 기호 → "-"
+- "CAS No." 같은 접두어 제거
+- 첫 그룹의 앞자리 0 제거 ("007732-18-5" → "7732-18-5")
+- 하이픈 없는 숫자열도 허용 ("7732185" → "7732-18-5")
+- 마지막 자리(체크 디지트)로 검증 → 잘못된 번호는 크롤링 전에 거부
+
+표준 형식: NNNNNNN-NN-N (첫 그룹 2~7자리)
+
+Usage:
+    python cas_number.py "7732–18–5" "64-17-6"
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List
+
+# NFKC로 바뀌지 않는 대시 계열 문자
+_DASHES = "‐‑‒–—―−⁃﹘﹣"
+_DASH_TABLE = str.maketrans({dash: "-" for dash in _DASHES})
+_PREFIX = re.compile(r"^cas(?:[\s\-]*(?:no|rn|number|#))?[\s.:#]*", re.IGNORECASE)
+_HYPHENATED = re.compile(r"^(\d+)-(\d{2})-(\d)$")
+_DIGITS = re.compile(r"^(\d+)(\d{2})(\d)$")
+
+
+class InvalidCasNumber(ValueError):
+    """CAS 번호 형식이 아니거나 체크 디지트가 맞지 않음"""
+
+
+def check_digit(body: str) -> int:
+    """체크 디지트 앞의 숫자열 → 체크 디지트 (끝자리부터 1, 2, 3... 을 곱한 합의 일의 자리)"""
+    return sum(int(d) * (i + 1) for i, d in enumerate(reversed(body))) % 10
+
+
+def normalize_cas(value: str) -> str:
+    """
+    CAS 번호 → 표준 형식
+
+    Raises:
+        InvalidCasNumber: 형식 오류 또는 체크 디지트 불일치
+    """
+    text = unicodedata.normalize("NFKC", value or "").translate(_DASH_TABLE)
+    text = _PREFIX.sub("", text.strip())
+    text = re.sub(r"\s+", "", text)
+
+    match = _HYPHENATED.match(text) or _DIGITS.match(text)
+    if not match:
+        raise InvalidCasNumber(f"not a CAS number: {value!r}")
+
+    first, second, check = match.groups()
+    first = first.lstrip("0")
+    if not 2 <= len(first) <= 7:
+        raise InvalidCasNumber(f"not a CAS number: {value!r}")
+    if check_digit(first + second) != int(check):
+        raise InvalidCasNumber(f"check digit mismatch: {value!r}")
+    return f"{first}-{second}-{check}"
+
+
+def is_valid_cas(value: str) -> bool:
+    try:
+        normalize_cas(value)
+        return True
+    except InvalidCasNumber:
+        return False
+
+
+def canonicalize_products(products: Iterable[dict]) -> dict:
+    """
+    요청의 제품 목록 → 중복 없는 표준 CAS 목록 + 원래 입력과의 대응
+
+    Args:
+        products: [{"productName": str, "casNumbers": [str]}]
+
+    Returns:
+        {
+            "cas_numbers": [...],        # 표준 형식, 처음 나온 순서, 중복 제거 (크롤링 / 캐시 키에 사용)
+            "products": [...],           # 제품별 표준 CAS 목록 (제품 안의 중복 제거)
+            "inputs": {cas: [{"productName": ..., "input": 원래 값}]},
+            "invalid": [{"productName": ..., "input": ..., "error": ...}],
+            "normalized": bool           # 입력이 바뀌었거나 중복이 있었는지
+        }
+    """
+    cas_numbers: List[str] = []
+    canonical_products = []
+    inputs = {}
+    invalid = []
+    normalized = False
+
+    for product in products:
+        product_cas = []
+        for raw in product["casNumbers"]:
+            try:
+                cas = normalize_cas(raw)
+            except InvalidCasNumber as e:
+                invalid.append({"productName": product["productName"], "input": raw, "error": str(e)})
+                continue
+
+            if cas != raw or cas in inputs:
+                normalized = True
+            inputs.setdefault(cas, []).append({"productName": product["productName"], "input": raw})
+            if cas not in product_cas:
+                product_cas.append(cas)
+            if cas not in cas_numbers:
+                cas_numbers.append(cas)
+        canonical_products.append({**product, "casNumbers": product_cas})
+
+    return {
+        "cas_numbers": cas_numbers,
+        "products": canonical_products,
+        "inputs": inputs,
+        "invalid": invalid,
+        "normalized": normalized
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    for arg in sys.argv[1:]:
+        try:
+            print(f"{arg!r} -> {normalize_cas(arg)}")
+        except InvalidCasNumber as e:
+            print(f"{arg!r} -> INVALID ({e})")
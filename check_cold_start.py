@@ -0,0 +1,90 @@
+"""
+Cold Start 측정 스크립트
+
+uvicorn으로 서버를 새 프로세스로 띄운 뒤 첫 /health 응답까지의 시간을 측정하고
+/startup-report의 단계별 소요 시간을 출력합니다.
+예산(COLD_START_BUDGET_MS)을 넘으면 종료 코드 1을 반환합니다.
+
+Usage:
+    python check_cold_start.py
+    COLD_START_BUDGET_MS=1500 python check_cold_start.py
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "2000"))
+STARTUP_TIMEOUT = 60  # 서버가 아예 뜨지 않는 경우 대비
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 1.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, json.loads(response.read().decode("utf-8"))
+
+
+def main():
+    port = find_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    print("=" * 70)
+    print("Cold Start Check")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_with_hf:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        first_health_ms = None
+        while time.perf_counter() - started < STARTUP_TIMEOUT:
+            try:
+                status, _ = get_json(f"{base_url}/health")
+                if status == 200:
+                    first_health_ms = (time.perf_counter() - started) * 1000
+                    break
+            except OSError:
+                time.sleep(0.02)
+
+        if first_health_ms is None:
+            print(f"[FAIL] Server did not answer /health within {STARTUP_TIMEOUT}s")
+            return 1
+
+        _, report = get_json(f"{base_url}/startup-report")
+
+        print(f"\nFirst /health response: {first_health_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)")
+        print(f"App ready (inside process): {report.get('ready_ms')} ms")
+        print("\nPhases:")
+        for item in report.get("phases", []):
+            print(f"  {item['phase']:<28} start {item['start_ms']:>8.1f} ms  took {item['duration_ms']:>8.1f} ms")
+
+        if first_health_ms > BUDGET_MS:
+            print(f"\n[FAIL] Cold start over budget by {first_health_ms - BUDGET_MS:.0f} ms")
+            return 1
+
+        print("\n[OK] Cold start within budget")
+        return 0
+
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,52 @@
 import asyncio
-from playwright.async_api import async_playwright
 import json
 import os
+import time
+import logging
+from startup_timer import lazy_import
+from metrics import CRAWL_STEP_SECONDS, CRAWL_FAILURES, BROWSER_SESSIONS
+from tracing import span, finish_span
+from reactivity_parser import parse_reactivity_html
+from page_archive import page_archive, PAGE_ARCHIVE_ENABLED
+
+logger = logging.getLogger(__name__)
 
 # Function to add a substance to MyChemicals
+# Returns the CAMEO chemical name of the added search result (best effort, None if not found)
 async def add_substance_to_mychemicals(page, substance: str):
     # Go to search page and search for substance
-    await page.goto("https://cameochemicals.noaa.gov/search/simple", wait_until="networkidle")
+    # (이미 검색 페이지에 있으면 생략 - 'New Search' 클릭 후 또는 미리 준비된 페이지)
+    if page.url.split("?")[0] != CAMEO_SEARCH_URL:
+        with span("crawl.goto", CRAWL_STEP_SECONDS, step="goto"):
+            await page.goto(CAMEO_SEARCH_URL, wait_until="networkidle")
 
     # Locate the CAS number input field and fill in the substance CAS number
-    input_box = page.locator("input[name='cas']")
-    await input_box.fill(substance)
-    await input_box.press("Enter")
-    await page.wait_for_load_state("networkidle")
-
-    # Wait for the 'Add to MyChemicals' button (class: 'pseudo_button') to be visible and click the correct one
-    await page.wait_for_selector("a.pseudo_button")
-    add_buttons = page.locator("a.pseudo_button")
-
-    # Find and click the 'Add to MyChemicals' button with the correct text
-    for button in range(await add_buttons.count()):
-        button_text = await add_buttons.nth(button).text_content()
-        if button_text and button_text.strip() == "Add to MyChemicals":
-            await add_buttons.nth(button).click()
-            break
+    with span("crawl.search", CRAWL_STEP_SECONDS, step="search"):
+        input_box = page.locator("input[name='cas']")
+        await input_box.fill(substance)
+        await input_box.press("Enter")
+        await page.wait_for_load_state("networkidle")
+
+    with span("crawl.add", CRAWL_STEP_SECONDS, step="add"):
+        # Wait for the 'Add to MyChemicals' button (class: 'pseudo_button') to be visible and click the correct one
+        await page.wait_for_selector("a.pseudo_button")
+        add_buttons = page.locator("a.pseudo_button")
+
+        # 검색 결과의 첫 번째 물질 이름 (사이드바의 MyChemicals 목록은 제외)
+        chemical_name = None
+        name_links = page.locator("a[href*='/chemical/']:not(#sidebar a)")
+        if await name_links.count() > 0:
+            name_text = await name_links.first.text_content()
+            chemical_name = name_text.strip() if name_text else None
+
+        # Find and click the 'Add to MyChemicals' button with the correct text
+        for button in range(await add_buttons.count()):
+            button_text = await add_buttons.nth(button).text_content()
+            if button_text and button_text.strip() == "Add to MyChemicals":
+                await add_buttons.nth(button).click()
+                break
+
+    return chemical_name
 
 # Function to trigger the 'New Search' button and search for a new substance
 async def trigger_new_search(page):
@@ -33,115 +56,306 @@ async def trigger_new_search(page):
     await new_search_button.click()
     await page.wait_for_load_state("networkidle")
 
-# Sequential crawling function
-async def crawl_cameo_sequential(substances: list) -> list:
-    results = []
+# CAMEO 주소 (오프라인 벤치마크/재생 시 다른 주소로 교체 가능)
+CAMEO_BASE_URL = os.getenv("CAMEO_BASE_URL", "https://cameochemicals.noaa.gov").rstrip("/")
+CAMEO_SEARCH_URL = f"{CAMEO_BASE_URL}/search/simple"
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
+# 크롤링 기록/재생 (HAR 아카이브)
+# - record: 크롤링 중 모든 요청/응답을 CAMEO_HAR_PATH에 저장 (.zip이면 본문을 별도 파일로 압축 저장)
+# - replay: 네트워크 대신 아카이브로 응답 (아카이브에 없는 요청은 실패 → 선택자/흐름 변경을 오프라인에서 확인)
+CAMEO_HAR_MODE = os.getenv("CAMEO_HAR_MODE", "").lower()
+CAMEO_HAR_PATH = os.getenv("CAMEO_HAR_PATH", "cameo_session.har.zip")
+# 재생 시 요청마다 추가할 지연시간 (실제 사이트 응답 속도 흉내)
+CAMEO_REPLAY_LATENCY_MS = float(os.getenv("CAMEO_REPLAY_LATENCY_MS", "0"))
 
-        # Open a new page once for the entire process
+
+class BrowserManager:
+    """
+    서버 수명 동안 유지되는 Chromium 브라우저 + 미리 준비된(warm) 검색 페이지
+
+    - prewarm(): 브라우저 실행 → 새 context → CAMEO 검색 페이지 로드 후 대기
+    - acquire_page(): 준비된 페이지를 넘겨주고 다음 요청용 페이지를 백그라운드에서 다시 준비
+      (요청마다 새 context를 사용하므로 MyChemicals 목록이 섞이지 않음)
+    - 실행 중이 아니면 crawl_cameo_sequential은 기존처럼 요청마다 브라우저를 띄움
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._warm = None            # (context, page)
+        self._warming_task = None
+        self._lock = asyncio.Lock()
+        self.last_error = None
+        self.warmed_once = False     # CAMEO 검색 페이지를 한 번이라도 열었는지 (/ready 기준)
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    @property
+    def is_warm(self) -> bool:
+        return self.is_running and self._warm is not None
+
+    async def start(self):
+        async with self._lock:
+            if self.is_running:
+                return
+            async_playwright = lazy_import("playwright.async_api").async_playwright
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            logger.info("[Browser] Chromium launched")
+
+    async def _open_search_page(self):
+        context = await self._browser.new_context()
         page = await context.new_page()
         page.set_default_timeout(45000)
-
         try:
-            for substance in substances:
-                try:
-                    # Add the current substance to MyChemicals
-                    await add_substance_to_mychemicals(page, substance)
-                    # Wait for the add action to complete
-                    await page.wait_for_timeout(1000)
-                    # After adding the substance, click 'New Search' for the next substance
-                    await trigger_new_search(page)
-
-                except Exception as e:
-                    print(f"[CAMEO] Error for substance {substance}: {e}")
-
-            # After all substances are added, click the "Predict Reactivity" button
-            await page.wait_for_selector("a[href='/reactivity']:has-text('Predict Reactivity')")
-            predict_button = page.locator("a[href='/reactivity']:has-text('Predict Reactivity')")
-            await predict_button.click()
-
-            # 결과 페이지 로드 대기
-            await page.wait_for_load_state("networkidle")
-            print(f"[CAMEO] Loaded reactivity results page: {page.url}")
-
-            # 모든 pairwise 결과 블록이 로드될 때까지 대기
+            await page.goto(CAMEO_SEARCH_URL, wait_until="networkidle")
+        except BaseException:
+            await _close_context(context)
+            raise
+        return context, page
+
+    async def prewarm(self):
+        """브라우저 실행 + 검색 페이지 미리 로드 (실패해도 서버는 계속 동작)"""
+        try:
+            await self.start()
+            if self._warm is None:
+                await self._park(await self._open_search_page())
+                logger.info("[Browser] Warm search page ready")
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"[Browser] Prewarm failed: {e}")
+
+    async def _park(self, warm):
+        """
+        새로 연 검색 페이지를 준비된 페이지로 보관
+        여는 동안(await) 다른 경로(prewarm / rewarm)가 먼저 보관했으면 새 context는 닫음
+        """
+        self.warmed_once = True
+        if self._warm is None:
+            self._warm = warm
+        else:
+            await _close_context(warm[0])
+
+    async def rewarm(self):
+        """
+        keep-warm: 준비된 검색 페이지를 새로 로드 (브라우저 / DNS / CAMEO 연결 유지)
+        브라우저가 꺼져 있으면 실행, 실패하면 예외를 그대로 올림
+        """
+        try:
+            await self.start()
+            stale, self._warm = self._warm, None
+            if stale is not None:
+                await _close_context(stale[0])
+            await self._park(await self._open_search_page())
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+
+    def _schedule_rewarm(self):
+        if self._warming_task is None or self._warming_task.done():
+            self._warming_task = asyncio.create_task(self.prewarm())
+
+    async def acquire_page(self):
+        """
+        크롤링용 (context, page) 반환 - 사용 후 context.close() 필요
+        준비된 페이지가 있으면 바로 사용하고, 없으면 새로 생성
+        """
+        if not self.is_running:
+            await self.start()
+
+        if self._warm is not None:
+            context, page = self._warm
+            self._warm = None
+        else:
+            context = await self._browser.new_context()
+            try:
+                page = await context.new_page()
+            except BaseException:
+                await _close_context(context)
+                raise
+            page.set_default_timeout(45000)
+
+        self._schedule_rewarm()
+        return context, page
+
+    async def close(self):
+        if self._warming_task is not None:
+            self._warming_task.cancel()
+        if self._warm is not None:
             try:
-                await page.wait_for_selector("div.pairwise_hazards", timeout=10000)
-            except Exception as e:
-                print(f"[CAMEO] Warning: Could not find div.pairwise_hazards - {e}")
-                # 페이지 스크린샷 저장 (디버깅용)
-                await page.screenshot(path="debug_screenshot.png")
-                print("[CAMEO] Screenshot saved to debug_screenshot.png")
-                # HTML 내용 확인
-                html_content = await page.content()
-                with open("debug_page.html", "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                print("[CAMEO] Page HTML saved to debug_page.html")
-
-            # pairwise_hazards 블록 모두 찾기
-            pairs = page.locator("div.pairwise_hazards")
-            pair_count = await pairs.count()
-            print(f"[CAMEO] Found {pair_count} pairwise hazard blocks")
-
-            for i in range(pair_count):
-                try:
-                    pair = pairs.nth(i)
-
-                    # 각 div의 id (예: Pair_1)
-                    pair_id = await pair.get_attribute("id")
-
-                    # 화학물질 1, 2 이름
-                    chemical_links = pair.locator("a")
-                    chem_1 = await chemical_links.nth(0).text_content()
-                    chem_2 = await chemical_links.nth(1).text_content()
-
-                    # 상태 (예: Compatible, Incompatible 등)
-                    status_elem = pair.locator("div strong")
-                    status_count = await status_elem.count()
-                    status = await status_elem.text_content() if status_count > 0 else "Unknown"
-
-                    # 설명 문구 - 모든 li 요소 수집
-                    desc_elems = pair.locator("ul.spaced3 li")
-                    desc_count = await desc_elems.count()
-                    descriptions = []
-                    if desc_count > 0:
-                        for j in range(desc_count):
-                            desc_text = await desc_elems.nth(j).text_content()
-                            if desc_text:
-                                descriptions.append(desc_text.strip())
-                    description = descriptions if descriptions else ["No description"]
-
-                    # 문서 링크 (상대경로 → 절대경로 변환)
-                    doc_elem = pair.locator("a[href*='reactivity/documentation']")
-                    doc_count = await doc_elem.count()
-                    doc_href = await doc_elem.get_attribute("href") if doc_count > 0 else None
-                    documentation_link = f"https://cameochemicals.noaa.gov{doc_href}" if doc_href else None
-
-                    # 결과 저장
-                    result_entry = {
-                        "pair_id": pair_id,
-                        "chemical_1": chem_1.strip() if chem_1 else None,
-                        "chemical_2": chem_2.strip() if chem_2 else None,
-                        "status": status.strip() if status else None,
-                        "descriptions": description,
-                        "documentation_link": documentation_link
-                    }
-                    results.append(result_entry)
-                    print(f"[CAMEO] Parsed pair {i+1}: {chem_1} + {chem_2} = {status} ({len(descriptions)} hazards)")
-
-                except Exception as e:
-                    print(f"[CAMEO] Error parsing pair {i}: {e}")
-                    continue
-
-            print(f"[CAMEO] Total results collected: {len(results)}")
+                await self._warm[0].close()
+            except Exception:
+                pass
+            self._warm = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def status(self) -> dict:
+        return {
+            "running": self.is_running,
+            "warm_page": self.is_warm,
+            # 브라우저 실행 중 + 검색 페이지를 한 번 이상 열었음
+            # (준비된 페이지는 크롤링 / keep-warm 중 잠시 비므로 준비 상태 기준으로 쓰지 않음)
+            "ready": self.is_running and self.warmed_once,
+            "last_error": self.last_error
+        }
+
+
+browser_manager = BrowserManager()
+
+
+async def _close_context(context):
+    """
+    크롤링 context 닫기 - 요청이 취소되는 중에도 끝까지 닫히도록 shield
+    (취소된 요청의 context가 남아 브라우저 자리를 차지하지 않도록)
+    """
+    try:
+        await asyncio.shield(context.close())
+    except Exception as e:
+        logger.debug(f"[Browser] Context close failed: {e}")
+
 
+# Sequential crawling function
+# name_map (optional): filled with {substance: CAMEO chemical name} for pair-level caching
+# har_mode (optional): "record" / "replay" with har_path (defaults: CAMEO_HAR_MODE / CAMEO_HAR_PATH)
+async def crawl_cameo_sequential(substances: list, name_map: dict = None, har_mode: str = None,
+                                 har_path: str = None, replay_latency_ms: float = None) -> list:
+    har = {
+        "har_mode": CAMEO_HAR_MODE if har_mode is None else har_mode,
+        "har_path": har_path or CAMEO_HAR_PATH,
+        "replay_latency_ms": CAMEO_REPLAY_LATENCY_MS if replay_latency_ms is None else replay_latency_ms,
+    }
+    # 같은 물질을 MyChemicals에 두 번 넣지 않도록 중복 제거 (순서 유지)
+    substances = list(dict.fromkeys(substances))
+    with BROWSER_SESSIONS.track_inprogress():
+        return await _crawl_in_browser(substances, name_map, **har)
+
+
+async def _new_crawl_context(browser, har_mode: str = "", har_path: str = None, replay_latency_ms: float = 0):
+    """크롤링용 context 생성 (기록/재생 모드면 HAR 설정 적용)"""
+    if har_mode == "record":
+        # minimal: 재생에 필요한 정보만 기록
+        return await browser.new_context(record_har_path=har_path, record_har_mode="minimal")
+
+    context = await browser.new_context()
+    if har_mode == "replay":
+        await context.route_from_har(har_path, not_found="abort")
+        if replay_latency_ms > 0:
+            # 나중에 등록한 route가 먼저 실행됨 → 지연 후 HAR route로 넘김
+            async def delay(route):
+                await asyncio.sleep(replay_latency_ms / 1000)
+                await route.fallback()
+            await context.route("**/*", delay)
+    elif har_mode:
+        raise ValueError(f"Unknown HAR mode: {har_mode}")
+    return context
+
+
+async def _crawl_in_browser(substances: list, name_map: dict = None, har_mode: str = "",
+                            har_path: str = None, replay_latency_ms: float = 0) -> list:
+    # 서버에서 브라우저를 미리 띄워둔 경우 (prewarm) 해당 브라우저의 새 context 사용
+    # (기록/재생 모드는 context 설정이 달라 항상 별도 브라우저 사용)
+    if browser_manager.is_running and not har_mode:
+        context, page = await browser_manager.acquire_page()
+        try:
+            return await _crawl_on_page(page, substances, name_map)
+        finally:
+            await _close_context(context)
+
+    # Playwright는 첫 크롤링 때 로드 (서버 cold start 단축)
+    async_playwright = lazy_import("playwright.async_api").async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await _new_crawl_context(browser, har_mode, har_path, replay_latency_ms)
+            try:
+                # Open a new page once for the entire process
+                page = await context.new_page()
+                page.set_default_timeout(45000)
+
+                return await _crawl_on_page(page, substances, name_map)
+            finally:
+                # HAR 기록은 context를 닫을 때 파일로 저장됨
+                await _close_context(context)
         finally:
             await browser.close()
 
-        return results
+
+async def _crawl_on_page(page, substances: list, name_map: dict = None) -> list:
+    names = name_map if name_map is not None else {}
+
+    for substance in substances:
+        try:
+            # Add the current substance to MyChemicals
+            chemical_name = await add_substance_to_mychemicals(page, substance)
+            if chemical_name:
+                names[substance] = chemical_name
+            with span("crawl.new_search", CRAWL_STEP_SECONDS, step="new_search"):
+                # Wait for the add action to complete
+                await page.wait_for_timeout(1000)
+                # After adding the substance, click 'New Search' for the next substance
+                await trigger_new_search(page)
+
+        except Exception as e:
+            CRAWL_FAILURES.inc(substance=substance)
+            logger.error(f"[CAMEO] Error for substance {substance}: {e}")
+
+    with span("crawl.predict", CRAWL_STEP_SECONDS, step="predict"):
+        # After all substances are added, click the "Predict Reactivity" button
+        await page.wait_for_selector("a[href='/reactivity']:has-text('Predict Reactivity')")
+        predict_button = page.locator("a[href='/reactivity']:has-text('Predict Reactivity')")
+        await predict_button.click()
+
+        # 결과 페이지 로드 대기
+        await page.wait_for_load_state("networkidle")
+        logger.debug(f"[CAMEO] Loaded reactivity results page: {page.url}")
+
+        # 모든 pairwise 결과 블록이 로드될 때까지 대기
+        try:
+            await page.wait_for_selector("div.pairwise_hazards", timeout=10000)
+        except Exception as e:
+            logger.warning(f"[CAMEO] Warning: Could not find div.pairwise_hazards - {e}")
+            # 페이지 스크린샷 저장 (디버깅용)
+            await page.screenshot(path="debug_screenshot.png")
+            logger.debug("[CAMEO] Screenshot saved to debug_screenshot.png")
+            # HTML 내용 확인
+            html_content = await page.content()
+            with open("debug_page.html", "w", encoding="utf-8") as f:
+                f.write(html_content)
+            logger.debug("[CAMEO] Page HTML saved to debug_page.html")
+
+    parse_started = time.perf_counter()
+
+    # 결과 페이지 HTML을 한 번에 가져와 파싱 (조합마다 locator 왕복 없이)
+    # 물질이 많으면 조합이 수만 개 → 파싱은 스레드에서 (다른 요청의 이벤트 루프를 막지 않음)
+    html = await page.content()
+    results = await asyncio.to_thread(parse_reactivity_html, html, CAMEO_BASE_URL)
+    for i, result in enumerate(results):
+        logger.debug(f"[CAMEO] Parsed pair {i+1}: {result['chemical_1']} + {result['chemical_2']} = "
+                     f"{result['status']} ({len(result['descriptions'])} hazards)")
+
+    finish_span("crawl.parse", parse_started, CRAWL_STEP_SECONDS, step="parse")
+    logger.info(f"[CAMEO] Total results collected: {len(results)}")
+
+    # 원본 페이지 보관 (파서 변경 시 재크롤링 없이 재파싱)
+    if PAGE_ARCHIVE_ENABLED:
+        try:
+            await asyncio.to_thread(page_archive.store, html, substances, names, page.url)
+        except Exception as e:
+            logger.warning(f"[PageArchive] Could not store page: {e}")
+
+    return results
+
 
 # Save results to a JSON file (optional)
 def save_results_to_file(results: list, output_file: str):
@@ -203,8 +417,69 @@ def run_pipeline(input_payload: dict, output_file: str, analyze_with_ai: bool =
 
     return results
 
+# 크롤링 기록/재생 (오프라인 크롤러 테스트 / 성능 비교용)
+# 기록 시 크롤링 결과를 <아카이브>.expected.json으로 함께 저장하고, 재생 결과와 비교
+def record_session(substances: list, har_path: str) -> int:
+    started = time.perf_counter()
+    results = asyncio.run(crawl_cameo_sequential(substances, har_mode="record", har_path=har_path))
+    elapsed = time.perf_counter() - started
+
+    with open(f"{har_path}.expected.json", "w", encoding="utf-8") as f:
+        json.dump({"substances": substances, "results": results}, f, ensure_ascii=False, indent=2)
+
+    print(f"Recorded {len(substances)} substances / {len(results)} pairs in {elapsed:.1f}s -> {har_path}")
+    return 0 if results else 1
+
+
+def replay_session(har_path: str, latency_ms: float = 0) -> int:
+    with open(f"{har_path}.expected.json", "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    started = time.perf_counter()
+    results = asyncio.run(crawl_cameo_sequential(
+        expected["substances"], har_mode="replay", har_path=har_path, replay_latency_ms=latency_ms
+    ))
+    elapsed = time.perf_counter() - started
+
+    print(f"Replayed {len(expected['substances'])} substances in {elapsed:.1f}s "
+          f"(latency {latency_ms:.0f} ms/request)")
+    if results != expected["results"]:
+        print(f"[FAIL] Results differ from recording: {len(results)} pairs parsed, "
+              f"{len(expected['results'])} expected")
+        for got, want in zip(results, expected["results"]):
+            if got != want:
+                print(f"  first mismatch:\n    got:      {got}\n    expected: {want}")
+                break
+        return 1
+
+    print(f"[OK] {len(results)} pairs match the recording")
+    return 0
+
+
 # Example execution
+#   python chemical_analyzer.py                                   input.json → output.json
+#   python chemical_analyzer.py record cameo.har.zip 7681-52-9 1336-21-6
+#   python chemical_analyzer.py replay cameo.har.zip --latency-ms 200
 if __name__ == "__main__":
+    import argparse
+    import sys
+
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Record or replay a CAMEO crawl")
+        subparsers = parser.add_subparsers(dest="command", required=True)
+        record_parser = subparsers.add_parser("record")
+        record_parser.add_argument("har_path")
+        record_parser.add_argument("substances", nargs="+")
+        replay_parser = subparsers.add_parser("replay")
+        replay_parser.add_argument("har_path")
+        replay_parser.add_argument("--latency-ms", type=float, default=0)
+        args = parser.parse_args()
+
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        if args.command == "record":
+            sys.exit(record_session(args.substances, args.har_path))
+        sys.exit(replay_session(args.har_path, args.latency_ms))
+
     input_path = "input.json"
     output_path = "output.json"
 
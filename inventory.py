@@ -0,0 +1,193 @@
+"""
+상시 화학물질 재고(Inventory) 관리
+재고 목록과 분석 결과를 저장해두고, 제품이 추가/삭제될 때
+새로 생기거나 사라지는 조합만 반영하여 분석 결과를 갱신
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pair_store import PairStore
+from simple_analyzer import analyze_simple, patch_analysis
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryNotFound(Exception):
+    pass
+
+
+class InventoryManager:
+    """
+    재고 저장/갱신
+
+    재고 문서 형식:
+        {
+            "inventory_id": "...",
+            "name": "...",
+            "products": [{"productName": "...", "casNumbers": [...]}],
+            "substances": {"CAS": "CAMEO 이름 또는 null"},
+            "unresolved_pairs": [["CAS", "CAS"], ...],  # 크롤링 후에도 결과가 없는 조합 (다음 추가 때 재시도)
+            "analysis": {...},                           # simple_analyzer 형식
+            "created_at": "...",
+            "updated_at": "..."
+        }
+    """
+
+    def __init__(self, directory: Path, pair_store: PairStore):
+        self.directory = Path(directory)
+        self.pair_store = pair_store
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _path(self, inventory_id: str) -> Path:
+        return self.directory / f"{inventory_id}.json"
+
+    def _lock(self, inventory_id: str) -> asyncio.Lock:
+        if inventory_id not in self._locks:
+            self._locks[inventory_id] = asyncio.Lock()
+        return self._locks[inventory_id]
+
+    def _save(self, inventory: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(inventory["inventory_id"])
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(inventory, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, inventory_id: str) -> dict:
+        path = self._path(inventory_id)
+        # inventory_id는 uuid hex만 허용 (경로 조작 방지)
+        if not inventory_id.isalnum() or not path.exists():
+            raise InventoryNotFound(inventory_id)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    async def create(self, name: Optional[str] = None) -> dict:
+        now = datetime.now().isoformat()
+        inventory = {
+            "inventory_id": uuid.uuid4().hex,
+            "name": name or "",
+            "products": [],
+            "substances": {},
+            "unresolved_pairs": [],
+            "analysis": analyze_simple([]),
+            "created_at": now,
+            "updated_at": now
+        }
+        await asyncio.to_thread(self._save, inventory)
+        logger.info(f"[Inventory] Created {inventory['inventory_id']}")
+        return inventory
+
+    async def add_products(self, inventory_id: str, products: List[dict],
+                           crawl: Callable[..., Awaitable[list]]) -> dict:
+        """
+        재고에 제품 추가
+
+        새 물질이 만드는 조합과 이전에 해결되지 않은 조합 중 저장소에 없는 조합만 크롤링하고,
+        분석 결과에는 새로 알게 된 조합만 반영 (products가 비어 있으면 해결되지 않은 조합만 재시도)
+        파일 / 저장소 쓰기는 스레드에서 실행 (이벤트 루프를 막지 않음)
+
+        Args:
+            products: [{"productName": str, "casNumbers": [str]}]
+            crawl: crawl(substances, name_map=...) 형태의 크롤링 함수
+        """
+        async with self._lock(inventory_id):
+            inventory = await asyncio.to_thread(self.get, inventory_id)
+            existing_cas = list(inventory["substances"].keys())
+
+            new_cas = []
+            for product in products:
+                for cas in product["casNumbers"]:
+                    cas = cas.strip()
+                    if cas and cas not in inventory["substances"] and cas not in new_cas:
+                        new_cas.append(cas)
+
+            # 이전 크롤링에서 결과를 얻지 못한 조합도 다시 반영
+            # (그 사이 다른 요청이 크롤링한 조합은 저장소 결과만 가져오고, 아직 모르는 조합만 크롤링)
+            previous_pairs = [(a, b) for a, b in inventory["unresolved_pairs"]]
+            retry_pairs = [(a, b) for a, b in previous_pairs if not self.pair_store.is_known(a, b)]
+            new_pairs = self.pair_store.missing_pairs(new_cas, existing_cas) + retry_pairs
+            if new_pairs:
+                # 새 조합에 관련된 물질만 한 세션으로 크롤링
+                crawl_targets = list(dict.fromkeys(cas for pair in new_pairs for cas in pair))
+                logger.info(f"[Inventory] Crawling {len(crawl_targets)} substances for {len(new_pairs)} new pairs")
+                name_map = {}
+                results = await crawl(crawl_targets, name_map=name_map)
+                await asyncio.to_thread(self.pair_store.record_crawl, crawl_targets, results, name_map)
+            else:
+                logger.info("[Inventory] All new pairs already known, no crawl needed")
+
+            # 분석에 반영할 조합: 새 물질 × (기존 + 새 물질) + 이전에 결과가 없던 조합 전부
+            formed_pairs = [(n, e) for n in new_cas for e in existing_cas]
+            formed_pairs += [(a, b) for i, a in enumerate(new_cas) for b in new_cas[i + 1:]]
+            formed_pairs += previous_pairs
+
+            unresolved = [
+                [a, b] for a, b in formed_pairs if not self.pair_store.is_known(a, b)
+            ]
+
+            inventory["analysis"] = patch_analysis(
+                inventory["analysis"],
+                self.pair_store.results_for(formed_pairs)
+            )
+            for cas in new_cas:
+                inventory["substances"][cas] = self.pair_store.name_for(cas)
+            for cas in {cas for pair in previous_pairs for cas in pair}:
+                inventory["substances"][cas] = inventory["substances"].get(cas) or self.pair_store.name_for(cas)
+            inventory["products"].extend(
+                {"productName": p["productName"], "casNumbers": list(p["casNumbers"])} for p in products
+            )
+            # 이전 조합도 formed_pairs에 있으므로 여전히 결과가 없는 조합만 남음
+            inventory["unresolved_pairs"] = unresolved
+            inventory["updated_at"] = datetime.now().isoformat()
+
+            await asyncio.to_thread(self._save, inventory)
+            logger.info(f"[Inventory] {inventory_id}: +{len(new_cas)} substances, +{len(formed_pairs)} pairs "
+                        f"({len(previous_pairs)} previously unresolved, {len(retry_pairs)} recrawled, {len(inventory['unresolved_pairs'])} unresolved)")
+            return inventory
+
+    async def remove_product(self, inventory_id: str, product_name: str) -> dict:
+        """
+        재고에서 제품 삭제
+
+        다른 제품에 남아있지 않은 물질의 조합만 분석 결과에서 제거
+        """
+        async with self._lock(inventory_id):
+            inventory = await asyncio.to_thread(self.get, inventory_id)
+
+            removed_products = [p for p in inventory["products"] if p["productName"] == product_name]
+            if not removed_products:
+                raise InventoryNotFound(f"{inventory_id}/{product_name}")
+
+            remaining = [p for p in inventory["products"] if p["productName"] != product_name]
+            remaining_cas = {cas.strip() for p in remaining for cas in p["casNumbers"]}
+            removed_cas = {
+                cas.strip() for p in removed_products for cas in p["casNumbers"]
+            } - remaining_cas
+
+            remaining_names = {inventory["substances"].get(cas) for cas in remaining_cas}
+            removed_names = [
+                inventory["substances"][cas] for cas in removed_cas
+                if inventory["substances"].get(cas) and inventory["substances"][cas] not in remaining_names
+            ]
+
+            inventory["analysis"] = patch_analysis(inventory["analysis"], [], removed_chemicals=removed_names)
+            for cas in removed_cas:
+                inventory["substances"].pop(cas, None)
+            inventory["products"] = remaining
+            inventory["unresolved_pairs"] = [
+                pair for pair in inventory["unresolved_pairs"]
+                if pair[0] not in removed_cas and pair[1] not in removed_cas
+            ]
+            inventory["updated_at"] = datetime.now().isoformat()
+
+            await asyncio.to_thread(self._save, inventory)
+            logger.info(f"[Inventory] {inventory_id}: -{len(removed_cas)} substances")
+            return inventory
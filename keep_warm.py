@@ -0,0 +1,188 @@
+"""
+Keep-warm 스케줄러 (서버 프로세스 안에서 실행)
+
+HF Space는 요청이 없으면 잠들어 첫 AI 요약이 "AI API timeout (model might be loading)"으로 끝나고,
+Chromium / CAMEO 연결(DNS, TLS)도 오래 쉬면 첫 크롤링이 느려지므로 주기적으로 깨워둠
+
+- 트래픽 기반 일정
+  - 최근 실제 요청이 대상을 사용했으면(AI 호출 / 크롤링) 그 주기는 건너뜀
+  - 최근 KEEP_WARM_HISTORY_DAYS일 동안 요청이 없던 시간대(앞뒤 1시간 포함)에는 깨우지 않음
+    (기록이 하루 미만이면 항상 깨움)
+- 실제 요청과 경쟁하지 않음
+  - 분석 요청이 처리 중이거나 대상이 사용 중이면 다음 확인 때로 미룸
+  - 블로킹 호출은 keep-warm 전용 스레드 1개에서 실행 (분석 요청의 to_thread 작업자를 쓰지 않음)
+  - 대상은 한 번에 하나씩 실행
+- Render 자체의 sleep은 외부 요청으로만 막을 수 있으므로 UptimeRobot의 Render 모니터는 유지
+
+환경 변수:
+    KEEP_WARM_ENABLED=1
+    KEEP_WARM_HF_INTERVAL_SECONDS=300
+    KEEP_WARM_CRAWLER_INTERVAL_SECONDS=900   # 0이면 크롤러는 깨우지 않음 (Chromium이 메모리에 상주)
+    KEEP_WARM_HISTORY_DAYS=7
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import KEEP_WARM_RUNS, KEEP_WARM_SECONDS
+
+KEEP_WARM_ENABLED = os.getenv("KEEP_WARM_ENABLED", "").lower() in ("1", "true", "yes")
+KEEP_WARM_HF_INTERVAL_SECONDS = float(os.getenv("KEEP_WARM_HF_INTERVAL_SECONDS", "300"))
+KEEP_WARM_CRAWLER_INTERVAL_SECONDS = float(os.getenv("KEEP_WARM_CRAWLER_INTERVAL_SECONDS", "900"))
+KEEP_WARM_HISTORY_DAYS = int(os.getenv("KEEP_WARM_HISTORY_DAYS", "7"))
+# 실행할 대상이 있는지 확인하는 간격 (초)
+KEEP_WARM_TICK_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficMonitor:
+    """실제 요청 흐름 기록 (처리 중인 분석 요청 수, 시간대별 요청 수, 대상별 마지막 사용 시각)"""
+
+    def __init__(self, history_days: int = KEEP_WARM_HISTORY_DAYS):
+        self.history_days = history_days
+        self.in_flight = 0
+        self._started = time.time()
+        self._hourly: Dict[Tuple[int, int], int] = {}  # (날짜, 시) -> 요청 수
+        self._last_used: Dict[str, float] = {}        # 대상 이름 -> monotonic 시각
+
+    @contextmanager
+    def track(self):
+        """분석 요청 처리 구간 (미들웨어에서 사용)"""
+        now = time.time()
+        key = (date.fromtimestamp(now).toordinal(), time.localtime(now).tm_hour)
+        self._hourly[key] = self._hourly.get(key, 0) + 1
+        if len(self._hourly) > 24 * (self.history_days + 1):
+            oldest = key[0] - self.history_days
+            self._hourly = {k: v for k, v in self._hourly.items() if k[0] >= oldest}
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def note_used(self, target: str):
+        """실제 요청이 대상을 사용함 (AI 호출 / 크롤링) - 스레드에서 호출해도 됨"""
+        self._last_used[target] = time.monotonic()
+
+    def used_within(self, target: str, seconds: float) -> bool:
+        last = self._last_used.get(target)
+        return last is not None and time.monotonic() - last < seconds
+
+    def expects_traffic(self, now: Optional[float] = None) -> bool:
+        """지금(앞뒤 1시간 포함) 요청이 있을 만한 시간대인지"""
+        now = now or time.time()
+        if now - self._started < 24 * 3600:
+            return True
+        hour = time.localtime(now).tm_hour
+        hours = {(hour - 1) % 24, hour, (hour + 1) % 24}
+        oldest = date.fromtimestamp(now).toordinal() - self.history_days
+        return any(day >= oldest and h in hours for day, h in self._hourly)
+
+
+class KeepWarmScheduler:
+    """
+    대상별 주기로 keep-warm 동작 실행
+
+    add(name, interval, action, blocking, busy):
+        action: 블로킹 함수(blocking=True, 전용 스레드에서 실행) 또는 코루틴 함수
+                False를 반환하거나 예외가 나면 실패로 기록
+        busy: True를 반환하면 대상이 사용 중 → 다음 확인 때로 미룸
+    """
+
+    def __init__(self, traffic: TrafficMonitor, tick_seconds: float = KEEP_WARM_TICK_SECONDS):
+        self.traffic = traffic
+        self.tick_seconds = tick_seconds
+        self._targets: List[dict] = []
+        self._last_run: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, interval: float, action: Callable, blocking: bool = False,
+            busy: Optional[Callable[[], bool]] = None):
+        self._targets.append({
+            "name": name, "interval": interval, "action": action, "blocking": blocking, "busy": busy
+        })
+
+    def start(self):
+        if not self._targets or self._task is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keep-warm")
+        # 요청의 trace / 로그 컨텍스트를 물려받지 않도록 빈 컨텍스트에서 실행
+        self._task = asyncio.create_task(self._loop(), context=contextvars.Context())
+        logger.info(f"[KeepWarm] Started for {[target['name'] for target in self._targets]}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[KeepWarm] Scheduler error: {e}")
+
+    async def run_due(self):
+        """주기가 된 대상을 하나씩 실행 (실제 요청이 처리 중이면 미룸)"""
+        for target in self._targets:
+            name = target["name"]
+            last_run = self._last_run.get(name)
+            if last_run is not None and time.monotonic() - last_run < target["interval"]:
+                continue
+            if self.traffic.in_flight > 0 or (target["busy"] is not None and target["busy"]()):
+                KEEP_WARM_RUNS.inc(target=name, result="deferred")
+                continue
+
+            self._last_run[name] = time.monotonic()
+            if self.traffic.used_within(name, target["interval"]):
+                KEEP_WARM_RUNS.inc(target=name, result="skipped_recent")
+                continue
+            if not self.traffic.expects_traffic():
+                KEEP_WARM_RUNS.inc(target=name, result="skipped_quiet")
+                continue
+
+            await self._run(target)
+
+    async def _run(self, target: dict):
+        name = target["name"]
+        started = time.perf_counter()
+        try:
+            if target["blocking"]:
+                ok = await asyncio.get_running_loop().run_in_executor(self._executor, target["action"])
+            else:
+                ok = await target["action"]()
+            result = "error" if ok is False else "success"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[KeepWarm] {name} failed: {e}")
+            result = "error"
+
+        elapsed = time.perf_counter() - started
+        KEEP_WARM_SECONDS.observe(elapsed, target=name)
+        KEEP_WARM_RUNS.inc(target=name, result=result)
+        logger.debug(f"[KeepWarm] {name}: {result} in {elapsed:.1f}s")
+
+
+traffic = TrafficMonitor()
+keep_warm = KeepWarmScheduler(traffic)
@@ -0,0 +1,138 @@
+"""
+구조화 로깅 설정
+- 요청별 컨텍스트(request_id, CAS 목록)를 모든 로그에 자동 첨부
+- QueueHandler로 로그 호출은 큐에 넣기만 하고 출력은 별도 스레드에서 처리 (요청 경로 비블로킹)
+- 콘솔 인코딩이 지원하지 않는 문자는 escape 처리 (cp949 등에서 UnicodeEncodeError 방지)
+- 크롤링 상세 로그는 DEBUG 레벨 → LOG_LEVEL로 조절 (전역 stdout 교체 불필요)
+
+환경 변수:
+    LOG_LEVEL=INFO        # DEBUG로 설정하면 크롤링 단계별 상세 로그 출력
+    LOG_FORMAT=text       # json: 한 줄에 JSON 객체 하나
+    LOG_QUEUE_SIZE=10000  # 큐가 가득 차면 로그를 버리고 개수만 기록 (요청이 로그 출력을 기다리지 않음)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+_request_id: ContextVar[Optional[str]] = ContextVar("log_request_id", default=None)
+_cas_numbers: ContextVar[Optional[str]] = ContextVar("log_cas_numbers", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+dropped_records = 0
+
+
+def bind_request_id(request_id: Optional[str]):
+    """현재 요청의 request_id 설정 → 복원용 token 반환"""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+def bind_cas_numbers(cas_numbers: Iterable[str]):
+    """현재 요청에서 분석 중인 CAS 목록 설정 (이후 로그에 cas=... 로 첨부)"""
+    return _cas_numbers.set(",".join(sorted(set(cas_numbers))))
+
+
+class ContextFilter(logging.Filter):
+    """로그 레코드에 request_id / cas 필드 추가 (QueueHandler에 넣기 전, 호출한 컨텍스트에서 실행)"""
+
+    def filter(self, record):
+        record.request_id = _request_id.get() or "-"
+        record.cas = _cas_numbers.get() or "-"
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, "request_id", "-") != "-":
+            line += f" request_id={record.request_id}"
+        if getattr(record, "cas", "-") != "-":
+            line += f" cas={record.cas}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "cas": getattr(record, "cas", "-"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SafeStreamHandler(logging.StreamHandler):
+    """스트림 인코딩으로 표현할 수 없는 문자는 \\uXXXX 형태로 출력"""
+
+    def emit(self, record):
+        try:
+            message = self.format(record)
+            encoding = getattr(self.stream, "encoding", None) or "utf-8"
+            message = message.encode(encoding, errors="backslashreplace").decode(encoding)
+            self.stream.write(message + self.terminator)
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버림 (요청 처리 지연 방지)"""
+
+    def enqueue(self, record):
+        global dropped_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records += 1
+
+
+def setup_logging():
+    """애플리케이션 로깅 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = SafeStreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
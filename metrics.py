@@ -0,0 +1,241 @@
+"""
+Prometheus 형식 메트릭 (외부 의존성 없음)
+파이프라인 단계별 지연시간 히스토그램과 캐시/크롤링/AI 카운터를 수집하고
+GET /metrics 에서 텍스트 형식으로 노출
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+# 크롤링(수십 초)부터 캐시 읽기(수 ms)까지 포함하는 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with HISTOGRAM.time(stage="..."): 블록 실행 시간 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        lines = []
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+def render_metrics() -> str:
+    """등록된 모든 메트릭을 Prometheus 텍스트 형식으로 변환"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- 파이프라인 메트릭 정의 ----
+
+CRAWL_STEP_SECONDS = Histogram(
+    "cameo_crawl_step_seconds",
+    "CAMEO crawl step latency (goto, search, add, new_search, predict, parse)",
+    ("step",)
+)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Analysis pipeline stage latency (analyze_simple, hf_summary, gemini_translation, cache_read, cache_write)",
+    ("stage",)
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups per layer and result (hit/miss)",
+    ("layer", "result")
+)
+
+CACHE_REFRESHES = Counter(
+    "cache_refreshes_total",
+    "Background rebuilds of expired or outdated cache entries (success/error)",
+    ("result",)
+)
+
+CAS_INPUTS = Counter(
+    "cas_inputs_total",
+    "Requested CAS numbers by validation result (valid/normalized/duplicate/invalid)",
+    ("result",)
+)
+
+ABANDONED_REQUESTS = Counter(
+    "abandoned_requests_total",
+    "Requests whose client disconnected before the response, per endpoint and policy (finish/abort)",
+    ("endpoint", "policy")
+)
+
+KEEP_WARM_RUNS = Counter(
+    "keep_warm_runs_total",
+    "Keep-warm runs per target and result (success/error/deferred/skipped_recent/skipped_quiet)",
+    ("target", "result")
+)
+
+KEEP_WARM_SECONDS = Histogram(
+    "keep_warm_seconds",
+    "Keep-warm run latency per target (hf_space, crawler)",
+    ("target",)
+)
+
+CRAWL_FAILURES = Counter(
+    "cameo_crawl_failures_total",
+    "CAMEO crawl failures per substance",
+    ("substance",)
+)
+
+AI_TIMEOUTS = Counter(
+    "ai_timeouts_total",
+    "AI backend timeouts per service",
+    ("service",)
+)
+
+BROWSER_SESSIONS = Gauge(
+    "browser_sessions_in_flight",
+    "Browser crawl sessions currently running"
+)
+BROWSER_SESSIONS.set(0)
+
+MEMORY_CACHE_ENTRIES = Gauge(
+    "memory_cache_entries",
+    "Responses held in the in-process result cache"
+)
+
+MEMORY_CACHE_BYTES = Gauge(
+    "memory_cache_bytes",
+    "Encoded response bytes held in the in-process result cache"
+)
@@ -0,0 +1,96 @@
+"""
+반응성 예측 결과 페이지 원본 보관소
+크롤링한 결과 페이지 HTML을 gzip으로 압축해 내용 해시(sha256)로 저장
+→ 파서를 고치거나 필드를 추가해도 다시 크롤링하지 않고 reparse_archive.py로 재생성
+
+구조:
+    {PAGE_ARCHIVE_DIR}/ab/abcdef....html.gz   페이지 원본 (같은 내용은 한 번만 저장)
+    {PAGE_ARCHIVE_DIR}/index.jsonl            크롤링마다 한 줄: sha256, 물질 CAS 목록, 이름 매핑, 시각
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+PAGE_ARCHIVE_DIR = Path(os.getenv("PAGE_ARCHIVE_DIR", "cache/reactivity_pages"))
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE", "1").lower() not in ("0", "false", "no")
+
+logger = logging.getLogger(__name__)
+
+
+class PageArchive:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.jsonl"
+
+    def _page_path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.html.gz"
+
+    def store(self, html: str, substances: List[str], name_map: Dict[str, str], url: str = None) -> str:
+        """
+        페이지 저장 + 색인 기록 (블로킹 - 스레드에서 호출)
+
+        Returns:
+            str: 페이지 sha256
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._page_path(digest)
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+
+        entry = {
+            "sha256": digest,
+            "substances": list(substances),
+            "name_map": dict(name_map),
+            "url": url,
+            "crawled_at": datetime.now().isoformat()
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        logger.debug(f"[PageArchive] Stored {digest[:12]} ({len(data)} bytes) for {len(substances)} substances")
+        return digest
+
+    def load(self, digest: str) -> str:
+        with open(self._page_path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def entries(self) -> Iterator[dict]:
+        """
+        색인 항목 (같은 물질 목록은 가장 최근 크롤링만)
+        """
+        if not self.index_path.exists():
+            return iter(())
+        latest = {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 동시에 쓰다 잘린 마지막 줄 등은 건너뜀
+                    continue
+                latest[tuple(sorted(entry["substances"]))] = entry
+        return iter(latest.values())
+
+
+page_archive = PageArchive(PAGE_ARCHIVE_DIR)
@@ -0,0 +1,512 @@
+"""
+CAS 쌍 결과 행렬 파일 (여러 uvicorn 워커가 mmap으로 공유)
+
+PairStore(cache/pairs.json)는 워커마다 전체 결과를 메모리에 올리고 파일도 따로 저장하므로
+워커를 늘리면 메모리가 워커 수만큼 늘고, 다른 워커가 이미 크롤링한 조합도 다시 크롤링함
+→ 고정 크기 레코드 + 해시 색인 바이너리 파일을 모든 워커가 읽기 전용 mmap으로 공유
+
+파일 구조 (little-endian):
+    헤더 (64 bytes)      magic, 버전, 색인 슬롯 수, 레코드 용량, 레코드 수, 쌍 개수, 힙 끝 위치, 세대
+    색인                  슬롯마다 u32 (레코드 번호 + 1, 0은 빈 슬롯) - 키 해시로 선형 탐사 → O(1) 조회
+    레코드                레코드마다 40 bytes: 키 해시, 키 / 화학물질 1, 2 / 상태 / 위험 설명 목록 /
+                          문서 링크 / pair_id 위치, 플래그 (하위 8비트 플래그, 상위 비트 파서 버전)
+    힙                    문자열(u32 길이 + UTF-8)과 위험 설명 목록(u32 개수 + 문자열 위치들)
+                          같은 상태 / 위험 설명 / 물질 이름은 한 번만 저장
+
+- 쓰기는 파일 잠금(flock)으로 한 번에 한 프로세스만 → 힙 → 레코드 → 색인 → 헤더 순서로 추가
+  (색인 슬롯이 기록되기 전까지 다른 워커에는 보이지 않음)
+- 같은 키를 다시 쓰면 새 레코드를 추가하고 색인만 교체 (읽는 중인 레코드는 바뀌지 않음)
+- 레코드 용량이 차면 두 배 크기의 새 파일로 다시 만든 뒤 교체 → 다른 워커는 조회 실패 시 새 파일을 다시 mmap
+- POSIX 전용 (fcntl / os.pwrite) → Windows에서는 JSON 저장소 사용
+
+환경 변수:
+    PAIR_STORE_BACKEND=json     # json: cache/pairs.json (기본), matrix: cache/pairs.bin (다중 워커)
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows → create_pair_store가 JSON 저장소 사용
+    fcntl = None
+
+from pair_store import PairStore, pair_key, LEGACY_PARSER_VERSION
+from reactivity_parser import PARSER_VERSION
+
+PAIR_STORE_BACKEND = os.getenv("PAIR_STORE_BACKEND", "json").lower()
+
+MAGIC = b"NPMX"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+INITIAL_CAPACITY = 4096
+
+# magic, version, bucket_count, capacity, record_count, pair_count, heap_end, generation
+_HEADER = struct.Struct("<4sIIIIIQQ")
+_SLOT = struct.Struct("<I")
+# key hash, key, chemical_1, chemical_2, status, descriptions, documentation_link, pair_id, flags
+_RECORD = struct.Struct("<Q8I")
+_U32 = struct.Struct("<I")
+
+FLAG_REPORTED = 1   # CAMEO가 보고한 조합 (아니면 결과 None)
+FLAG_NAME = 2       # CAS → CAMEO 이름 레코드 (키 "name:<CAS>", 이름은 chemical_1 위치)
+# 플래그의 상위 비트에 결과를 파싱한 파서 버전 (0은 버전을 기록하기 전의 레코드)
+_VERSION_SHIFT = 8
+
+# 쓰기 프로세스가 기억하는 문자열 / 목록 위치 개수 (중복 저장 방지용, 메모리 제한)
+_INTERN_LIMIT = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _name_key(cas: str) -> str:
+    return f"name:{cas}"
+
+
+def _layout(bucket_count: int, capacity: int) -> Tuple[int, int, int]:
+    """(색인 시작, 레코드 시작, 힙 시작) 위치"""
+    records_offset = HEADER_SIZE + bucket_count * _SLOT.size
+    return HEADER_SIZE, records_offset, records_offset + capacity * _RECORD.size
+
+
+class PairMatrix:
+    """쌍 키 → CAMEO 결과 / CAS → 이름 (프로세스 간 공유 파일)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._fd = None
+        self._mm = None
+        self._ino = None
+        # 쓰기용 상태 (잠금 안에서만 사용)
+        self._wfd = None
+        self._heap_end = 0
+        self._strings: Dict[str, int] = {}
+        self._lists: Dict[tuple, int] = {}
+        self._interned_ino = None
+
+    # ---- 파일 / mmap ----
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 쓰기 잠금 (같은 프로세스의 스레드는 self._lock으로 구분)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def open(self):
+        """파일 mmap (없으면 생성)"""
+        with self._lock:
+            if self._mm is not None:
+                return
+            if not self.path.exists():
+                with self._file_lock():
+                    if not self.path.exists():
+                        self._create(self.path, INITIAL_CAPACITY)
+            self._reopen()
+
+    def _reopen(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except Exception:
+            os.close(fd)
+            raise
+        magic, version = _HEADER.unpack_from(mm, 0)[:2]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            mm.close()
+            os.close(fd)
+            raise ValueError(f"{self.path} is not a pair matrix file (version {FORMAT_VERSION})")
+        if self._fd is not None:
+            os.close(self._fd)
+        # 이전 mmap은 닫지 않음 (참조가 없어지면 해제)
+        self._fd, self._mm, self._ino = fd, mm, os.fstat(fd).st_ino
+
+    def _grow(self):
+        """같은 파일이 커진 경우 (힙 추가) 다시 mmap"""
+        self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+
+    def _replaced(self) -> bool:
+        """다른 프로세스가 파일을 다시 만들어 교체했는지"""
+        try:
+            return os.stat(self.path).st_ino != self._ino
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _create(path: Path, capacity: int):
+        """빈 파일 생성 (임시 파일에 만든 뒤 교체)"""
+        bucket_count = capacity * 2
+        heap_offset = _layout(bucket_count, capacity)[2]
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, bucket_count, capacity, 0, 0, heap_offset, 0))
+            f.truncate(heap_offset)
+        os.replace(tmp_path, path)
+
+    def _header(self):
+        return _HEADER.unpack_from(self._mm, 0)
+
+    # ---- 읽기 ----
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        if offset + length > len(self._mm):
+            self._grow()
+        return self._mm[offset:offset + length]
+
+    def _string(self, offset: int) -> Optional[str]:
+        if not offset:
+            return None
+        length = _U32.unpack(self._bytes(offset, 4))[0]
+        return self._bytes(offset + 4, length).decode("utf-8")
+
+    def _string_list(self, offset: int) -> list:
+        count = _U32.unpack(self._bytes(offset, 4))[0]
+        offsets = struct.unpack(f"<{count}I", self._bytes(offset + 4, count * 4))
+        return [self._string(o) for o in offsets]
+
+    def _probe(self, key: str, key_hash: int):
+        """(슬롯 번호, 레코드 필드 또는 None) - 키가 없으면 비어 있는 슬롯"""
+        _, _, bucket_count, _, _, _, _, _ = self._header()
+        index_offset, records_offset, _ = _layout(bucket_count, 0)
+        slot = key_hash % bucket_count
+        while True:
+            value = _SLOT.unpack_from(self._mm, index_offset + slot * _SLOT.size)[0]
+            if value == 0:
+                return slot, None
+            fields = _RECORD.unpack_from(self._mm, records_offset + (value - 1) * _RECORD.size)
+            if fields[0] == key_hash and self._string(fields[1]) == key:
+                return slot, fields
+            slot = (slot + 1) % bucket_count
+
+    def _find(self, key: str):
+        with self._lock:
+            self.open()
+            fields = self._probe(key, _hash(key))[1]
+            if fields is None and self._replaced():
+                self._reopen()
+                fields = self._probe(key, _hash(key))[1]
+            return fields
+
+    def _decode(self, fields) -> Optional[dict]:
+        if not fields[8] & FLAG_REPORTED:
+            return None
+        return {
+            "pair_id": self._string(fields[7]),
+            "chemical_1": self._string(fields[2]),
+            "chemical_2": self._string(fields[3]),
+            "status": self._string(fields[4]),
+            "descriptions": self._string_list(fields[5]) if fields[5] else [],
+            "documentation_link": self._string(fields[6])
+        }
+
+    @staticmethod
+    def _version(fields) -> int:
+        return (fields[8] >> _VERSION_SHIFT) or LEGACY_PARSER_VERSION
+
+    def _find_version(self, key: str, version: Optional[int]):
+        """키의 레코드 필드 (version이 주어지면 그 파서 버전의 결과만)"""
+        fields = self._find(key)
+        if fields is None or (version is not None and self._version(fields) != version):
+            return None
+        return fields
+
+    def contains(self, key: str, version: Optional[int] = None) -> bool:
+        return self._find_version(key, version) is not None
+
+    def get(self, key: str, version: Optional[int] = None) -> Optional[dict]:
+        # 조회와 해석을 한 번의 잠금 안에서 (그 사이 _reopen으로 mmap이 바뀌면 힙 위치가 맞지 않음)
+        with self._lock:
+            fields = self._find_version(key, version)
+            return self._decode(fields) if fields is not None else None
+
+    def get_name(self, cas: str) -> Optional[str]:
+        with self._lock:
+            fields = self._find(_name_key(cas))
+            return self._string(fields[2]) if fields is not None else None
+
+    @property
+    def pair_count(self) -> int:
+        with self._lock:
+            self.open()
+            return self._header()[5]
+
+    def items(self, version: Optional[int] = None) -> Tuple[Dict[str, Optional[dict]], Dict[str, str]]:
+        """(pairs, names) 전체 (스냅샷 내보내기용, version이 주어지면 그 파서 버전의 쌍만)"""
+        pairs, names = {}, {}
+        for key, result, name, pair_version in self._entries():
+            if name is not None:
+                names[key[len("name:"):]] = name
+            elif version is None or pair_version == version:
+                pairs[key] = result
+        return pairs, names
+
+    def _entries(self) -> list:
+        """[(키, 결과, 이름, 파서 버전)] 전체 (파일 재생성용)"""
+        entries = []
+        with self._lock:
+            self.open()
+            if self._replaced():
+                self._reopen()
+            _, _, bucket_count, _, _, _, _, _ = self._header()
+            index_offset, records_offset, _ = _layout(bucket_count, 0)
+            for slot in range(bucket_count):
+                value = _SLOT.unpack_from(self._mm, index_offset + slot * _SLOT.size)[0]
+                if value == 0:
+                    continue
+                fields = _RECORD.unpack_from(self._mm, records_offset + (value - 1) * _RECORD.size)
+                key = self._string(fields[1])
+                if fields[8] & FLAG_NAME:
+                    entries.append((key, None, self._string(fields[2]), None))
+                else:
+                    entries.append((key, self._decode(fields), None, self._version(fields)))
+        return entries
+
+    # ---- 쓰기 ----
+
+    def _append(self, data: bytes) -> int:
+        offset = self._heap_end
+        os.pwrite(self._wfd, data, offset)
+        self._heap_end += len(data)
+        return offset
+
+    def _put_string(self, value: Optional[str], intern: bool = False) -> int:
+        if value is None:
+            return 0
+        if intern and value in self._strings:
+            return self._strings[value]
+        data = value.encode("utf-8")
+        offset = self._append(_U32.pack(len(data)) + data)
+        if intern and len(self._strings) < _INTERN_LIMIT:
+            self._strings[value] = offset
+        return offset
+
+    def _put_list(self, values: list) -> int:
+        values = tuple(values)
+        if values in self._lists:
+            return self._lists[values]
+        offsets = [self._put_string(v, intern=True) for v in values]
+        offset = self._append(struct.pack(f"<I{len(offsets)}I", len(offsets), *offsets))
+        if len(self._lists) < _INTERN_LIMIT:
+            self._lists[values] = offset
+        return offset
+
+    def _record(self, key: str, key_hash: int, result: Optional[dict], name: Optional[str], version: int) -> bytes:
+        key_offset = self._put_string(key)
+        if name is not None:
+            return _RECORD.pack(key_hash, key_offset, self._put_string(name, intern=True), 0, 0, 0, 0, 0, FLAG_NAME)
+        version_bits = version << _VERSION_SHIFT
+        if result is None:
+            return _RECORD.pack(key_hash, key_offset, 0, 0, 0, 0, 0, 0, version_bits)
+        return _RECORD.pack(
+            key_hash, key_offset,
+            self._put_string(result.get("chemical_1"), intern=True),
+            self._put_string(result.get("chemical_2"), intern=True),
+            self._put_string(result.get("status"), intern=True),
+            self._put_list(result.get("descriptions") or []),
+            self._put_string(result.get("documentation_link")),
+            self._put_string(result.get("pair_id")),
+            FLAG_REPORTED | version_bits
+        )
+
+    def put(self, pairs: Dict[str, Optional[dict]], names: Dict[str, str], overwrite: bool = True,
+            version: int = PARSER_VERSION) -> int:
+        """
+        쌍 결과 / 이름 추가 (블로킹 - 다른 프로세스가 쓰는 중이면 대기)
+
+        Args:
+            overwrite: False면 같은 파서 버전으로 이미 있는 키는 유지 (스냅샷 / JSON 저장소 가져오기)
+            version: 쌍 결과를 파싱한 파서 버전
+
+        Returns:
+            int: 새로 추가된 쌍 개수
+        """
+        entries = [(key, result, None, version) for key, result in pairs.items()]
+        entries += [(_name_key(cas), None, name, None) for cas, name in names.items()]
+        if not entries:
+            return 0
+
+        with self._lock:
+            # 파일이 없으면 open()이 생성하며 파일 잠금을 따로 잡으므로 잠금 전에 열어둠
+            self.open()
+            with self._file_lock():
+                return self._put_locked(entries, overwrite)
+
+    def _put_locked(self, entries: list, overwrite: bool) -> int:
+        """self._lock + 파일 잠금 안에서 호출"""
+        if self._replaced():
+            self._reopen()
+        _, _, _, capacity, record_count, _, _, _ = self._header()
+        if record_count + len(entries) > capacity:
+            self._rebuild(len(entries))
+        return self._write(entries, overwrite)
+
+    def _write(self, entries: list, overwrite: bool = True, generation: int = None) -> int:
+        """잠금 안에서 호출: 힙 → 레코드 → 색인 → 헤더 순서로 추가"""
+        if self._interned_ino != self._ino:
+            self._strings.clear()
+            self._lists.clear()
+            self._interned_ino = self._ino
+
+        magic, version, bucket_count, capacity, record_count, pair_count, heap_end, current = self._header()
+        index_offset, records_offset, _ = _layout(bucket_count, capacity)
+        self._wfd = os.open(self.path, os.O_RDWR)
+        self._heap_end = heap_end
+        added = 0
+        try:
+            for key, result, name, pair_version in entries:
+                key_hash = _hash(key)
+                slot, existing = self._probe(key, key_hash)
+                if (existing is not None and not overwrite
+                        and (name is not None or self._version(existing) == pair_version)):
+                    continue
+                if existing is None and name is None:
+                    added += 1
+                record = self._record(key, key_hash, result, name, pair_version or 0)
+                os.pwrite(self._wfd, record, records_offset + record_count * _RECORD.size)
+                os.pwrite(self._wfd, _SLOT.pack(record_count + 1), index_offset + slot * _SLOT.size)
+                record_count += 1
+            os.pwrite(self._wfd, _HEADER.pack(
+                magic, version, bucket_count, capacity, record_count, pair_count + added, self._heap_end,
+                current if generation is None else generation
+            ), 0)
+        finally:
+            os.close(self._wfd)
+            self._wfd = None
+        return added
+
+    def _rebuild(self, extra: int):
+        """레코드 용량이 부족하면 현재 항목으로 더 큰 새 파일을 만들어 교체 (잠금 안에서 호출)"""
+        entries = self._entries()
+        generation = self._header()[7]
+        capacity = max(self._header()[3] * 2, (len(entries) + extra) * 2)
+
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.rebuild")
+        self._create(tmp_path, capacity)
+        # 임시 파일은 이 프로세스만 사용하므로 파일 잠금 없이 기록
+        rebuilt = PairMatrix(tmp_path)
+        rebuilt.open()
+        rebuilt._write(entries, generation=generation + 1)
+        rebuilt.close()
+        os.replace(tmp_path, self.path)
+        self._reopen()
+        logger.info(f"[PairMatrix] Rebuilt with capacity {capacity} ({len(entries)} records)")
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+            self._fd = self._mm = self._ino = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            self.open()
+            _, version, bucket_count, capacity, record_count, pair_count, heap_end, generation = self._header()
+            return {
+                "path": str(self.path),
+                "pairs": pair_count,
+                "records": record_count,
+                "capacity": capacity,
+                "bytes": heap_end,
+                "generation": generation
+            }
+
+
+class PairMatrixStore(PairStore):
+    """
+    PairStore와 같은 인터페이스, 저장은 PairMatrix 파일 (모든 워커가 같은 파일을 mmap)
+    처음 열 때 비어 있으면 기존 cache/pairs.json 내용을 가져옴
+    """
+
+    def __init__(self, path: Path, legacy_path: Path = None):
+        super().__init__(path)
+        self.matrix = PairMatrix(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self.matrix.open()
+            self._loaded = True
+            if self.legacy_path and self.legacy_path.exists() and self.matrix.pair_count == 0:
+                try:
+                    with open(self.legacy_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    # 파서 버전별로 나눠 기록 (버전이 없는 쌍은 LEGACY_PARSER_VERSION)
+                    versions = data.get("parser_versions", {})
+                    by_version = {}
+                    for key, result in data.get("pairs", {}).items():
+                        by_version.setdefault(versions.get(key, LEGACY_PARSER_VERSION), {})[key] = result
+                    added = self.matrix.put({}, data.get("names", {}), overwrite=False)
+                    for version, pairs in by_version.items():
+                        added += self.matrix.put(pairs, {}, overwrite=False, version=version)
+                    logger.info(f"[PairMatrix] Imported {added} pairs from {self.legacy_path}")
+                except Exception as e:
+                    logger.error(f"[PairMatrix] Error importing {self.legacy_path}: {e}")
+            logger.info(f"[PairMatrix] Opened {self.path} ({self.matrix.pair_count} pairs)")
+
+    def count(self) -> int:
+        if not self._loaded:
+            self.load()
+        return self.matrix.pair_count
+
+    def name_for(self, cas: str) -> Optional[str]:
+        if not self._loaded:
+            self.load()
+        return self.matrix.get_name(cas)
+
+    def is_known(self, cas_1: str, cas_2: str) -> bool:
+        if not self._loaded:
+            self.load()
+        return self.matrix.contains(pair_key(cas_1, cas_2), version=self.parser_version)
+
+    def get(self, cas_1: str, cas_2: str) -> Optional[dict]:
+        if not self._loaded:
+            self.load()
+        return self.matrix.get(pair_key(cas_1, cas_2), version=self.parser_version)
+
+    def _store(self, recorded: Dict[str, Optional[dict]], names: Dict[str, str], save: bool) -> int:
+        # 쓰는 즉시 다른 워커에도 보이므로 save와 관계없이 바로 기록
+        if not self._loaded:
+            self.load()
+        return self.matrix.put(recorded, names, version=self.parser_version)
+
+    def snapshot(self) -> Tuple[Dict[str, Optional[dict]], Dict[str, str]]:
+        if not self._loaded:
+            self.load()
+        return self.matrix.items(version=self.parser_version)
+
+    def merge(self, pairs: Dict[str, Optional[dict]], names: Dict[str, str], save: bool = True) -> int:
+        if not self._loaded:
+            self.load()
+        return self.matrix.put(pairs, names, overwrite=False, version=self.parser_version)
+
+    def flush(self):
+        """PairMatrix는 쓸 때마다 파일에 기록하므로 할 일 없음"""
+
+
+def create_pair_store(cache_dir: Path) -> PairStore:
+    """PAIR_STORE_BACKEND에 따라 JSON 파일 / 공유 행렬 파일 저장소 생성"""
+    cache_dir = Path(cache_dir)
+    if PAIR_STORE_BACKEND == "matrix" and fcntl is None:
+        logger.warning("[PairMatrix] Not supported on this platform, using the JSON pair store")
+    elif PAIR_STORE_BACKEND == "matrix":
+        return PairMatrixStore(cache_dir / "pairs.bin", legacy_path=cache_dir / "pairs.json")
+    return PairStore(cache_dir / "pairs.json")
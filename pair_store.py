@@ -0,0 +1,279 @@
+"""
+CAS 쌍 단위 반응성 결과 저장소
+크롤링된 pairwise 결과를 (CAS, CAS) 키로 보관하여
+이미 알고 있는 조합은 다시 크롤링하지 않도록 함
+
+쌍마다 파싱한 파서 버전(PARSER_VERSION)을 함께 저장하고, 다른 버전의 결과는 없는 것으로 취급
+→ 파서를 고치면 해당 조합은 다시 크롤링되거나 reparse_archive.py로 재생성됨
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics import CACHE_REQUESTS
+from reactivity_parser import PARSER_VERSION
+
+# 쌍별 파서 버전을 기록하기 전에 저장된 결과의 버전
+LEGACY_PARSER_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def pair_key(cas_1: str, cas_2: str) -> str:
+    """순서와 무관한 CAS 쌍 키 생성"""
+    first, second = sorted((cas_1, cas_2))
+    return f"{first}|{second}"
+
+
+def required_pairs(combinations: Iterable[Tuple[str, ...]]) -> List[Tuple[str, str]]:
+    """조합들의 분석에 필요한 CAS 쌍 (중복 제거)"""
+    pairs = {}
+    for combo in combinations:
+        for cas_1, cas_2 in itertools.combinations(combo, 2):
+            pairs.setdefault(tuple(sorted((cas_1, cas_2))), None)
+    return list(pairs)
+
+
+def plan_sessions(pairs: Iterable[Tuple[str, str]], max_size: int) -> List[List[str]]:
+    """
+    모든 쌍을 포함하는 크롤링 세션(물질 목록) 계획 (탐욕법)
+
+    남은 쌍이 가장 많은 물질로 세션을 시작하고, 새로 포함되는 쌍이 가장 많은 물질을
+    max_size개까지 추가 → 포함된 쌍을 제외하고 반복
+    """
+    if max_size < 2:
+        raise ValueError("Session size must be at least 2")
+
+    uncovered = {frozenset(pair) for pair in pairs if pair[0] != pair[1]}
+    sessions = []
+    while uncovered:
+        degree = Counter(cas for pair in uncovered for cas in pair)
+        session = [min(degree, key=lambda cas: (-degree[cas], cas))]
+        while len(session) < max_size:
+            gains = {
+                cas: sum(1 for member in session if frozenset((cas, member)) in uncovered)
+                for cas in degree if cas not in session
+            }
+            if not gains:
+                break
+            best = min(gains, key=lambda cas: (-gains[cas], -degree[cas], cas))
+            if gains[best] == 0:
+                break
+            session.append(best)
+
+        uncovered -= {frozenset(pair) for pair in itertools.combinations(session, 2)}
+        sessions.append(sorted(session))
+    return sessions
+
+
+class PairStore:
+    """
+    CAS 쌍 → CAMEO pairwise 결과 매핑
+
+    - pairs: {"cas_a|cas_b": 결과 dict 또는 None}
+      None은 크롤링은 되었지만 CAMEO가 해당 조합을 보고하지 않은 경우
+    - names: {cas: CAMEO 물질 이름}
+    - parser_versions: {"cas_a|cas_b": 결과를 파싱한 파서 버전} (없으면 LEGACY_PARSER_VERSION)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.parser_version = PARSER_VERSION
+        self._lock = threading.Lock()
+        self._pairs: Dict[str, Optional[dict]] = {}
+        self._names: Dict[str, str] = {}
+        self._versions: Dict[str, int] = {}
+        self._loaded = False
+
+    def load(self):
+        """파일에서 로드 (서버 시작 시 lifespan에서 호출, 아니면 첫 사용 시)"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path.exists():
+                return
+            self._load()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._pairs = data.get("pairs", {})
+            self._names = data.get("names", {})
+            self._versions = data.get("parser_versions", {})
+            logger.info(f"[PairStore] Loaded {len(self._pairs)} pairs")
+        except Exception as e:
+            logger.error(f"[PairStore] Error loading {self.path}: {e}")
+
+    def _save(self):
+        """
+        임시 파일에 쓴 뒤 교체 (부분 쓰기 방지)
+
+        워커마다 다른 임시 파일을 쓰므로 저장 중인 파일이 섞이지는 않지만,
+        각 워커는 자기 메모리 내용으로 파일 전체를 교체 → 마지막에 저장한 워커가 다른 워커의 쌍을 덮어씀
+        (여러 워커는 PAIR_STORE_BACKEND=matrix 사용)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 워커마다 다른 임시 파일 (동시에 저장해도 찢어진 파일이 생기지 않음)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"pairs": self._pairs, "names": self._names, "parser_versions": self._versions},
+                f, ensure_ascii=False
+            )
+        os.replace(tmp_path, self.path)
+
+    def name_for(self, cas: str) -> Optional[str]:
+        if not self._loaded:
+            self.load()
+        return self._names.get(cas)
+
+    def _is_current(self, key: str) -> bool:
+        """저장되어 있고 현재 파서 버전으로 파싱된 결과인지"""
+        return key in self._pairs and self._versions.get(key, LEGACY_PARSER_VERSION) == self.parser_version
+
+    def is_known(self, cas_1: str, cas_2: str) -> bool:
+        if not self._loaded:
+            self.load()
+        return self._is_current(pair_key(cas_1, cas_2))
+
+    def get(self, cas_1: str, cas_2: str) -> Optional[dict]:
+        if not self._loaded:
+            self.load()
+        key = pair_key(cas_1, cas_2)
+        return self._pairs.get(key) if self._is_current(key) else None
+
+    def missing_pairs(self, new_cas: Iterable[str], existing_cas: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """
+        new_cas가 새로 만드는 쌍 중 아직 저장소에 없는 쌍
+
+        new × existing, new × new 조합만 검사 (existing끼리는 이미 분석됨)
+        """
+        new_list = list(dict.fromkeys(new_cas))
+        existing_list = [c for c in dict.fromkeys(existing_cas) if c not in new_list]
+
+        candidates = list(itertools.combinations(new_list, 2))
+        candidates += [(n, e) for n in new_list for e in existing_list]
+
+        candidates = [(a, b) for a, b in candidates if a != b]
+        missing = [(a, b) for a, b in candidates if not self.is_known(a, b)]
+
+        CACHE_REQUESTS.inc(len(candidates) - len(missing), layer="pair", result="hit")
+        CACHE_REQUESTS.inc(len(missing), layer="pair", result="miss")
+        return missing
+
+    def results_for(self, pairs: Iterable[Tuple[str, str]]) -> List[dict]:
+        """저장된 CAMEO 결과 반환 (보고되지 않은 조합은 제외)"""
+        results = []
+        for cas_1, cas_2 in pairs:
+            result = self.get(cas_1, cas_2)
+            if result:
+                results.append(result)
+        return results
+
+    def record_crawl(self, substances: List[str], results: List[dict], name_map: Dict[str, str],
+                     save: bool = True) -> int:
+        """
+        크롤링 결과를 CAS 쌍 단위로 저장
+
+        Args:
+            substances: 크롤링한 CAS 번호 리스트
+            results: crawl_cameo_sequential 결과
+            name_map: {CAS: CAMEO 물질 이름} (크롤러가 채움)
+            save: False면 메모리에만 반영 (대량 기록 후 flush() 한 번 호출)
+
+        Returns:
+            int: 새로 기록된 쌍 개수
+        """
+        name_to_cas = {}
+        for cas, name in name_map.items():
+            name_to_cas[name.strip().lower()] = cas
+
+        recorded = {}
+        for result in results:
+            chem_1 = (result.get("chemical_1") or "").strip().lower()
+            chem_2 = (result.get("chemical_2") or "").strip().lower()
+            cas_1 = name_to_cas.get(chem_1)
+            cas_2 = name_to_cas.get(chem_2)
+            if cas_1 and cas_2 and cas_1 != cas_2:
+                recorded[pair_key(cas_1, cas_2)] = result
+
+        # 세션에 포함되어 이름이 확인된 물질끼리인데 결과가 없는 조합은 None으로 기록
+        if results:
+            resolved = [c for c in dict.fromkeys(substances) if c in name_map]
+            for cas_1, cas_2 in itertools.combinations(resolved, 2):
+                recorded.setdefault(pair_key(cas_1, cas_2), None)
+
+        new_count = self._store(recorded, name_map, save)
+        logger.info(f"[PairStore] Recorded {new_count} new pairs ({self.count()} total)")
+        return new_count
+
+    def _store(self, recorded: Dict[str, Optional[dict]], names: Dict[str, str], save: bool) -> int:
+        """쌍 결과 / 이름 반영 → 새로 추가된 쌍 개수"""
+        if not self._loaded:
+            self.load()
+
+        with self._lock:
+            new_count = sum(1 for key in recorded if not self._is_current(key))
+            self._pairs.update(recorded)
+            self._versions.update(dict.fromkeys(recorded, self.parser_version))
+            self._names.update(names)
+            if save:
+                self._save_safely()
+        return new_count
+
+    def count(self) -> int:
+        return len(self._pairs)
+
+    def snapshot(self) -> Tuple[Dict[str, Optional[dict]], Dict[str, str]]:
+        """(pairs, names) 복사본 (스냅샷 내보내기용, 현재 파서 버전의 쌍만)"""
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            pairs = {key: result for key, result in self._pairs.items() if self._is_current(key)}
+            return pairs, dict(self._names)
+
+    def merge(self, pairs: Dict[str, Optional[dict]], names: Dict[str, str], save: bool = True) -> int:
+        """
+        다른 저장소의 결과 병합 (스냅샷 가져오기용, 현재 파서 버전의 결과여야 함)
+        이미 있는 쌍/이름은 유지 (다른 파서 버전의 쌍은 교체)
+
+        Returns:
+            int: 새로 추가된 쌍 개수
+        """
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            added = 0
+            for key, result in pairs.items():
+                if not self._is_current(key):
+                    self._pairs[key] = result
+                    self._versions[key] = self.parser_version
+                    added += 1
+            for cas, name in names.items():
+                self._names.setdefault(cas, name)
+            if save:
+                self._save_safely()
+        return added
+
+    def flush(self):
+        """메모리 내용을 파일에 저장"""
+        with self._lock:
+            self._save_safely()
+
+    def _save_safely(self):
+        try:
+            self._save()
+        except Exception as e:
+            logger.error(f"[PairStore] Error saving {self.path}: {e}")
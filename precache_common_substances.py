@@ -1,26 +1,41 @@
 """
 한국 생활화학제품 주요 물질 조합 사전 캐싱 스크립트
 
-일반 가정에서 흔히 사용하는 생활화학제품의 주요 성분들을
-미리 API에 요청하여 캐시를 생성합니다.
+일반 가정에서 흔히 사용하는 생활화학제품의 주요 성분 조합(2개 조합 전체 + 위험 물질 3개 조합)을
+미리 분석하여 캐시를 생성합니다.
+
+배포된 서버에 조합마다 /hybrid-analyze를 요청하는 대신 서버 코드를 직접 실행합니다.
+- 한 MyChemicals 세션에 물질 N개를 넣으면 N(N-1)/2개 조합 결과가 모두 나오므로,
+  대상 조합에 필요한 CAS 쌍을 모두 포함하는 최소한의 크롤링 세션만 계획 (PairStore에 있는 쌍은 제외,
+  pair_store.plan_sessions - /bulk-analyze와 같은 계획)
+- 세션은 --concurrency개까지 동시에 크롤링 → 결과를 PairStore(cache/pairs.json)에 기록
+- 조합별 분석 결과는 PairStore에서 모아 만든 뒤 결과 저장소(cache/results.db)에 바로 저장
+- 진행 상황을 체크포인트 파일에 기록 → 중단 후 다시 실행하면 남은 작업만 진행
+
+Usage:
+    python precache_common_substances.py --dry-run        # 크롤링 계획만 출력
+    python precache_common_substances.py --concurrency 2 --session-size 20
+    python precache_common_substances.py --no-ai --fresh   # AI 요약 없이, 체크포인트 무시
 """
 
-import requests
+import argparse
+import asyncio
 import itertools
-import time
 import json
+import os
+import time
+from collections import Counter
 from datetime import datetime
-from typing import List
 from pathlib import Path
+from typing import Iterable, List, Tuple
 
-# API 설정
-API_URL = "https://nemo-jisanhak-6lu8.onrender.com/hybrid-analyze"
-TIMEOUT = 300  # 5분
+from pair_store import plan_sessions, required_pairs
 
 # 로그 파일 설정
 LOG_DIR = Path("precache_logs")
 LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / f"precache_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+CHECKPOINT_FILE = LOG_DIR / "checkpoint.json"
 
 # 한국 가정에서 흔히 사용하는 생활화학제품의 주요 성분 (CAS 번호)
 COMMON_SUBSTANCES = [
@@ -51,153 +66,182 @@ COMMON_SUBSTANCES = [
     {"name": "Sodium Bicarbonate", "cas": "144-55-8"},  # 베이킹소다
 ]
 
+# 3개 조합은 위험한 물질 위주로 선별
+# Sodium Hypochlorite, Hydrogen Peroxide, Ammonia, Sodium Hydroxide, Hydrochloric Acid, Sulfuric Acid
+DANGEROUS_INDICES = [0, 1, 2, 3, 4, 5]
+
+# 한 세션(MyChemicals 목록)에 넣을 최대 물질 수
+DEFAULT_SESSION_SIZE = int(os.getenv("PRECACHE_SESSION_SIZE", "20"))
+
+
 def log(message: str):
     """화면과 파일에 동시 출력"""
     print(message)
     with open(LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
 
-def test_combination(cas_numbers: List[str], product_names: List[str], index: int, total: int):
-    """특정 물질 조합을 API에 요청하여 캐싱 (실패 시 건너뛰고 계속 진행)"""
-    log(f"\n[{index}/{total}] Testing: {product_names} (CAS: {cas_numbers})")
-
-    max_retries = 2  # 실패 시 최대 2번 재시도
-
-    # products 형식으로 변환
-    products = []
-    for i, cas in enumerate(cas_numbers):
-        products.append({
-            "productName": product_names[i],
-            "casNumbers": [cas]
-        })
-
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(
-                API_URL,
-                json={"useAi": True, "products": products},
-                timeout=TIMEOUT
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                risk_level = result.get("simple_response", {}).get("risk_level", "알 수 없음")
-                log(f"  ✅ Success! Risk Level: {risk_level}")
-                return True
-            else:
-                log(f"  ❌ Failed: HTTP {response.status_code} (Attempt {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    time.sleep(5)  # 재시도 전 5초 대기
-                    continue
-                return False
-
-        except requests.exceptions.Timeout:
-            log(f"  ⏱️ Timeout (>5분) (Attempt {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(5)
-                continue
-            return False
-        except requests.exceptions.ConnectionError as e:
-            log(f"  ❌ Connection Error: {e} (Attempt {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(10)  # 연결 오류 시 10초 대기
-                continue
-            return False
-        except Exception as e:
-            log(f"  ❌ Error: {e} (Attempt {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(5)
-                continue
-            return False
-
-    return False
 
-def main():
-    """메인 실행 함수 (자동 실행, 실패 시 건너뛰기)"""
+def target_combinations() -> List[Tuple[str, ...]]:
+    """캐싱할 CAS 조합 (2개 조합 전체 + 위험 물질 3개 조합)"""
+    cas_numbers = [substance["cas"] for substance in COMMON_SUBSTANCES]
+    dangerous = [cas_numbers[i] for i in DANGEROUS_INDICES]
+    return list(itertools.combinations(cas_numbers, 2)) + list(itertools.combinations(dangerous, 3))
+
+
+def combination_key(combo: Iterable[str]) -> str:
+    return ",".join(sorted(combo))
+
+
+def load_checkpoint(path: Path) -> dict:
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"sessions": [], "cached": [], "empty": []}
+
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    """임시 파일에 쓴 뒤 교체 (중단되어도 이전 체크포인트 유지)"""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def crawl_sessions(sessions: List[List[str]], concurrency: int, checkpoint: dict, checkpoint_path: Path):
+    """세션별 크롤링 → PairStore 기록 (동시에 concurrency개까지)"""
+    from backend_with_hf import crawl_cameo, pair_store
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = []
+
+    async def run(index: int, session: List[str]):
+        async with semaphore:
+            log(f"\n[Session {index}/{len(sessions)}] Crawling {len(session)} substances "
+                f"({len(session) * (len(session) - 1) // 2} pairs)")
+            started = time.time()
+            try:
+                name_map = {}
+                results = await crawl_cameo(session, name_map=name_map)
+                new_pairs = await asyncio.to_thread(pair_store.record_crawl, session, results, name_map)
+            except Exception as e:
+                log(f"  ❌ Session {index} failed: {e}")
+                failed.append(session)
+                return
+            log(f"  ✅ Session {index}: {len(results)} results, {new_pairs} new pairs "
+                f"in {time.time() - started:.1f}s")
+            checkpoint["sessions"].append(session)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    await asyncio.gather(*(run(i, session) for i, session in enumerate(sessions, 1)))
+    return failed
+
+
+async def cache_combinations(combinations: List[Tuple[str, ...]], use_ai: bool, concurrency: int,
+                             checkpoint: dict, checkpoint_path: Path):
+    """PairStore 결과로 조합별 하이브리드 분석 결과 생성 → 결과 저장소에 저장"""
+    from backend_with_hf import build_hybrid_result, save_to_cache, pair_store
+
+    semaphore = asyncio.Semaphore(concurrency)
+    done = set(checkpoint["cached"]) | set(checkpoint["empty"])
+    counts = Counter()
+
+    async def run(combo: Tuple[str, ...]):
+        key = combination_key(combo)
+        if key in done:
+            counts["skipped"] += 1
+            return
+        pairs = list(itertools.combinations(combo, 2))
+        if not all(pair_store.is_known(a, b) for a, b in pairs):
+            counts["incomplete"] += 1
+            return
+
+        results = pair_store.results_for(pairs)
+        if not results:
+            # CAMEO가 보고하지 않은 조합 (/hybrid-analyze도 404로 캐시하지 않음)
+            checkpoint["empty"].append(key)
+            counts["empty"] += 1
+        else:
+            async with semaphore:
+                # AI 요약/번역은 블로킹 HTTP 호출 → 스레드에서 실행
+                result = await asyncio.to_thread(build_hybrid_result, results, use_ai)
+                await save_to_cache(list(combo), result)
+            risk_level = result.get("simple_response", {}).get("risk_level", "알 수 없음")
+            log(f"  ✅ {key}: {risk_level} (AI: {result.get('ai_status')})")
+            checkpoint["cached"].append(key)
+            counts["cached"] += 1
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    await asyncio.gather(*(run(combo) for combo in combinations))
+    return counts
+
+
+async def precache(args) -> int:
+    from backend_with_hf import pair_store
+    from chemical_analyzer import browser_manager
+
+    combinations = target_combinations()
+    await asyncio.to_thread(pair_store.load)
+    pairs = required_pairs(combinations)
+    missing = [pair for pair in pairs if not pair_store.is_known(*pair)]
+    sessions = plan_sessions(missing, args.session_size)
+
     log("=" * 60)
-    log("한국 생활화학제품 물질 조합 사전 캐싱 (자동 모드)")
+    log("한국 생활화학제품 물질 조합 사전 캐싱")
     log("=" * 60)
     log(f"로그 파일: {LOG_FILE}")
-    log(f"\n총 물질 개수: {len(COMMON_SUBSTANCES)}")
-
-    # 2개 조합 생성 (가장 흔한 케이스)
-    combinations_2 = list(itertools.combinations(COMMON_SUBSTANCES, 2))
-    log(f"2개 조합 개수: {len(combinations_2)}")
-
-    # 3개 조합 생성 (일부만 - 너무 많으면 시간 소요)
-    # 위험한 조합 위주로 선별
-    dangerous_indices = [0, 1, 2, 3, 4, 5]  # Sodium Hypochlorite, Hydrogen Peroxide, Ammonia, Sodium Hydroxide, Hydrochloric Acid, Sulfuric Acid
-    dangerous_substances = [COMMON_SUBSTANCES[i] for i in dangerous_indices]
-    combinations_3 = list(itertools.combinations(dangerous_substances, 3))
-    log(f"3개 조합 개수 (선별): {len(combinations_3)}")
-
-    total_combinations = combinations_2 + combinations_3
-    total_count = len(total_combinations)
-
-    log(f"\n총 요청 개수: {total_count}")
-    log(f"예상 소요 시간 (최악): {total_count * 4} 분 ({total_count * 4 / 60:.1f} 시간)")
-    log(f"예상 소요 시간 (평균): {total_count * 2} 분 ({total_count * 2 / 60:.1f} 시간)")
-    log("[주의] 이미 캐시된 조합은 1초 내로 완료됩니다!")
-    log("[주의] 실패한 조합은 자동으로 건너뛰고 계속 진행됩니다.\n")
-
-    log("[시작] 3초 후 자동 시작...")
-    time.sleep(3)
-
-    # 통계
-    success_count = 0
-    fail_count = 0
-    failed_combinations = []
-    start_time = time.time()
-
-    # 모든 조합 테스트
-    for i, combo in enumerate(total_combinations, 1):
-        # combo는 substance dict들의 튜플
-        cas_numbers = [substance["cas"] for substance in combo]
-        product_names = [substance["name"] for substance in combo]
+    log(f"총 물질 개수: {len(COMMON_SUBSTANCES)}")
+    log(f"대상 조합: {len(combinations)}개 (필요한 CAS 쌍 {len(pairs)}개, PairStore에 없는 쌍 {len(missing)}개)")
+    log(f"크롤링 세션: {len(sessions)}개 (세션당 최대 {args.session_size}개 물질, 동시 {args.concurrency}개)")
+    for i, session in enumerate(sessions, 1):
+        log(f"  {i}. {session}")
+    if args.dry_run:
+        return 0
+
+    checkpoint_path = Path(args.checkpoint)
+    checkpoint = {"sessions": [], "cached": [], "empty": []} if args.fresh else load_checkpoint(checkpoint_path)
+    if checkpoint["cached"] or checkpoint["empty"]:
+        log(f"[체크포인트] {checkpoint_path}: 이미 처리한 조합 "
+            f"{len(checkpoint['cached']) + len(checkpoint['empty'])}개는 건너뜁니다")
 
-        success = test_combination(cas_numbers, product_names, i, total_count)
-
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
-            failed_combinations.append({"cas": cas_numbers, "names": product_names})
-
-        # 진행 상황
-        elapsed = time.time() - start_time
-        avg_time = elapsed / i if i > 0 else 0
-        remaining = (total_count - i) * avg_time
-
-        log(f"  Progress: {i}/{total_count} ({i/total_count*100:.1f}%) | Success: {success_count} | Fail: {fail_count}")
-        log(f"  Elapsed: {elapsed/60:.1f}분 | Remaining: {remaining/60:.1f}분")
-
-        # API 부하 방지를 위한 짧은 대기
-        time.sleep(2)
+    start_time = time.time()
+    failed_sessions = []
+    try:
+        if sessions:
+            # 세션마다 새 브라우저를 띄우지 않도록 하나를 공유 (세션별 context는 분리)
+            await browser_manager.start()
+            failed_sessions = await crawl_sessions(sessions, args.concurrency, checkpoint, checkpoint_path)
+    finally:
+        await browser_manager.close()
+
+    log("\n[분석] PairStore 결과로 조합별 분석 결과 저장...")
+    counts = await cache_combinations(combinations, not args.no_ai, args.concurrency, checkpoint, checkpoint_path)
 
-    # 최종 결과
     total_time = time.time() - start_time
     log("\n" + "=" * 60)
     log("[완료] 캐싱 완료!")
     log("=" * 60)
-    log(f"총 요청: {total_count}")
-    log(f"[성공] {success_count}개 ({success_count/total_count*100:.1f}%)")
-    log(f"[실패] {fail_count}개 ({fail_count/total_count*100:.1f}%)")
-    log(f"[시간] 소요 시간: {total_time/60:.1f}분 ({total_time/3600:.2f}시간)")
-    log(f"[속도] 평균 응답 시간: {total_time/total_count:.1f}초")
-
-    # 실패한 조합 저장
-    if failed_combinations:
-        log(f"\n[실패] 실패한 조합 목록 ({len(failed_combinations)}개):")
-        failed_file = LOG_DIR / f"failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(failed_file, 'w', encoding='utf-8') as f:
-            json.dump(failed_combinations, f, ensure_ascii=False, indent=2)
-        log(f"   실패 목록 저장: {failed_file}")
-        for combo in failed_combinations[:10]:  # 처음 10개만 출력
-            log(f"   - {combo}")
-        if len(failed_combinations) > 10:
-            log(f"   ... 외 {len(failed_combinations) - 10}개")
-
-    log("\n[완료] 모든 작업 완료! 로그는 위 파일에 저장되었습니다.")
+    log(f"[세션] 성공 {len(sessions) - len(failed_sessions)}개 / 실패 {len(failed_sessions)}개")
+    log(f"[조합] 저장 {counts['cached']}개, 이전 실행에서 처리 {counts['skipped']}개, "
+        f"결과 없음 {counts['empty']}개, 크롤링 실패로 남은 조합 {counts['incomplete']}개")
+    log(f"[시간] 소요 시간: {total_time/60:.1f}분")
+    if failed_sessions or counts["incomplete"]:
+        log("[실패] 다시 실행하면 남은 쌍만 크롤링합니다.")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precache common household substance combinations")
+    parser.add_argument("--session-size", type=int, default=DEFAULT_SESSION_SIZE,
+                        help="maximum substances per MyChemicals session")
+    parser.add_argument("--concurrency", type=int, default=2, help="crawl sessions / analyses run at once")
+    parser.add_argument("--no-ai", action="store_true", help="skip HF summary and Gemini translation")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_FILE))
+    parser.add_argument("--fresh", action="store_true", help="ignore the existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="print the crawl plan only")
+    args = parser.parse_args()
+    return asyncio.run(precache(args))
+
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
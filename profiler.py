@@ -0,0 +1,208 @@
+"""
+요청 단위 프로파일링 (관리자 전용, opt-in)
+재현이 어려운 느린 요청 하나만 cProfile로 측정하여 profiles/ 디렉토리에 저장
+
+- 분석기 / 직렬화 / 캐시 I/O 등 파이썬 코드 구간에서만 프로파일러를 켬
+  (크롤링·AI 호출처럼 네트워크를 기다리는 구간은 제외 → 다른 요청의 코드나 소켓 대기가 섞이지 않음)
+- 블로킹 함수는 프로파일링 중에도 스레드에서 실행 (이벤트 루프를 막지 않음)
+  구간마다 그 스레드에서 cProfile을 따로 켜고 저장할 때 합침
+- 크롤링 단계별 소요 시간(trace span)을 함께 저장
+- 최근 PROFILE_MAX_FILES개만 보관
+
+환경 변수:
+    ADMIN_TOKEN=...         # 설정하지 않으면 프로파일링 비활성화
+    PROFILE_DIR=profiles
+    PROFILE_MAX_FILES=20
+"""
+
+import asyncio
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "20"))
+PROFILE_TOP_FUNCTIONS = 30
+
+# 파일 이름으로 쓰이므로 X-Request-ID 값은 이 형식만 허용
+_PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+# 스레드마다 cProfile은 하나만 켤 수 있으므로 중첩 구간은 시간만 기록
+_thread_state = threading.local()
+
+logger = logging.getLogger(__name__)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """관리자 토큰 확인 (ADMIN_TOKEN 미설정 시 항상 False)"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def is_valid_profile_id(profile_id: str) -> bool:
+    return bool(_PROFILE_ID_PATTERN.match(profile_id))
+
+
+class RequestProfile:
+    """한 요청의 cProfile 결과 + 구간별 소요 시간"""
+
+    def __init__(self, request_id: str):
+        self.profile_id = request_id if is_valid_profile_id(request_id) else uuid.uuid4().hex
+        self.sections: dict = {}
+        self._profilers: List[cProfile.Profile] = []  # 구간별 cProfile (실행한 스레드에서 켬)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name: str, cpu: bool = True):
+        """
+        블록 실행 중에만 현재 스레드에서 프로파일러 활성화 (cpu=False면 시간만 기록)
+        블록 안에 await가 없어야 함 (다른 요청의 코드가 프로파일에 섞이지 않도록)
+        """
+        started = time.perf_counter()
+        profiler = None
+        if cpu and not getattr(_thread_state, "profiling", False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 활성화된 경우 → 시간만 기록
+                profiler = None
+            else:
+                _thread_state.profiling = True
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _thread_state.profiling = False
+            with self._lock:
+                if profiler is not None:
+                    self._profilers.append(profiler)
+                entry = self.sections.setdefault(name, {"count": 0, "total_ms": 0.0})
+                entry["count"] += 1
+                entry["total_ms"] = round(entry["total_ms"] + (time.perf_counter() - started) * 1000, 3)
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        """모든 구간의 cProfile 결과를 합친 통계 (측정한 구간이 없으면 None)"""
+        with self._lock:
+            profilers = list(self._profilers)
+        return pstats.Stats(*profilers) if profilers else None
+
+    def top_functions(self, limit: int = PROFILE_TOP_FUNCTIONS) -> List[dict]:
+        stats = self._stats()
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in rows
+        ]
+
+    def save(self, crawl_steps: List[dict], **extra) -> dict:
+        """요약(JSON) + pstats 파일 저장 (블로킹 - 스레드에서 호출)"""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        summary = {
+            "profile_id": self.profile_id,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sections": self.sections,
+            "crawl_steps": crawl_steps,
+            "top_functions": self.top_functions(),
+            **extra
+        }
+        stats = self._stats()
+        if stats is not None:
+            stats.dump_stats(str(PROFILE_DIR / f"{self.profile_id}.prof"))
+        with open(PROFILE_DIR / f"{self.profile_id}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        _prune()
+        logger.info(f"[Profile] Saved {self.profile_id} ({len(self.sections)} sections)")
+        return summary
+
+
+def _prune():
+    """가장 오래된 프로파일부터 삭제하여 PROFILE_MAX_FILES개 유지"""
+    summaries = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in summaries[PROFILE_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def start_profile(request_id: str):
+    """현재 컨텍스트에서 프로파일링 시작 → (profile, 복원용 token)"""
+    profile = RequestProfile(request_id)
+    return profile, _current_profile.set(profile)
+
+
+def end_profile(token):
+    _current_profile.reset(token)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profiled(name: str):
+    """프로파일링 중인 요청이면 블록을 프로파일 (아니면 아무것도 하지 않음)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.section(name):
+        yield
+
+
+async def run_blocking(name: str, func, *args, cpu: bool = False):
+    """
+    블로킹 함수를 이벤트 루프 밖(스레드)에서 실행 (프로파일링 중인 요청도 마찬가지)
+
+    프로파일링 중인 요청이면 스레드에서 구간 시간을 기록하고
+    cpu=True면 함수 전체를, 아니면 함수 안의 profiled() / span(profile=True) 구간만 cProfile로 측정
+    (AI 호출처럼 네트워크를 기다리는 함수는 cpu=False → 소켓 대기가 프로파일에 섞이지 않음)
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return await asyncio.to_thread(func, *args)
+
+    def run():
+        with profile.section(name, cpu=cpu):
+            return func(*args)
+
+    return await asyncio.to_thread(run)
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not is_valid_profile_id(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile_stats_path(profile_id: str) -> Optional[Path]:
+    """pstats 파일 경로 (snakeviz 등으로 열기), 없으면 None"""
+    if not is_valid_profile_id(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.prof"
+    return path if path.exists() else None
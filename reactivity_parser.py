@@ -0,0 +1,122 @@
+"""
+CAMEO 반응성 예측 결과 페이지(HTML) 파서
+크롤러(라이브 페이지)와 reparse_archive.py(보관된 페이지)가 같은 파서를 사용
+
+크롤러가 사용하던 선택자와 동일한 규칙:
+    div.pairwise_hazards                 조합 블록 (id: Pair_N)
+    a (처음 두 개)                         화학물질 1, 2 이름
+    div strong (첫 번째)                  상태 (Compatible / Incompatible / Caution ...)
+    ul.spaced3 li                         위험 설명
+    a[href*='reactivity/documentation']   문서 링크
+"""
+
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# 파서 출력 형식/규칙이 바뀌면 올림 (보관된 페이지 재파싱 대상 판단용)
+PARSER_VERSION = 1
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _Pair:
+    def __init__(self, pair_id: Optional[str], depth: int):
+        self.pair_id = pair_id
+        self.depth = depth
+        self.links: List[list] = []          # [href, text]
+        self.status: Optional[list] = None   # [text]
+        self.descriptions: List[list] = []   # [text]
+
+
+class _ReactivityParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[tuple] = []       # (tag, classes)
+        self.pairs: List[_Pair] = []
+        self.current: Optional[_Pair] = None
+        self.collectors: List[tuple] = []  # (depth, 텍스트를 모을 list)
+
+    def _in_spaced3_list(self) -> bool:
+        return any(tag == "ul" and "spaced3" in classes for tag, classes in self.stack)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        self.stack.append((tag, classes))
+        depth = len(self.stack)
+
+        if self.current is None:
+            if tag == "div" and "pairwise_hazards" in classes:
+                self.current = _Pair(attrs.get("id"), depth)
+                self.pairs.append(self.current)
+            return
+
+        if tag == "a":
+            link = [attrs.get("href"), ""]
+            self.current.links.append(link)
+            self.collectors.append((depth, link, 1))
+        elif tag == "strong" and self.current.status is None:
+            self.current.status = [""]
+            self.collectors.append((depth, self.current.status, 0))
+        elif tag == "li" and self._in_spaced3_list():
+            description = [""]
+            self.current.descriptions.append(description)
+            self.collectors.append((depth, description, 0))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in _VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # 닫히지 않은 태그가 있어도 가장 가까운 같은 태그까지 닫음
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                break
+        else:
+            return
+        depth = index + 1
+        del self.stack[index:]
+        self.collectors = [c for c in self.collectors if c[0] < depth]
+        if self.current is not None and self.current.depth >= depth:
+            self.current = None
+
+    def handle_data(self, data):
+        for _, target, index in self.collectors:
+            target[index] += data
+
+
+def parse_reactivity_html(html: str, base_url: str) -> List[dict]:
+    """
+    반응성 예측 결과 페이지 → 크롤러 결과 형식 리스트
+
+    Returns:
+        [{"pair_id", "chemical_1", "chemical_2", "status", "descriptions", "documentation_link"}, ...]
+        (화학물질 링크가 두 개 미만인 블록은 제외)
+    """
+    parser = _ReactivityParser()
+    parser.feed(html)
+    parser.close()
+
+    results = []
+    for pair in parser.pairs:
+        if len(pair.links) < 2:
+            continue
+
+        descriptions = [text.strip() for (text,) in pair.descriptions if text.strip()]
+        doc_href = next(
+            (href for href, _ in pair.links if href and "reactivity/documentation" in href),
+            None
+        )
+
+        results.append({
+            "pair_id": pair.pair_id,
+            "chemical_1": pair.links[0][1].strip(),
+            "chemical_2": pair.links[1][1].strip(),
+            "status": pair.status[0].strip() if pair.status else "Unknown",
+            "descriptions": descriptions if descriptions else ["No description"],
+            "documentation_link": f"{base_url}{doc_href}" if doc_href else None
+        })
+    return results
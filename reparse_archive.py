@@ -0,0 +1,118 @@
+"""
+보관된 반응성 결과 페이지 재파싱 스크립트
+
+reactivity_parser.py를 고친 뒤 다시 크롤링하지 않고
+page_archive에 보관된 원본 페이지로 조합 결과와 캐시를 재생성합니다.
+
+- 페이지 파싱은 CPU 코어 수만큼 프로세스로 병렬 처리
+- PairStore(cache/pairs.json): 조합 결과를 새 파싱 결과로 교체
+- 분석 캐시: 같은 물질 목록의 캐시가 있으면 규칙 기반 분석 / 안전 링크 / 분리 보관 그룹을 재계산
+  (AI 요약은 규칙 기반 결과와 별개이므로 그대로 유지)
+
+Usage:
+    python reparse_archive.py
+    python reparse_archive.py --workers 4 --dry-run
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chemical_analyzer import CAMEO_BASE_URL
+from page_archive import PageArchive, page_archive
+from reactivity_parser import PARSER_VERSION, parse_reactivity_html
+from simple_analyzer import ANALYZER_VERSION
+
+
+def parse_entry(task):
+    """(보관소 경로, 색인 항목) → (색인 항목, 결과 또는 None, 오류) - 작업 프로세스에서 실행"""
+    directory, entry = task
+    try:
+        html = PageArchive(directory).load(entry["sha256"])
+        return entry, parse_reactivity_html(html, CAMEO_BASE_URL), None
+    except Exception as e:
+        return entry, None, str(e)
+
+
+def rebuild_cached_result(cached: dict, cameo_results: list) -> dict:
+    """분석 캐시 항목의 규칙 기반 부분만 새 결과로 재계산"""
+    from simple_analyzer import analyze_simple
+    from safety_links import get_all_links_for_analysis
+    from storage_planner import plan_for_analysis
+
+    analysis_result = analyze_simple(cameo_results)
+    summary = analysis_result.get("summary", {})
+    simple_response = dict(cached.get("simple_response") or {})
+    simple_response["risk_level"] = summary.get("overall_status", "알 수 없음")
+    if not cached.get("ai_summary_korean"):
+        simple_response["message"] = summary.get("message", "")
+
+    return {
+        **cached,
+        "rule_based_analysis": analysis_result,
+        "simple_response": simple_response,
+        "safety_links": get_all_links_for_analysis(
+            analysis_result.get("dangerous_pairs", []),
+            analysis_result.get("caution_pairs", [])
+        ),
+        "storage_plan": plan_for_analysis(analysis_result)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse archived CAMEO reactivity pages")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="parse only, do not write pair store or cache")
+    args = parser.parse_args()
+
+    entries = list(page_archive.entries())
+    print("=" * 70)
+    print(f"Re-parse Archive (parser v{PARSER_VERSION})")
+    print("=" * 70)
+    print(f"Archive: {page_archive.directory} ({len(entries)} crawls)")
+    if not entries:
+        return 0
+
+    started = time.perf_counter()
+    tasks = [(str(page_archive.directory), entry) for entry in entries]
+    parsed = failed = pairs = caches = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        outcomes = pool.map(parse_entry, tasks, chunksize=8)
+
+        # 백엔드 모듈(캐시 / 저장소)은 작업 프로세스를 띄운 뒤 로드 (로깅 스레드 등이 fork되지 않도록)
+        from backend_with_hf import get_cache_key, result_store, pair_store
+
+        for entry, results, error in outcomes:
+            if error is not None:
+                failed += 1
+                print(f"  [FAIL] {entry['sha256'][:12]}: {error}")
+                continue
+
+            parsed += 1
+            pairs += len(results)
+            if args.dry_run:
+                continue
+
+            pair_store.record_crawl(entry["substances"], results, entry.get("name_map", {}), save=False)
+
+            cache_key = get_cache_key(entry["substances"])
+            cached = result_store.get_entry(cache_key)
+            if cached and results:
+                # 규칙 기반 부분만 재계산했으므로 프롬프트 버전은 기존 항목 값 유지
+                versions = {**cached["versions"], "analyzer": ANALYZER_VERSION, "parser": PARSER_VERSION}
+                result_store.put(cache_key, rebuild_cached_result(cached["result"], results), versions=versions)
+                caches += 1
+
+    if not args.dry_run:
+        pair_store.flush()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nParsed {parsed} pages ({pairs} pairs), failed {failed}, "
+          f"cache entries rebuilt {caches} in {elapsed:.1f}s with {args.workers} workers")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
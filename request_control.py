@@ -0,0 +1,216 @@
+"""
+요청 단위 취소 (클라이언트 연결 끊김 감지) / 기한(deadline)
+
+모바일 앱이 기다리다 포기해도 분석 요청은 크롤링 / AI 호출을 계속하며 브라우저 자리를 차지하므로
+요청을 별도 태스크로 실행하면서 연결을 감시하고, 끊기면 정책에 따라 처리
+- abort: 크롤링 태스크 취소 (Playwright context는 finally에서 닫힘) + AI 단계 중단
+- finish: 캐시에 남기기 위해 끝까지 실행 (AI 단계는 백그라운드 재생성과 같은 순서로 대기)
+
+AI 호출은 스레드(to_thread)에서 실행되어 취소할 수 없으므로, 요청 태스크와 스레드가 같은
+RequestControl을 공유하고 단계 사이에서 check_cancelled()로 멈춤
+
+기한: 요청마다 전체 시간 예산을 두고 크롤링 → AI 요약 → 번역이 남은 시간(remaining())만 사용
+기한을 넘긴 단계는 deadline_exceeded()에 기록되고, 호출한 쪽은 그때까지의 결과로 응답
+
+환경 변수:
+    ABANDONED_REQUEST_POLICY=finish   # finish | abort
+    REQUEST_DEADLINE_SECONDS=270      # 기본 기한 (클라이언트 권장 타임아웃 300초보다 짧게)
+    REQUEST_DEADLINE_MAX_SECONDS=600  # 클라이언트가 지정할 수 있는 최대 기한
+    MIN_STAGE_SECONDS=5               # 남은 시간이 이보다 적으면 다음 AI 단계를 시작하지 않음
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from metrics import ABANDONED_REQUESTS
+
+ABANDONED_REQUEST_POLICY = os.getenv("ABANDONED_REQUEST_POLICY", "finish").lower()
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "270"))
+REQUEST_DEADLINE_MAX_SECONDS = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "600"))
+MIN_STAGE_SECONDS = float(os.getenv("MIN_STAGE_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+_current_control: ContextVar[Optional["RequestControl"]] = ContextVar("request_control", default=None)
+# finish 정책으로 계속 실행 중인 태스크 (GC 방지)
+_background_tasks = set()
+
+
+class RequestCancelled(Exception):
+    """결과를 기다리는 클라이언트가 없어 요청을 중단함"""
+
+
+class RequestControl:
+    """한 요청의 취소 상태 / 기한 (요청 태스크와 AI 호출 스레드가 공유)"""
+
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        self._cancelled = threading.Event()
+        self.abandoned = False  # 클라이언트가 떠났는지 (finish 정책이면 계속 실행 중)
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_seconds if deadline_seconds else None
+        self.exceeded = []      # 기한 때문에 잘리거나 생략된 단계
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise RequestCancelled("client disconnected")
+
+
+def current_control() -> Optional[RequestControl]:
+    return _current_control.get()
+
+
+def check_cancelled():
+    """현재 요청이 취소되었으면 RequestCancelled (요청 밖에서는 아무것도 하지 않음)"""
+    control = _current_control.get()
+    if control is not None:
+        control.check()
+
+
+def is_abandoned() -> bool:
+    control = _current_control.get()
+    return control is not None and control.abandoned
+
+
+def resolve_deadline(requested: Optional[float]) -> float:
+    """클라이언트가 지정한 기한 (초) → 실제 기한 (없으면 기본값, 최대값으로 제한)"""
+    if not requested or requested <= 0:
+        return REQUEST_DEADLINE_SECONDS
+    return min(requested, REQUEST_DEADLINE_MAX_SECONDS)
+
+
+def extend_deadline(total_seconds: float):
+    """
+    현재 요청의 기한을 시작 시각 + total_seconds로 늘림 (REQUEST_DEADLINE_MAX_SECONDS로 제한, 줄이지는 않음)
+    작업량을 요청 처리 중에 알게 되는 경우에 사용 (/bulk-analyze의 크롤링 세션 수 등)
+    """
+    control = _current_control.get()
+    if control is None or control.deadline is None:
+        return
+    deadline = control.started + min(total_seconds, REQUEST_DEADLINE_MAX_SECONDS)
+    if deadline > control.deadline:
+        control.deadline = deadline
+
+
+def remaining(limit: Optional[float] = None) -> Optional[float]:
+    """
+    현재 요청의 남은 시간 (초, limit 이하)
+    요청 밖이거나 기한이 없으면 limit 그대로 (None이면 제한 없음)
+    """
+    control = _current_control.get()
+    if control is None or control.deadline is None:
+        return limit
+    left = max(0.0, control.deadline - time.monotonic())
+    return left if limit is None else min(limit, left)
+
+
+def has_budget(seconds: float = MIN_STAGE_SECONDS) -> bool:
+    """다음 단계를 시작할 만큼 시간이 남았는지"""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def mark_exceeded(stage: str):
+    """기한 때문에 잘리거나 생략된 단계 기록"""
+    control = _current_control.get()
+    if control is not None and stage not in control.exceeded:
+        control.exceeded.append(stage)
+        logger.warning(f"[Deadline] {stage} cut short by the request deadline")
+
+
+def deadline_exceeded() -> list:
+    control = _current_control.get()
+    return list(control.exceeded) if control is not None else []
+
+
+async def wait_for_disconnect(request):
+    """
+    클라이언트가 연결을 끊을 때까지 대기
+    요청 본문은 이미 읽었으므로 다음 ASGI 메시지는 http.disconnect
+    (request.is_disconnected()는 BaseHTTPMiddleware를 거치면 끊김을 보지 못해 직접 receive)
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def _log_background_result(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.warning(f"[Request] Abandoned request failed in background: {error}")
+    else:
+        logger.info("[Request] Abandoned request finished in background")
+
+
+async def run_until_disconnect(request, coro, endpoint: str, policy: Optional[str] = None,
+                               deadline_seconds: Optional[float] = None):
+    """
+    coro를 요청 태스크로 실행하면서 클라이언트 연결 감시
+
+    Args:
+        request: starlette Request (연결 확인용)
+        coro: 분석 코루틴 (현재 컨텍스트 - 로그 / 트레이스 - 를 복사해 실행)
+        endpoint: 메트릭 라벨
+        policy: finish | abort (기본 ABANDONED_REQUEST_POLICY)
+        deadline_seconds: 요청 기한 (coro 안에서 remaining() / has_budget()으로 확인)
+
+    Returns:
+        coro 결과
+
+    Raises:
+        RequestCancelled: 클라이언트가 떠남 (finish 정책이면 태스크는 백그라운드에서 계속 실행)
+    """
+    policy = policy or ABANDONED_REQUEST_POLICY
+    control = RequestControl(deadline_seconds)
+    token = _current_control.set(control)
+    try:
+        task = asyncio.create_task(coro)
+    finally:
+        _current_control.reset(token)
+    watcher = asyncio.create_task(wait_for_disconnect(request))
+
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        # 서버 종료 등으로 요청 자체가 취소됨
+        control.cancel()
+        task.cancel()
+        watcher.cancel()
+        raise
+
+    if task.done():
+        watcher.cancel()
+        return task.result()
+
+    control.abandoned = True
+    ABANDONED_REQUESTS.inc(endpoint=endpoint, policy=policy)
+    if policy == "finish":
+        logger.info(f"[Request] Client disconnected, finishing {endpoint} in background for the cache")
+        # 기다리는 클라이언트가 없으므로 남은 AI 단계는 기한 없이 끝까지 (캐시에 완전한 결과를 남김)
+        control.deadline = None
+        _background_tasks.add(task)
+        task.add_done_callback(_log_background_result)
+    else:
+        logger.info(f"[Request] Client disconnected, aborting {endpoint}")
+        control.cancel()
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    raise RequestCancelled("client disconnected")
@@ -0,0 +1,478 @@
+"""
+분석 결과 저장소 (SQLite 단일 파일)
+캐시 키마다 JSON 파일을 쓰던 방식을 대체
+
+- results 테이블: key(PRIMARY KEY) → zlib 압축된 compact JSON
+- WAL 모드 + BEGIN IMMEDIATE 트랜잭션 → 여러 uvicorn 워커가 같은 파일을 써도 원자적
+- 항목마다 생성 시각, 만료 시각(TTL), 생성 당시 버전(분석기 / 프롬프트 / 파서) 기록
+  → 만료되었거나 버전이 다른 항목도 get_entry로 조회 가능 (stale-while-revalidate: 응답 후 백그라운드 재생성)
+- 전체 크기가 RESULT_STORE_MAX_MB를 넘으면 가장 오래 조회되지 않은 항목부터 삭제
+  (전체 크기는 EVICT_CHECK_WRITES번 쓸 때마다 다시 계산하고 그 사이에는 쓴 크기를 더해 추정)
+- 조회 시각(accessed_at)은 메모리에 모았다가 다음 쓰기 또는 ACCESS_FLUSH_SECONDS마다 한 번에 기록
+  → 조회가 다른 워커의 쓰기 잠금을 기다리지 않음
+- 모든 메서드는 블로킹 → 이벤트 루프에서는 asyncio.to_thread 등으로 호출
+
+MemoryTier: 저장소 앞단의 프로세스 내 LRU
+- 자주 요청되는 조합의 응답을 JSON 인코딩된 bytes로 보관 → 조회 시 파싱/직렬화 없이 그대로 응답
+- 항목 수(RESULT_MEMORY_ENTRIES)와 전체 크기(RESULT_MEMORY_MB)로 제한
+
+환경 변수:
+    RESULT_STORE_PATH=cache/results.db
+    RESULT_TTL_SECONDS=0        # 0이면 만료 없음 (만료된 항목은 재생성 대상)
+    RESULT_STORE_MAX_MB=512
+    RESULT_MEMORY_ENTRIES=256   # 0이면 메모리 캐시 비활성화
+    RESULT_MEMORY_MB=32
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+RESULT_STORE_PATH = Path(os.getenv("RESULT_STORE_PATH", "cache/results.db"))
+RESULT_TTL_SECONDS = float(os.getenv("RESULT_TTL_SECONDS", "0"))
+RESULT_STORE_MAX_MB = float(os.getenv("RESULT_STORE_MAX_MB", "512"))
+RESULT_MEMORY_ENTRIES = int(os.getenv("RESULT_MEMORY_ENTRIES", "256"))
+RESULT_MEMORY_MB = float(os.getenv("RESULT_MEMORY_MB", "32"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    versions TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_results_expires_at ON results (expires_at);
+CREATE INDEX IF NOT EXISTS idx_results_accessed_at ON results (accessed_at);
+"""
+
+# 조회 시각을 모아서 기록하는 간격 (초) / 이때 다른 워커의 쓰기 잠금을 기다리는 최대 시간 (ms)
+ACCESS_FLUSH_SECONDS = 60
+ACCESS_BUSY_TIMEOUT_MS = 50
+# 전체 크기(SUM)를 다시 계산하는 쓰기 간격
+EVICT_CHECK_WRITES = 50
+# 연결의 기본 잠금 대기 시간 (ms)
+BUSY_TIMEOUT_MS = 30000
+
+# 이전 캐시 파일 이름 (md5 hex)
+_LEGACY_NAME = re.compile(r"^[0-9a-f]{32}\.json$")
+
+logger = logging.getLogger(__name__)
+
+
+def encode_result(result: dict) -> bytes:
+    return zlib.compress(json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_result(value: bytes) -> dict:
+    return json.loads(zlib.decompress(value).decode("utf-8"))
+
+
+def encode_response(result: dict) -> bytes:
+    """응답 본문 인코딩 (FastAPI JSONResponse와 같은 형식)"""
+    return json.dumps(result, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def is_expired(entry: dict, now: float = None) -> bool:
+    expires_at = entry["expires_at"]
+    return expires_at is not None and expires_at <= (time.time() if now is None else now)
+
+
+def is_fresh(entry: dict, versions: dict) -> bool:
+    """만료되지 않았고 현재 버전으로 만든 항목인지"""
+    return not is_expired(entry) and entry["versions"] == versions
+
+
+class ResultStore:
+    def __init__(self, path: Path, ttl_seconds: float = RESULT_TTL_SECONDS,
+                 max_bytes: int = int(RESULT_STORE_MAX_MB * 1024 * 1024)):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        # 아직 기록하지 않은 조회 시각 {key: 시각}
+        self._pending_access = {}
+        self._access_lock = threading.Lock()
+        self._last_access_flush = time.monotonic()
+        # 추정 전체 크기 (None이면 다음 쓰기 때 다시 계산)
+        self._approx_bytes = None
+        self._writes_since_check = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (to_thread 작업 스레드마다 하나)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if "versions" not in columns:
+                try:
+                    conn.execute("ALTER TABLE results ADD COLUMN versions TEXT NOT NULL DEFAULT '{}'")
+                except sqlite3.OperationalError:
+                    # 다른 워커가 먼저 추가한 경우
+                    pass
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[dict]:
+        """만료되지 않은 결과 반환 (없으면 None)"""
+        entry = self.get_entry(key)
+        if entry is None or is_expired(entry):
+            return None
+        return entry["result"]
+
+    def get_entry(self, key: str) -> Optional[dict]:
+        """
+        결과 + 메타데이터 반환 (만료된 항목 포함, 없으면 None)
+
+        Returns:
+            {"result", "created_at", "expires_at", "versions"}
+        """
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, created_at, expires_at, versions FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._access_lock:
+            self._pending_access[key] = now
+            due = time.monotonic() - self._last_access_flush >= ACCESS_FLUSH_SECONDS
+        if due:
+            self._flush_access(conn)
+        value, created_at, expires_at, versions = row
+        return {
+            "result": decode_result(value),
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "versions": json.loads(versions)
+        }
+
+    def _take_access(self) -> dict:
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+            self._last_access_flush = time.monotonic()
+        return pending
+
+    def _restore_access(self, pending: dict):
+        """기록하지 못한 조회 시각을 되돌림 (그 사이 더 최근 조회가 있으면 그것을 유지)"""
+        with self._access_lock:
+            for key, accessed_at in pending.items():
+                self._pending_access.setdefault(key, accessed_at)
+
+    @staticmethod
+    def _write_access(conn: sqlite3.Connection, pending: dict):
+        conn.executemany(
+            "UPDATE results SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in pending.items()]
+        )
+
+    def _flush_access(self, conn: sqlite3.Connection):
+        """
+        모아둔 조회 시각 기록 (조회 중 호출)
+        다른 워커가 쓰는 중이면 ACCESS_BUSY_TIMEOUT_MS만 기다리고 다음 기회로 미룸
+        """
+        pending = self._take_access()
+        if not pending:
+            return
+        conn.execute(f"PRAGMA busy_timeout = {ACCESS_BUSY_TIMEOUT_MS}")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_access(conn, pending)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError:
+            self._restore_access(pending)
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+    def put(self, key: str, result: dict, ttl_seconds: float = None, versions: dict = None):
+        """결과 저장 (같은 키는 교체) + 크기 제한 초과 시 정리"""
+        value = encode_result(result)
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl if ttl > 0 else None
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        # 쓰기 잠금을 잡은 김에 모아둔 조회 시각도 함께 기록 (정리 순서에 반영)
+        pending = self._take_access()
+        try:
+            self._write_access(conn, pending)
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created_at, expires_at, accessed_at, versions) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, value, len(value), now, expires_at, now, json.dumps(versions or {}, sort_keys=True))
+            )
+            self._maybe_evict(conn, len(value))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._restore_access(pending)
+            self._approx_bytes = None
+            raise
+
+    def _maybe_evict(self, conn: sqlite3.Connection, written: int):
+        """
+        EVICT_CHECK_WRITES번마다 또는 추정 크기가 제한을 넘을 때만 전체 크기 계산 후 정리
+        (쓰기 트랜잭션 안에서 호출 → 워커 간에도 한 번에 하나씩 실행)
+        다른 워커가 쓴 크기는 다음 재계산 때 반영
+        """
+        self._writes_since_check += 1
+        if self._approx_bytes is not None and self._writes_since_check < EVICT_CHECK_WRITES:
+            self._approx_bytes += written
+            if self._approx_bytes <= self.max_bytes:
+                return
+        self._writes_since_check = 0
+        self._approx_bytes = self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """제한을 넘으면 정리 → 정리 후 전체 크기"""
+        # 만료된 항목은 재생성될 때까지 stale 응답으로 쓰이므로 크기 기준으로만 삭제
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return total
+
+        # 가장 오래 조회되지 않은 항목부터 제한의 90%가 될 때까지 삭제
+        target = total - int(self.max_bytes * 0.9)
+        removed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            keys.append((key,))
+            removed += size
+            if removed >= target:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", keys)
+        logger.info(f"[ResultStore] Evicted {len(keys)} entries ({removed} bytes)")
+        return total - removed
+
+    def delete(self, key: str) -> bool:
+        return self._connect().execute("DELETE FROM results WHERE key = ?", (key,)).rowcount > 0
+
+    def purge_expired(self) -> int:
+        """만료된 항목 삭제 (다음 요청은 재생성을 기다림)"""
+        return self._connect().execute(
+            "DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+
+    def keys(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        """최근 저장 순 키 목록"""
+        rows = self._connect().execute(
+            "SELECT key, size, created_at, expires_at, accessed_at FROM results "
+            "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+        return [
+            {"key": key, "size": size, "created_at": created, "expires_at": expires, "accessed_at": accessed}
+            for key, size, created, expires, accessed in rows
+        ]
+
+    def stats(self) -> dict:
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "path": str(self.path)
+        }
+
+    def iter_entries(self, batch_size: int = 200) -> Iterator[dict]:
+        """
+        전체 항목을 키 순서로 하나씩 반환 (스냅샷 내보내기용, 한 번에 batch_size개씩 읽음)
+        {"key", "result", "created_at", "expires_at", "versions"}
+        """
+        cursor = self._connect().execute(
+            "SELECT key, value, created_at, expires_at, versions FROM results ORDER BY key"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for key, value, created_at, expires_at, versions in rows:
+                yield {
+                    "key": key,
+                    "result": decode_result(value),
+                    "created_at": created_at,
+                    "expires_at": expires_at,
+                    "versions": json.loads(versions)
+                }
+
+    def import_entries(self, entries: Iterable[dict], batch_size: int = 500) -> int:
+        """
+        iter_entries 형식 항목 저장 (이미 있는 키는 유지, 생성 시각 / 버전은 그대로)
+        batch_size개마다 커밋 → 가져오는 동안 다른 워커의 쓰기를 오래 막지 않음
+
+        Returns:
+            int: 새로 추가된 항목 수
+        """
+        conn = self._connect()
+        added = 0
+        now = time.time()
+
+        def write(rows):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO results "
+                    "(key, value, size, created_at, expires_at, accessed_at, versions) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                count = conn.total_changes - before
+                self._approx_bytes = self._evict(conn)
+                self._writes_since_check = 0
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return count
+
+        rows = []
+        for entry in entries:
+            value = encode_result(entry["result"])
+            rows.append((
+                entry["key"], value, len(value), entry["created_at"], entry.get("expires_at"), now,
+                json.dumps(entry.get("versions") or {}, sort_keys=True)
+            ))
+            if len(rows) >= batch_size:
+                added += write(rows)
+                rows = []
+        if rows:
+            added += write(rows)
+        return added
+
+    def import_legacy(self, directory: Path) -> int:
+        """
+        이전 형식(캐시 키별 JSON 파일)을 가져온 뒤 파일 삭제
+        이미 저장소에 있는 키는 덮어쓰지 않음 (버전 정보가 없으므로 첫 조회 때 재생성 대상)
+        """
+        imported = 0
+        conn = self._connect()
+        for path in Path(directory).glob("*.json"):
+            if not _LEGACY_NAME.match(path.name):
+                continue
+            key = path.stem
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+                value = encode_result(result)
+                now = time.time()
+                expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else None
+                conn.execute(
+                    "INSERT OR IGNORE INTO results (key, value, size, created_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, len(value), path.stat().st_mtime, expires_at, now)
+                )
+                path.unlink()
+                imported += 1
+            except Exception as e:
+                logger.warning(f"[ResultStore] Could not import {path.name}: {e}")
+        if imported:
+            logger.info(f"[ResultStore] Imported {imported} legacy cache files")
+        return imported
+
+
+class MemoryTier:
+    """키 → (응답 bytes, 만료 시각) LRU (스레드 안전)"""
+
+    def __init__(self, max_entries: int = RESULT_MEMORY_ENTRIES,
+                 max_bytes: int = int(RESULT_MEMORY_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, body: bytes, expires_at: Optional[float] = None):
+        # 제한보다 큰 응답은 보관하지 않음 (다른 항목을 모두 밀어내지 않도록)
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, expires_at)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the analysis result store")
+    parser.add_argument("command", choices=["stats", "keys", "purge"])
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = ResultStore(RESULT_STORE_PATH)
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    elif args.command == "keys":
+        for item in store.keys(limit=args.limit):
+            print(f"{item['key']}  {item['size']:>8} bytes  created {time.ctime(item['created_at'])}")
+    else:
+        print(f"Purged {store.purge_expired()} expired entries")
@@ -3,90 +3,152 @@
 위험/주의 조합에 대한 관련 기사 및 안전 정보 링크
 """
 
-# 주요 물질 조합별 안전 정보 링크
-CHEMICAL_SAFETY_LINKS = {
-    # 락스 + 암모니아 (매우 위험)
-    ("bleach", "ammonia"): [
-        {
-            "title": "락스와 암모니아 혼합 사고 예방",
-            "url": "https://www.kosha.or.kr/kosha/data/musafetydata.do?mode=view&articleNo=430945",
-            "source": "안전보건공단",
-            "type": "사고예방"
-        },
-        {
-            "title": "염소계 표백제 안전사용 지침",
-            "url": "https://www.kosha.or.kr",
-            "source": "안전보건공단",
-            "type": "안전지침"
-        }
-    ],
-
-    # 락스 + 식초/산성 세제 (매우 위험)
-    ("bleach", "acid"): [
-        {
-            "title": "락스와 산성세제 혼합 사고 주의",
-            "url": "https://www.kosha.or.kr",
-            "source": "안전보건공단",
-            "type": "사고예방"
-        }
-    ],
-
-    # 과산화수소 + 산 (위험)
-    ("peroxide", "acid"): [
-        {
-            "title": "과산화수소 취급 안전 지침",
-            "url": "https://www.kosha.or.kr",
-            "source": "안전보건공단",
-            "type": "안전지침"
-        }
-    ],
-}
-
-# 공식 안전자료 링크
-OFFICIAL_SAFETY_RESOURCES = [
-    {
-        "title": "MSDS 통합검색 (안전보건공단)",
-        "url": "https://msds.kosha.or.kr/",
-        "description": "모든 화학물질의 물질안전보건자료(MSDS) 검색"
-    },
-    {
-        "title": "화학물질 안전정보 (환경부)",
-        "url": "https://ncis.nier.go.kr/",
-        "description": "국가 화학물질 정보시스템"
-    },
-    {
-        "title": "화학물질 배출이동량 정보",
-        "url": "https://tri.me.go.kr/",
-        "description": "화학물질 배출량 및 유해성 정보"
-    },
-]
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
 
+logger = logging.getLogger(__name__)
 
-def normalize_chemical_name(name):
+# 별칭/조합 링크/공식 자료는 데이터 파일에서 로드 (재배포 없이 확장 가능)
+CATALOGUE_PATH = Path(os.getenv(
+    "SAFETY_CATALOGUE_PATH",
+    Path(__file__).resolve().parent / "data" / "safety_catalogue.json"
+))
+
+# 파일 변경 확인 주기 (초)
+CATALOGUE_RELOAD_INTERVAL = float(os.getenv("SAFETY_CATALOGUE_RELOAD_INTERVAL", "5"))
+
+
+def _build_alias_trie(aliases):
     """
-    화학물질 이름을 정규화 (링크 검색용)
+    별칭들로 trie 생성 (끝 노드의 "" 값 = 카탈로그에서의 순서)
+
+    같은 접두사를 공유하는 별칭을 하나의 가지로 묶어 별칭 수와 무관하게
+    이름의 각 위치에서 문자 단위로 한 번만 비교
     """
-    name = name.lower().strip()
-
-    # 일반적인 별칭 매핑
-    aliases = {
-        "sodium hypochlorite": "bleach",
-        "sodium hydroxide": "lye",
-        "acetic acid": "acid",
-        "glacial acetic acid": "acid",
-        "hydrochloric acid": "acid",
-        "sulfuric acid": "acid",
-        "nitric acid": "acid",
-        "hydrogen peroxide": "peroxide",
-        "ammonia": "ammonia",
-        "ammonium hydroxide": "ammonia",
-    }
+    trie = {}
+    for priority, alias in enumerate(aliases):
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node.setdefault("", priority)
+    return trie
+
+
+def _match_alias(trie, name):
+    """
+    이름에 들어 있는 별칭 중 카탈로그에서 가장 먼저 나온 별칭의 순서 (없으면 None)
+    여러 별칭이 들어 있는 이름은 카탈로그 순서가 우선
+    (예: "hydrogen peroxide, acetic acid solution" → acetic acid가 먼저이므로 acid)
+    """
+    best = None
+    for start in range(len(name)):
+        node = trie
+        for char in name[start:]:
+            node = node.get(char)
+            if node is None:
+                break
+            priority = node.get("")
+            if priority is not None and (best is None or priority < best):
+                best = priority
+    return best
+
+
+class CatalogueSnapshot:
+    """
+    로드된 카탈로그 (불변) - 핫 리로드 시 통째로 교체됨
+
+    - alias_trie: 별칭 매칭용 trie (여러 별칭이 들어 있으면 카탈로그 순서가 우선)
+    - pair_index: {frozenset({이름1, 이름2}): (링크, ...)}
+    - normalize: 스냅샷별 메모이즈된 이름 정규화
+    """
+
+    def __init__(self, data: dict, mtime: float = 0.0):
+        self.version = data.get("version")
+        self.mtime = mtime
+        self.aliases = {k.lower().strip(): v for k, v in data.get("aliases", {}).items()}
+        self.alias_trie = _build_alias_trie(self.aliases)
+        self._alias_values = list(self.aliases.values())
+
+        pair_index = {}
+        for entry in data.get("pair_links", []):
+            key = frozenset(name.lower().strip() for name in entry["chemicals"])
+            pair_index[key] = pair_index.get(key, ()) + tuple(entry["links"])
+        self.pair_index = pair_index
 
-    for key, value in aliases.items():
-        if key in name:
-            return value
+        self.general_resources = data.get("general_resources", [])
+        self.normalize = functools.lru_cache(maxsize=8192)(self._normalize)
 
-    return name
+    def _normalize(self, name: str) -> str:
+        name = name.lower().strip()
+        priority = _match_alias(self.alias_trie, name)
+        if priority is not None:
+            return self._alias_values[priority]
+        return name
+
+
+class SafetyCatalogue:
+    """
+    데이터 파일 기반 안전 링크 카탈로그 (파일 변경 시 자동 리로드)
+
+    리로드는 새 스냅샷을 완전히 만든 뒤 참조만 교체하므로
+    요청 처리 중에는 항상 일관된 스냅샷을 보게 됨
+    """
+
+    def __init__(self, path: Path, reload_interval: float = CATALOGUE_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+        self._seen_mtime = None
+        self._snapshot = CatalogueSnapshot({})
+        self.reload()
+
+    def reload(self) -> bool:
+        """파일을 다시 읽어 스냅샷 교체 (실패 시 기존 스냅샷 유지)"""
+        with self._reload_lock:
+            try:
+                mtime = self.path.stat().st_mtime
+                self._seen_mtime = mtime
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                snapshot = CatalogueSnapshot(data, mtime)
+            except Exception as e:
+                logger.error(f"[SafetyLinks] Error loading catalogue {self.path}: {e}")
+                return False
+
+            self._snapshot = snapshot
+            logger.info(f"[SafetyLinks] Loaded catalogue v{snapshot.version}: "
+                        f"{len(snapshot.aliases)} aliases, {len(snapshot.pair_index)} pairs")
+            return True
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot:
+        """현재 스냅샷 (주기적으로 파일 mtime 확인 후 변경 시 리로드)"""
+        now = time.monotonic()
+        if now - self._last_check >= self.reload_interval:
+            self._last_check = now
+            try:
+                # 로드에 실패한 파일은 다시 바뀔 때까지 재시도하지 않음
+                if self.path.stat().st_mtime != self._seen_mtime:
+                    self.reload()
+            except OSError:
+                pass
+        return self._snapshot
+
+
+catalogue = SafetyCatalogue(CATALOGUE_PATH)
+
+
+def normalize_chemical_name(name):
+    """
+    화학물질 이름을 정규화 (링크 검색용)
+    """
+    return catalogue.snapshot.normalize(name)
 
 
 def get_safety_links(chemical_1, chemical_2):
@@ -100,22 +162,11 @@ def get_safety_links(chemical_1, chemical_2):
     Returns:
         list: 안전 정보 링크 리스트
     """
-    norm_1 = normalize_chemical_name(chemical_1)
-    norm_2 = normalize_chemical_name(chemical_2)
+    snapshot = catalogue.snapshot
+    key = frozenset((snapshot.normalize(chemical_1), snapshot.normalize(chemical_2)))
 
-    # 순서 상관없이 검색
-    pair_key_1 = (norm_1, norm_2)
-    pair_key_2 = (norm_2, norm_1)
-
-    links = []
-
-    # 특정 조합 링크 찾기
-    if pair_key_1 in CHEMICAL_SAFETY_LINKS:
-        links.extend(CHEMICAL_SAFETY_LINKS[pair_key_1])
-    elif pair_key_2 in CHEMICAL_SAFETY_LINKS:
-        links.extend(CHEMICAL_SAFETY_LINKS[pair_key_2])
-
-    return links
+    # 순서 상관없이 검색 (frozenset 키)
+    return list(snapshot.pair_index.get(key, ()))
 
 
 def get_msds_search_url(chemical_name):
@@ -144,10 +195,12 @@ def get_all_links_for_analysis(dangerous_pairs, caution_pairs):
     Returns:
         dict: 링크 정보
     """
+    snapshot = catalogue.snapshot
+
     result = {
         "specific_links": [],  # 특정 조합에 대한 링크
         "msds_links": [],      # MSDS 링크
-        "general_resources": OFFICIAL_SAFETY_RESOURCES  # 공식 자료
+        "general_resources": snapshot.general_resources  # 공식 자료
     }
 
     # 위험한 조합과 주의 조합 모두 처리
@@ -161,9 +214,9 @@ def get_all_links_for_analysis(dangerous_pairs, caution_pairs):
         chem1 = pair.get("chemical_1", "")
         chem2 = pair.get("chemical_2", "")
 
-        # 특정 조합 링크
-        specific_links = get_safety_links(chem1, chem2)
-        for link in specific_links:
+        # 특정 조합 링크 (요청 중에는 같은 스냅샷 사용)
+        key = frozenset((snapshot.normalize(chem1), snapshot.normalize(chem2)))
+        for link in snapshot.pair_index.get(key, ()):
             link_key = (link["title"], link["url"])
             if link_key not in seen_links:
                 result["specific_links"].append(link)
@@ -3,9 +3,14 @@ Simple Rule-Based Chemical Safety Analyzer
 AI 없이 CAMEO 데이터만으로 명확한 분석 제공
 """
 
+import bisect
 from typing import List, Dict
 from collections import defaultdict
 
+# STATUS_MAPPING / HAZARD_SEVERITY / 요약·권장 사항 규칙이 바뀌면 올림
+# (이전 버전으로 만든 캐시 결과는 응답 후 백그라운드에서 재생성)
+ANALYZER_VERSION = 1
+
 
 class SimpleChemicalAnalyzer:
     """
@@ -87,34 +92,14 @@ class SimpleChemicalAnalyzer:
         all_chemicals = set()
 
         for result in cameo_results:
-            chem1 = result.get("chemical_1", "")
-            chem2 = result.get("chemical_2", "")
-            status = result.get("status", "").lower()
-            descriptions = result.get("descriptions", [])
-
-            all_chemicals.add(chem1)
-            all_chemicals.add(chem2)
-
-            # 위험도 분류
-            risk_level = self._classify_risk(status)
-
-            # 심각도 점수 계산
-            severity_score = self._calculate_severity(descriptions)
-
-            pair_info = {
-                "chemical_1": chem1,
-                "chemical_2": chem2,
-                "status": status,
-                "risk_level": risk_level,
-                "severity_score": severity_score,
-                "hazards": descriptions,
-                "hazard_count": len(descriptions),
-                "summary": self._generate_pair_summary(chem1, chem2, risk_level, descriptions)
-            }
+            pair_info = self._build_pair_info(result)
+
+            all_chemicals.add(pair_info["chemical_1"])
+            all_chemicals.add(pair_info["chemical_2"])
 
-            if risk_level == "위험":
+            if pair_info["risk_level"] == "위험":
                 dangerous.append(pair_info)
-            elif risk_level == "주의":
+            elif pair_info["risk_level"] == "주의":
                 caution.append(pair_info)
             else:
                 safe.append(pair_info)
@@ -123,6 +108,101 @@ class SimpleChemicalAnalyzer:
         dangerous.sort(key=lambda x: x["severity_score"], reverse=True)
         caution.sort(key=lambda x: x["severity_score"], reverse=True)
 
+        # 요약 생성
+        summary = self._build_summary(dangerous, caution, safe, all_chemicals)
+
+        # 권장 사항
+        recommendations = self._generate_recommendations(dangerous, caution)
+
+        return {
+            "summary": summary,
+            "dangerous_pairs": dangerous,
+            "caution_pairs": caution,
+            "safe_pairs": safe,
+            "recommendations": recommendations
+        }
+
+    def apply_delta(self, analysis: Dict, added_results: List[Dict], removed_chemicals=()) -> Dict:
+        """
+        기존 분석 결과에 추가/삭제된 조합만 반영 (전체 재분석 없이)
+
+        - 삭제된 물질이 포함된 조합 제거
+        - 새 조합만 분류/점수 계산 후 심각도 순서를 유지하며 삽입
+        - 개수, 전체 상태, 권장 사항은 갱신된 목록에서 다시 구성
+
+        Args:
+            analysis: analyze() 또는 apply_delta()의 이전 결과
+            added_results: 새로 추가된 CAMEO 조합 결과
+            removed_chemicals: 제거할 물질 이름들
+
+        Returns:
+            갱신된 분석 결과 (analyze()와 같은 형식)
+        """
+        removed = set(removed_chemicals)
+
+        def keep(pair):
+            return pair["chemical_1"] not in removed and pair["chemical_2"] not in removed
+
+        dangerous = [p for p in analysis.get("dangerous_pairs", []) if keep(p)]
+        caution = [p for p in analysis.get("caution_pairs", []) if keep(p)]
+        safe = [p for p in analysis.get("safe_pairs", []) if keep(p)]
+
+        all_chemicals = set(analysis.get("summary", {}).get("chemicals_list", [])) - removed
+
+        for result in added_results:
+            pair_info = self._build_pair_info(result)
+            all_chemicals.add(pair_info["chemical_1"])
+            all_chemicals.add(pair_info["chemical_2"])
+
+            if pair_info["risk_level"] == "위험":
+                target = dangerous
+            elif pair_info["risk_level"] == "주의":
+                target = caution
+            else:
+                safe.append(pair_info)
+                continue
+
+            # 내림차순 정렬 유지 (같은 점수는 뒤에 삽입 → sort()의 안정 정렬과 동일)
+            index = bisect.bisect_right(target, -pair_info["severity_score"], key=lambda x: -x["severity_score"])
+            target.insert(index, pair_info)
+
+        if not dangerous and not caution and not safe:
+            return self.analyze([])
+
+        return {
+            "summary": self._build_summary(dangerous, caution, safe, all_chemicals),
+            "dangerous_pairs": dangerous,
+            "caution_pairs": caution,
+            "safe_pairs": safe,
+            "recommendations": self._generate_recommendations(dangerous, caution)
+        }
+
+    def _build_pair_info(self, result: Dict) -> Dict:
+        """CAMEO 조합 결과 하나를 분류/점수화"""
+        chem1 = result.get("chemical_1", "")
+        chem2 = result.get("chemical_2", "")
+        status = result.get("status", "").lower()
+        descriptions = result.get("descriptions", [])
+
+        # 위험도 분류
+        risk_level = self._classify_risk(status)
+
+        # 심각도 점수 계산
+        severity_score = self._calculate_severity(descriptions)
+
+        return {
+            "chemical_1": chem1,
+            "chemical_2": chem2,
+            "status": status,
+            "risk_level": risk_level,
+            "severity_score": severity_score,
+            "hazards": descriptions,
+            "hazard_count": len(descriptions),
+            "summary": self._generate_pair_summary(chem1, chem2, risk_level, descriptions)
+        }
+
+    def _build_summary(self, dangerous: List[Dict], caution: List[Dict], safe: List[Dict], all_chemicals) -> Dict:
+        """분류된 조합 목록으로 요약 생성"""
         # 전체 상태 판단
         overall_status = self._determine_overall_status(
             len(dangerous),
@@ -130,9 +210,8 @@ class SimpleChemicalAnalyzer:
             len(safe)
         )
 
-        # 요약 생성
-        summary = {
-            "total_pairs": len(cameo_results),
+        return {
+            "total_pairs": len(dangerous) + len(caution) + len(safe),
             "total_chemicals": len(all_chemicals),
             "chemicals_list": sorted(list(all_chemicals)),
             "dangerous_count": len(dangerous),
@@ -146,17 +225,6 @@ class SimpleChemicalAnalyzer:
             )
         }
 
-        # 권장 사항
-        recommendations = self._generate_recommendations(dangerous, caution)
-
-        return {
-            "summary": summary,
-            "dangerous_pairs": dangerous,
-            "caution_pairs": caution,
-            "safe_pairs": safe,
-            "recommendations": recommendations
-        }
-
     def _classify_risk(self, status: str) -> str:
         """CAMEO status를 위험도로 변환"""
         status_lower = status.lower()
@@ -259,6 +327,19 @@ def analyze_simple(cameo_results: List[Dict]) -> Dict:
     return analyzer.analyze(cameo_results)
 
 
+def patch_analysis(analysis: Dict, added_results: List[Dict], removed_chemicals=()) -> Dict:
+    """
+    기존 분석 결과에 조합 추가/삭제만 반영하는 함수
+
+    Usage:
+        from simple_analyzer import patch_analysis
+
+        result = patch_analysis(previous_result, new_cameo_results, removed_chemicals=["WATER"])
+    """
+    analyzer = SimpleChemicalAnalyzer()
+    return analyzer.apply_delta(analysis, added_results, removed_chemicals)
+
+
 # 테스트 코드
 if __name__ == "__main__":
     # 테스트 데이터
@@ -0,0 +1,68 @@
+"""
+Cold start 시간 측정
+모듈 import / 초기화 / 지연 import(첫 사용 시) 단계별 소요 시간을 기록
+"""
+
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 이 모듈이 처음 import된 시점을 기준으로 측정
+_ORIGIN = time.perf_counter()
+_lock = threading.Lock()
+_phases = []
+_ready_at = None
+
+
+@contextmanager
+def phase(name: str):
+    """with phase("init:cache_dir"): ... 형태로 단계 소요 시간 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, started)
+
+
+def _record(name: str, started: float):
+    ended = time.perf_counter()
+    with _lock:
+        _phases.append({
+            "phase": name,
+            "start_ms": round((started - _ORIGIN) * 1000, 2),
+            "duration_ms": round((ended - started) * 1000, 2)
+        })
+
+
+def lazy_import(module_name: str):
+    """
+    첫 사용 시점에 모듈 import (이미 로드된 경우 바로 반환)
+    처음 로드될 때만 "lazy:<모듈>" 단계로 기록
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _record(f"lazy:{module_name}", started)
+    return module
+
+
+def mark_ready():
+    """서버가 요청을 받을 준비가 된 시점 기록"""
+    global _ready_at
+    _ready_at = time.perf_counter()
+
+
+def report() -> dict:
+    """단계별 소요 시간 보고서"""
+    with _lock:
+        phases = list(_phases)
+    return {
+        "ready_ms": round((_ready_at - _ORIGIN) * 1000, 2) if _ready_at else None,
+        "phases": phases,
+        "slowest": sorted(phases, key=lambda p: p["duration_ms"], reverse=True)[:5]
+    }
@@ -0,0 +1,217 @@
+"""
+보관 구역 분리 계획 (Storage Segregation Planner)
+위험/주의 조합으로 비호환성 그래프를 만들고 그래프 색칠로
+서로 반응하는 물질이 같은 구역에 들어가지 않는 최소(근사) 보관 그룹을 계산
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional
+
+
+def _build_graph(chemicals: List[str], pairs: List[Dict]):
+    """물질 인덱스 + 인접 리스트 + 인접 비트셋 생성"""
+    index = {chem: i for i, chem in enumerate(chemicals)}
+    neighbors = [set() for _ in chemicals]
+
+    for pair in pairs:
+        chem1 = pair.get("chemical_1")
+        chem2 = pair.get("chemical_2")
+        if chem1 is None or chem2 is None or chem1 == chem2:
+            continue
+        for chem in (chem1, chem2):
+            if chem not in index:
+                index[chem] = len(chemicals)
+                chemicals.append(chem)
+                neighbors.append(set())
+        a, b = index[chem1], index[chem2]
+        neighbors[a].add(b)
+        neighbors[b].add(a)
+
+    masks = [0] * len(chemicals)
+    for v, adjacent in enumerate(neighbors):
+        mask = 0
+        for u in adjacent:
+            mask |= 1 << u
+        masks[v] = mask
+
+    return neighbors, masks
+
+
+def _dsatur(neighbors: List[set]) -> List[int]:
+    """
+    DSatur 색칠 (포화도 최대 → 차수 최대 순으로 정점 선택)
+    힙에 (−포화도, −차수, 정점)을 넣고 오래된 항목은 꺼낼 때 무시
+    """
+    n = len(neighbors)
+    colors = [-1] * n
+    saturation = [set() for _ in range(n)]
+    degree = [len(adj) for adj in neighbors]
+    heap = [(0, -degree[v], v) for v in range(n)]
+    heapq.heapify(heap)
+
+    while heap:
+        neg_sat, _, v = heapq.heappop(heap)
+        if colors[v] != -1 or -neg_sat != len(saturation[v]):
+            continue
+
+        used = saturation[v]
+        color = 0
+        while color in used:
+            color += 1
+        colors[v] = color
+
+        for u in neighbors[v]:
+            if colors[u] == -1 and color not in saturation[u]:
+                saturation[u].add(color)
+                heapq.heappush(heap, (-len(saturation[u]), -degree[u], u))
+
+    return colors
+
+
+def _greedy_by_classes(order: List[int], masks: List[int]) -> List[int]:
+    """주어진 순서로 그리디 색칠 (색 그룹을 비트셋으로 관리)"""
+    class_masks: List[int] = []
+    colors = [0] * len(masks)
+    for v in order:
+        adjacent = masks[v]
+        for color, members in enumerate(class_masks):
+            if not adjacent & members:
+                class_masks[color] = members | (1 << v)
+                colors[v] = color
+                break
+        else:
+            colors[v] = len(class_masks)
+            class_masks.append(1 << v)
+    return colors
+
+
+def _iterated_greedy(colors: List[int], masks: List[int], rounds: int, deadline: float) -> List[int]:
+    """
+    Iterated Greedy (Culberson): 색 그룹 단위로 순서를 바꿔 다시 그리디 색칠
+    그룹을 통째로 나열하면 그룹 수는 절대 늘지 않음
+    """
+    best = colors
+    for round_index in range(rounds):
+        if time.perf_counter() > deadline:
+            break
+        groups: Dict[int, List[int]] = {}
+        for v, color in enumerate(best):
+            groups.setdefault(color, []).append(v)
+        classes = list(groups.values())
+        if round_index % 2 == 0:
+            classes.sort(key=len, reverse=True)   # 큰 그룹 먼저
+        else:
+            classes.reverse()                     # 역순
+        order = [v for group in classes for v in group]
+        candidate = _greedy_by_classes(order, masks)
+        if max(candidate, default=-1) <= max(best, default=-1):
+            best = candidate
+    return best
+
+
+def _greedy_clique(neighbors: List[set], masks: List[int], starts: int = 32) -> List[int]:
+    """
+    최대 클릭 근사 (하한값 계산용)
+    차수가 큰 정점들에서 시작해 후보 집합과 가장 많이 연결된 정점을 반복 추가
+    """
+    n = len(neighbors)
+    best: List[int] = []
+    start_vertices = sorted(range(n), key=lambda v: len(neighbors[v]), reverse=True)[:starts]
+
+    for start in start_vertices:
+        clique = [start]
+        candidates = masks[start]
+        while candidates:
+            best_v, best_score = -1, -1
+            remaining = candidates
+            while remaining:
+                low_bit = remaining & -remaining
+                v = low_bit.bit_length() - 1
+                remaining ^= low_bit
+                score = (masks[v] & candidates).bit_count()
+                if score > best_score:
+                    best_v, best_score = v, score
+            clique.append(best_v)
+            candidates &= masks[best_v]
+        if len(clique) > len(best):
+            best = clique
+
+    return best
+
+
+def plan_storage_groups(dangerous_pairs: List[Dict], caution_pairs: Optional[List[Dict]] = None,
+                        chemicals: Optional[List[str]] = None, time_budget: float = 0.2) -> Dict:
+    """
+    비호환성 그래프 색칠로 분리 보관 그룹 계산
+
+    Args:
+        dangerous_pairs: 위험 조합 (simple_analyzer 형식)
+        caution_pairs: 주의 조합 (None이면 위험 조합만 고려)
+        chemicals: 전체 물질 목록 (반응 조합이 없는 물질도 그룹에 배정)
+        time_budget: 개선 단계(iterated greedy)에 쓸 최대 시간 (초)
+
+    Returns:
+        {
+            "group_count": 3,
+            "lower_bound": 3,       # 서로 모두 반응하는 물질 수 (클릭) → 최소 그룹 수
+            "optimal": true,        # group_count == lower_bound 이면 최소임이 보장됨
+            "groups": [{"group": 1, "chemicals": [...]}],
+            "assignments": {"물질": 1, ...},
+            "incompatible_edges": 12,
+            "elapsed_ms": 4.2
+        }
+    """
+    started = time.perf_counter()
+    pairs = list(dangerous_pairs) + list(caution_pairs or [])
+    chemical_list = list(dict.fromkeys(chemicals or []))
+
+    neighbors, masks = _build_graph(chemical_list, pairs)
+    edge_count = sum(len(adj) for adj in neighbors) // 2
+
+    colors = _dsatur(neighbors)
+    if edge_count:
+        colors = _iterated_greedy(colors, masks, rounds=20, deadline=started + time_budget)
+    clique = _greedy_clique(neighbors, masks) if edge_count else chemical_list[:1]
+
+    group_count = max(colors, default=-1) + 1
+    groups: List[List[str]] = [[] for _ in range(group_count)]
+    for v, color in enumerate(colors):
+        groups[color].append(chemical_list[v])
+
+    # 큰 그룹부터 1번으로 번호 부여
+    groups.sort(key=len, reverse=True)
+    assignments = {}
+    for number, members in enumerate(groups, 1):
+        for chem in members:
+            assignments[chem] = number
+
+    lower_bound = min(len(clique), group_count)
+    return {
+        "group_count": group_count,
+        "lower_bound": lower_bound,
+        "optimal": group_count == lower_bound,
+        "groups": [
+            {"group": number, "chemicals": sorted(members)}
+            for number, members in enumerate(groups, 1)
+        ],
+        "assignments": assignments,
+        "incompatible_edges": edge_count,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def plan_for_analysis(analysis_result: Dict, include_caution: bool = True) -> Dict:
+    """
+    simple_analyzer 결과로 보관 계획 생성
+
+    Usage:
+        from storage_planner import plan_for_analysis
+
+        plan = plan_for_analysis(analyze_simple(cameo_results))
+    """
+    return plan_storage_groups(
+        analysis_result.get("dangerous_pairs", []),
+        analysis_result.get("caution_pairs", []) if include_caution else [],
+        chemicals=analysis_result.get("summary", {}).get("chemicals_list", [])
+    )
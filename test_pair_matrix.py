@@ -0,0 +1,126 @@
+"""
+PairMatrix 파일 형식 테스트 (서버 없이 실행)
+
+    python -m pytest test_pair_matrix.py
+"""
+
+import threading
+
+import pair_matrix
+from pair_matrix import PairMatrix, PairMatrixStore
+from pair_store import PairStore
+
+PAIR = {
+    "pair_id": "1-2",
+    "chemical_1": "ACETIC ACID",
+    "chemical_2": "SODIUM HYDROXIDE",
+    "status": "Caution",
+    "descriptions": ["Generates heat", "May be violent"],
+    "documentation_link": "https://cameochemicals.noaa.gov/react/1"
+}
+
+
+def test_put_creates_missing_file_and_round_trips(tmp_path):
+    path = tmp_path / "new" / "pairs.bin"
+    matrix = PairMatrix(path)
+
+    added = matrix.put({"64-19-7|1310-73-2": PAIR, "64-19-7|7732-18-5": None}, {"64-19-7": "ACETIC ACID"})
+
+    assert added == 2
+    assert path.exists()
+    assert matrix.get("64-19-7|1310-73-2") == PAIR
+    assert matrix.contains("64-19-7|7732-18-5")
+    assert matrix.get("64-19-7|7732-18-5") is None
+    assert not matrix.contains("1310-73-2|7732-18-5")
+    assert matrix.get_name("64-19-7") == "ACETIC ACID"
+    assert matrix.get_name("7732-18-5") is None
+    assert matrix.pair_count == 2
+
+    # 다른 프로세스처럼 새로 열어도 같은 내용
+    assert PairMatrix(path).get("64-19-7|1310-73-2") == PAIR
+
+
+def test_overwrite_and_keep_existing(tmp_path):
+    matrix = PairMatrix(tmp_path / "pairs.bin")
+    matrix.put({"a|b": PAIR}, {})
+
+    updated = {**PAIR, "status": "Incompatible", "descriptions": ["Explodes"]}
+    assert matrix.put({"a|b": updated}, {}, overwrite=False) == 0
+    assert matrix.get("a|b") == PAIR
+
+    assert matrix.put({"a|b": updated}, {}) == 0
+    assert matrix.get("a|b") == updated
+    assert matrix.pair_count == 1
+
+
+def test_rebuild_keeps_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(pair_matrix, "INITIAL_CAPACITY", 4)
+    path = tmp_path / "pairs.bin"
+    matrix = PairMatrix(path)
+    reader = PairMatrix(path)
+    reader.open()
+
+    pairs = {f"{i}|{i + 1}": {**PAIR, "pair_id": str(i)} for i in range(50)}
+    for key, result in pairs.items():
+        matrix.put({key: result}, {})
+
+    assert matrix.stats()["generation"] > 0
+    assert matrix.pair_count == 50
+    items, _ = matrix.items()
+    assert items == pairs
+    # 교체되기 전의 파일을 mmap한 쪽도 새 파일을 다시 열어 조회
+    assert reader.get("49|50") == pairs["49|50"]
+
+
+def test_reads_during_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(pair_matrix, "INITIAL_CAPACITY", 4)
+    matrix = PairMatrix(tmp_path / "pairs.bin")
+    matrix.put({"a|b": PAIR}, {"a": "ACETIC ACID"})
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                assert matrix.get("a|b") == PAIR
+                assert matrix.get_name("a") == "ACETIC ACID"
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(200):
+        matrix.put({f"{i}|x": PAIR}, {})
+    done.set()
+    reader.join()
+
+    assert errors == []
+
+
+def test_other_parser_version_is_missing(tmp_path):
+    matrix = PairMatrix(tmp_path / "pairs.bin")
+    matrix.put({"a|b": PAIR}, {}, version=1)
+
+    assert matrix.get("a|b", version=1) == PAIR
+    assert not matrix.contains("a|b", version=2)
+    assert matrix.get("a|b", version=2) is None
+    assert matrix.items(version=2)[0] == {}
+
+    # 다시 파싱한 결과는 가져오기(overwrite=False)로도 교체됨
+    reparsed = {**PAIR, "status": "Incompatible"}
+    matrix.put({"a|b": reparsed}, {}, overwrite=False, version=2)
+    assert matrix.get("a|b", version=2) == reparsed
+
+
+def test_store_reparses_after_parser_bump(tmp_path):
+    for store in (PairStore(tmp_path / "pairs.json"), PairMatrixStore(tmp_path / "pairs.bin")):
+        store.record_crawl(
+            ["64-19-7", "1310-73-2"], [PAIR], {"64-19-7": "ACETIC ACID", "1310-73-2": "SODIUM HYDROXIDE"}
+        )
+        assert store.is_known("64-19-7", "1310-73-2")
+
+        store.parser_version += 1
+        assert store.missing_pairs(["64-19-7", "1310-73-2"]) == [("64-19-7", "1310-73-2")]
+        assert store.get("64-19-7", "1310-73-2") is None
+        assert store.snapshot()[0] == {}
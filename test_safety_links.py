@@ -0,0 +1,38 @@
+"""
+안전 링크 별칭 매칭 테스트 (서버 없이 실행)
+
+    python -m pytest test_safety_links.py
+"""
+
+import json
+
+from safety_links import CATALOGUE_PATH, CatalogueSnapshot
+
+CATALOGUE = json.loads(CATALOGUE_PATH.read_text(encoding="utf-8"))
+
+
+def substring_order(aliases: dict, name: str) -> str:
+    """기존 방식: 카탈로그 순서대로 이름에 들어 있는 첫 별칭"""
+    name = name.lower().strip()
+    for alias, value in aliases.items():
+        if alias in name:
+            return value
+    return name
+
+
+def test_multi_alias_names_follow_catalogue_order():
+    snapshot = CatalogueSnapshot(CATALOGUE)
+    assert snapshot.normalize("HYDROGEN PEROXIDE, ACETIC ACID SOLUTION") == "acid"
+    assert snapshot.normalize("SODIUM HYDROXIDE, SODIUM HYPOCHLORITE SOLUTION") == "bleach"
+    assert snapshot.normalize("AMMONIUM HYDROXIDE, HYDROGEN PEROXIDE MIXTURE") == "peroxide"
+    assert snapshot.normalize("GLACIAL ACETIC ACID") == "acid"
+    assert snapshot.normalize("  Sodium Chloride ") == "sodium chloride"
+
+
+def test_matches_substring_order_for_all_alias_combinations():
+    aliases = {alias.lower().strip(): value for alias, value in CATALOGUE["aliases"].items()}
+    snapshot = CatalogueSnapshot(CATALOGUE)
+    for first in aliases:
+        for second in aliases:
+            name = f"{first.upper()}, {second.upper()} SOLUTION"
+            assert snapshot.normalize(name) == substring_order(aliases, name), name
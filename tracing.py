@@ -0,0 +1,138 @@
+"""
+요청 단위 단계별 시간 측정 (span)
+각 요청의 파이프라인 단계 / 크롤링 단계 소요 시간을 모아
+Server-Timing 헤더, 응답의 timings 필드, JSON-lines 트레이스 파일로 내보냄
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from profiler import profiled
+
+# 설정 시 요청마다 span 목록을 한 줄(JSON)씩 추가 기록
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    """한 요청 동안 기록된 span 목록"""
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.spans: List[tuple] = []  # (이름, 시작 오프셋 초, 소요 초)
+
+    def add(self, name: str, started: float, duration: float):
+        self.spans.append((name, started - self.started, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict[str, dict]:
+        """이름별 합계 (반복되는 크롤링 단계는 횟수와 합계로 묶음)"""
+        totals: Dict[str, dict] = {}
+        for name, _, duration in self.spans:
+            entry = totals.setdefault(name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000
+        for entry in totals.values():
+            entry["total_ms"] = round(entry["total_ms"], 2)
+        totals["total"] = {"count": 1, "total_ms": round(self.elapsed() * 1000, 2)}
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (예: cameo_crawl;dur=41234.5, crawl.add;dur=12000.1;desc="x4")"""
+        parts = []
+        for name, entry in self.summary().items():
+            part = f"{name};dur={entry['total_ms']}"
+            if entry["count"] > 1:
+                part += f';desc="x{entry["count"]}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def crawl_steps(self) -> List[dict]:
+        """CAMEO 크롤링 관련 span (cameo_crawl, crawl.*)"""
+        return [
+            {"name": name, "start_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+            for name, offset, duration in self.spans
+            if name == "cameo_crawl" or name.startswith("crawl.")
+        ]
+
+    def to_record(self, **extra) -> dict:
+        return {
+            "request_id": self.request_id,
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "spans": [
+                {"name": name, "start_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                for name, offset, duration in self.spans
+            ],
+            **extra
+        }
+
+
+def start_trace(request_id: Optional[str] = None):
+    """현재 컨텍스트에서 새 trace 시작 → (trace, 복원용 token)"""
+    trace = Trace(request_id)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_timings() -> Optional[Dict[str, dict]]:
+    trace = _current_trace.get()
+    return trace.summary() if trace is not None else None
+
+
+def finish_span(name: str, started: float, histogram=None, **labels):
+    """started(perf_counter)부터 지금까지를 span으로 기록 (+ 선택적으로 히스토그램)"""
+    duration = time.perf_counter() - started
+    if histogram is not None:
+        histogram.observe(duration, **labels)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, started, duration)
+
+
+@contextmanager
+def span(name: str, histogram=None, profile: bool = False, **labels):
+    """
+    with span("analyze_simple", PIPELINE_STAGE_SECONDS, stage="analyze_simple"):
+        ...
+    trace가 없는 컨텍스트(스크립트 실행 등)에서는 히스토그램만 기록
+
+    profile=True: 프로파일링 중인 요청이면 이 구간을 cProfile로 측정
+                  (await가 없는 파이썬 코드 구간에만 사용)
+    """
+    started = time.perf_counter()
+    try:
+        if profile:
+            with profiled(name):
+                yield
+        else:
+            yield
+    finally:
+        finish_span(name, started, histogram, **labels)
+
+
+def export_trace(trace: Trace, **extra):
+    """TRACE_FILE이 설정된 경우 JSON-lines로 추가 기록 (블로킹 - 스레드에서 호출)"""
+    if not TRACE_FILE:
+        return
+    line = json.dumps(trace.to_record(**extra), ensure_ascii=False)
+    with _file_lock:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")